@@ -1,12 +1,48 @@
+import os
+from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+load_dotenv()
+
 # URL de la base de datos
-DATABASE_URL = "postgresql://admin:1234@db:5432/gestor_s3"
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://admin:1234@db:5432/gestor_s3")
+
+# Pool de conexiones y timeouts
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+
+
+def engine_options(url: str) -> dict:
+    """Builds the create_engine keyword arguments for a database URL.
+
+    Args:
+        url (str): The database URL.
+
+    Returns:
+        dict: Pool sizing, recycling, pre-ping and statement timeout settings.
+        SQLite URLs (used in local runs) get none of them.
+    """
+    if url.startswith("sqlite"):
+        return {}
+
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"},
+    }
+
 
 # Crea el motor (engine) de la base de datos
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 # Crea la clase Base desde la que heredarán todos los modelos
 Base = declarative_base()
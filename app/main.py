@@ -1,9 +1,33 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from routes.user_routes import router as user_router
 from routes.file_routes import router as file_routes
 from routes.roles_routes import router as roles_router
+from routes.folder_routes import router as folder_router
+from routes.permission_routes import router as permission_router
+from routes.tag_routes import router as tag_router
+from routes.job_routes import router as job_router
+from storage import init_storage
+from utils.s3_client import close_s3_client
+from utils.concurrency import shutdown_executor
+from utils.password_hasher import shutdown_hasher
+from worker import start_in_process_worker, stop_in_process_worker
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un único backend de almacenamiento (y su pool de conexiones) para todo el proceso
+    init_storage()
+    # Extracción de metadatos en segundo plano (JOBS_IN_PROCESS=false para usar worker.py)
+    await start_in_process_worker()
+    yield
+    await stop_in_process_worker()
+    shutdown_executor()
+    shutdown_hasher()
+    close_s3_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -13,3 +37,7 @@ def home():
 app.include_router(user_router, prefix="/users", tags=["users"])
 app.include_router(file_routes, prefix="/files", tags=["files"])
 app.include_router(roles_router, prefix="/roles", tags=["roles"])
+app.include_router(folder_router, prefix="/folders", tags=["folders"])
+app.include_router(permission_router, prefix="/permissions", tags=["permissions"])
+app.include_router(tag_router, prefix="/tags", tags=["tags"])
+app.include_router(job_router, prefix="/jobs", tags=["jobs"])
@@ -0,0 +1,86 @@
+"""Applies the versioned SQL migrations in ``migrations/`` to DATABASE_URL.
+
+Each ``NNNN_description.sql`` file runs once, in order, inside its own
+transaction, and is recorded in the ``schema_migrations`` table. Fresh
+databases get the full schema from ``db/init.sql``; the migrations bring
+existing ones up to date and are written to be idempotent.
+
+Files whose first line is ``-- migrate:no-transaction`` run statement by
+statement in autocommit mode, as required by ``CREATE INDEX CONCURRENTLY``.
+
+Usage:
+    docker compose exec app python migrate.py
+"""
+
+from pathlib import Path
+from database import engine
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+NO_TRANSACTION_MARKER = "-- migrate:no-transaction"
+
+
+def split_statements(sql: str) -> list[str]:
+    """Splits a migration into statements (one per ``;``-terminated line block)."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def get_applied_versions(cursor) -> set[str]:
+    """Returns the versions already recorded in ``schema_migrations``."""
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+          version VARCHAR(255) PRIMARY KEY,
+          applied_at TIMESTAMP DEFAULT current_timestamp
+        )
+        """
+    )
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate() -> list[str]:
+    """Applies every pending migration.
+
+    Returns:
+        list[str]: The versions applied by this run.
+    """
+    connection = engine.raw_connection()
+    applied = []
+    try:
+        cursor = connection.cursor()
+        done = get_applied_versions(cursor)
+        connection.commit()
+
+        for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+            version = path.stem
+            if version in done:
+                continue
+            sql = path.read_text()
+            try:
+                if sql.startswith(NO_TRANSACTION_MARKER):
+                    connection.driver_connection.autocommit = True
+                    for statement in split_statements(sql):
+                        cursor.execute(statement)
+                    connection.driver_connection.autocommit = False
+                else:
+                    cursor.execute(sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version) VALUES (%s)", (version,)
+                )
+                connection.commit()
+            except Exception:
+                connection.driver_connection.autocommit = False
+                connection.rollback()
+                raise
+            applied.append(version)
+            print(f"applied {version}")
+    finally:
+        connection.close()
+
+    return applied
+
+
+if __name__ == "__main__":
+    if not migrate():
+        print("database is up to date")
@@ -0,0 +1,20 @@
+-- Columna numérica para filtrar y ordenar por tamaño sin parsear file_metadata
+ALTER TABLE files ADD COLUMN IF NOT EXISTS size_bytes BIGINT;
+
+-- Backfill: filas nuevas traen size_bytes en el JSON, las viejas solo "12.34kb"
+UPDATE files
+SET size_bytes = (file_metadata->>'size_bytes')::BIGINT
+WHERE size_bytes IS NULL
+  AND file_metadata->>'size_bytes' ~ '^[0-9]+$';
+
+UPDATE files
+SET size_bytes = ROUND(REPLACE(file_metadata->>'size', 'kb', '')::NUMERIC * 1024)::BIGINT
+WHERE size_bytes IS NULL
+  AND file_metadata->>'size' ~ '^[0-9]+(\.[0-9]+)?kb$';
+
+UPDATE files SET size_bytes = 0 WHERE size_bytes IS NULL;
+
+ALTER TABLE files ALTER COLUMN size_bytes SET DEFAULT 0;
+ALTER TABLE files ALTER COLUMN size_bytes SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_files_size_bytes_file_id ON files (size_bytes, file_id);
@@ -0,0 +1,18 @@
+-- migrate:no-transaction
+-- Índices para las búsquedas más frecuentes. CONCURRENTLY no bloquea escrituras
+-- en bases en producción, pero no puede correr dentro de una transacción.
+-- Si una creación falla queda un índice INVALID: borrarlo con DROP INDEX
+-- CONCURRENTLY y volver a correr la migración.
+
+-- Paginación por cursor (sort, file_id); también cubren owner_id y file_name
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_uploaded_at_file_id ON files (uploaded_at, file_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_file_name_file_id ON files (file_name, file_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_file_type_file_id ON files (file_type, file_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_owner_id_uploaded_at_file_id ON files (owner_id, uploaded_at, file_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_folder_id ON files (folder_id);
+
+-- Un username / role_name identifica a un único registro (login, create-user, create-role).
+-- Fallan si ya hay duplicados: resolverlos antes de migrar.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_users_username ON users (username);
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_roles_role_name ON roles (role_name);
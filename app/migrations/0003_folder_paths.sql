@@ -0,0 +1,43 @@
+-- Jerarquía de carpetas con ruta materializada: path guarda los ids de los
+-- ancestros ("/1/5/") y depth su número, para leer un subárbol con un rango
+-- de índice y mover una rama con un único UPDATE.
+
+-- init.sql no creaba las fechas que el modelo ya usaba
+ALTER TABLE folders ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT current_timestamp;
+ALTER TABLE folders ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT current_timestamp;
+
+-- COLLATE "C": el orden byte a byte hace que path >= '/1/5/' AND path < '/1/50'
+-- sea exactamente el prefijo '/1/5/'
+ALTER TABLE folders ADD COLUMN IF NOT EXISTS path TEXT COLLATE "C";
+ALTER TABLE folders ADD COLUMN IF NOT EXISTS depth INT;
+
+-- Backfill desde parent_folder_id. Las carpetas cuyo padre no existe pasan a
+-- ser raíces; las que formen un ciclo quedan sin path y el SET NOT NULL falla
+WITH RECURSIVE tree AS (
+  SELECT f.folder_id, '/'::TEXT COLLATE "C" AS path, 0 AS depth
+  FROM folders f
+  WHERE f.parent_folder_id IS NULL
+     OR NOT EXISTS (SELECT 1 FROM folders p WHERE p.folder_id = f.parent_folder_id)
+  UNION ALL
+  SELECT f.folder_id, t.path || t.folder_id || '/', t.depth + 1
+  FROM folders f
+  JOIN tree t ON f.parent_folder_id = t.folder_id
+)
+UPDATE folders f
+SET path = tree.path,
+    depth = tree.depth,
+    parent_folder_id = CASE WHEN tree.depth = 0 THEN NULL ELSE f.parent_folder_id END
+FROM tree
+WHERE f.folder_id = tree.folder_id
+  AND f.path IS NULL;
+
+UPDATE folders SET folder_name = '' WHERE folder_name IS NULL;
+
+ALTER TABLE folders ALTER COLUMN folder_name SET NOT NULL;
+ALTER TABLE folders ALTER COLUMN path SET DEFAULT '/';
+ALTER TABLE folders ALTER COLUMN path SET NOT NULL;
+ALTER TABLE folders ALTER COLUMN depth SET DEFAULT 0;
+ALTER TABLE folders ALTER COLUMN depth SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_folders_path ON folders (path);
+CREATE INDEX IF NOT EXISTS ix_folders_parent_folder_id_folder_name ON folders (parent_folder_id, folder_name, folder_id);
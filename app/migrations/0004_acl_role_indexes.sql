@@ -0,0 +1,5 @@
+-- migrate:no-transaction
+-- La resolución de permisos lee todas las reglas de un rol; la PK empieza por
+-- folder_id / file_id y no sirve para filtrar por role_id
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_folder_role_role_id ON folder_role (role_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_file_role_role_id ON file_role (role_id);
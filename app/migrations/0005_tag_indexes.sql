@@ -0,0 +1,12 @@
+-- migrate:no-transaction
+-- Búsqueda por etiquetas: las PK de file_tag / folder_tag empiezan por el
+-- archivo / carpeta y resuelven los EXISTS de cada etiqueta; estos índices
+-- dan la lista de objetos de una etiqueta poco frecuente (index-only scan)
+-- para que el planificador haga el semi-join desde ella
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_file_tag_tag_id_file_id ON file_tag (tag_id, file_id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_folder_tag_tag_id_folder_id ON folder_tag (tag_id, folder_id);
+
+-- Las búsquedas y el etiquetado identifican una etiqueta por su nombre.
+-- Falla si ya hay duplicados o nombres nulos: resolverlos antes de migrar.
+ALTER TABLE tags ALTER COLUMN tag_name SET NOT NULL;
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_tags_tag_name ON tags (tag_name);
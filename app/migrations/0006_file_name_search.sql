@@ -0,0 +1,8 @@
+-- migrate:no-transaction
+-- Búsqueda por nombre (/files/search-by-name). pg_trgm viene con la imagen
+-- oficial de Postgres; sin él la API usa un índice en memoria.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- LIKE '%abc%' y el operador %> (similitud por palabras)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_file_name_trgm ON files USING gin (lower(file_name) gin_trgm_ops);
+-- LIKE 'abc%' con cualquier collation
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_file_name_lower_pattern ON files (lower(file_name) text_pattern_ops);
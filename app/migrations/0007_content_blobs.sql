@@ -0,0 +1,16 @@
+-- migrate:no-transaction
+-- Deduplicación por contenido: los archivos subidos por la API apuntan a un
+-- blob (clave blobs/<sha256>) compartido y contado por referencias. Los
+-- archivos existentes siguen guardados por nombre (blob_sha256 NULL).
+CREATE TABLE IF NOT EXISTS blobs (
+  sha256 VARCHAR(64) PRIMARY KEY,
+  size_bytes BIGINT NOT NULL,
+  ref_count INT NOT NULL DEFAULT 0,
+  created_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- Columna nula sin valor por defecto: no reescribe la tabla
+ALTER TABLE files ADD COLUMN IF NOT EXISTS blob_sha256 VARCHAR(64) REFERENCES blobs(sha256);
+
+-- Para la FK al borrar un blob
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_files_blob_sha256 ON files (blob_sha256) WHERE blob_sha256 IS NOT NULL;
@@ -0,0 +1,19 @@
+-- Trabajos en segundo plano: la tabla es la cola (SELECT ... FOR UPDATE SKIP
+-- LOCKED), compartida por los workers de la API y por los procesos de worker.py
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id SERIAL PRIMARY KEY,
+  job_type VARCHAR(255) NOT NULL,
+  payload JSONB NOT NULL DEFAULT '{}',
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  max_attempts INT NOT NULL DEFAULT 5,
+  run_after TIMESTAMP NOT NULL,
+  locked_by VARCHAR(255),
+  locked_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP NOT NULL,
+  finished_at TIMESTAMP
+);
+
+-- Cola: siguientes trabajos listos para ejecutar
+CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after, job_id);
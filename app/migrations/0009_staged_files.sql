@@ -0,0 +1,5 @@
+-- Las subidas directas (URLs firmadas) se registran al finalizar apuntando a su
+-- clave temporal uploads/<uuid>; un trabajo en segundo plano calcula su SHA-256,
+-- las mueve a su blob y vacía la columna. Nula sin valor por defecto: no
+-- reescribe la tabla
+ALTER TABLE files ADD COLUMN IF NOT EXISTS staging_key VARCHAR(255);
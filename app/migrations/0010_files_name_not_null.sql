@@ -0,0 +1,10 @@
+-- La paginación por cursor compara (file_name, file_id) y (file_type, file_id)
+-- como filas: con NULL la comparación no es verdadera y esas filas se perderían
+-- a partir de la segunda página. Backfill a '' y NOT NULL
+UPDATE files SET file_name = '' WHERE file_name IS NULL;
+UPDATE files SET file_type = '' WHERE file_type IS NULL;
+
+ALTER TABLE files ALTER COLUMN file_name SET DEFAULT '';
+ALTER TABLE files ALTER COLUMN file_name SET NOT NULL;
+ALTER TABLE files ALTER COLUMN file_type SET DEFAULT '';
+ALTER TABLE files ALTER COLUMN file_type SET NOT NULL;
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, JSON, DateTime
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, JSON, DateTime, Index
 from database import Base
 from datetime import datetime, timezone
 
@@ -12,6 +12,8 @@ class User(Base):
     role_id = Column(Integer)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (Index("ux_users_username", "username", unique=True),)
+
 
 class Role(Base):
     __tablename__ = "roles"
@@ -21,19 +23,27 @@ class Role(Base):
     can_create_files = Column(Boolean)
     can_create_folders = Column(Boolean)
 
+    __table_args__ = (Index("ux_roles_role_name", "role_name", unique=True),)
+
 
 class Tag(Base):
     __tablename__ = "tags"
     tag_id = Column(Integer, primary_key=True)
-    tag_name = Column(String)
+    tag_name = Column(String, nullable=False)
     tag_description = Column(String)
 
+    __table_args__ = (Index("ux_tags_tag_name", "tag_name", unique=True),)
+
 
 class Folder(Base):
     __tablename__ = "folders"
     folder_id = Column(Integer, primary_key=True)
-    folder_name = Column(String)
+    folder_name = Column(String, nullable=False)
     parent_folder_id = Column(Integer)
+    # Ruta materializada con los ids de los ancestros ("/1/5/" para un hijo de 5,
+    # que a su vez es hijo de 1; "/" en las raíces) y su profundidad
+    path = Column(String, nullable=False, default="/")
+    depth = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -41,17 +51,74 @@ class Folder(Base):
         onupdate=lambda: datetime.now(timezone.utc),
     )
 
+    # path debe usar COLLATE "C" en PostgreSQL para que los rangos de prefijo
+    # (subárbol) sigan el orden byte a byte; ver db/init.sql
+    __table_args__ = (
+        Index("ix_folders_path", "path"),
+        Index("ix_folders_parent_folder_id_folder_name", "parent_folder_id", "folder_name", "folder_id"),
+    )
+
 
 class File(Base):
     __tablename__ = "files"
     file_id = Column(Integer, primary_key=True)
-    file_name = Column(String)
+    # NOT NULL: son columnas de ordenamiento de la paginación por cursor
+    file_name = Column(String, nullable=False, default="")
     file_metadata = Column(JSON)
+    size_bytes = Column(BigInteger, nullable=False, default=0)
     s3_url = Column(String)
-    file_type = Column(String)
+    file_type = Column(String, nullable=False, default="")
     folder_id = Column(Integer)
     owner_id = Column(Integer)
     uploaded_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Contenido deduplicado (blobs.sha256); NULL en archivos guardados por nombre
+    blob_sha256 = Column(String(64))
+    # Subida directa (uploads/<uuid>) que un trabajo aún no ha movido a su blob
+    staging_key = Column(String)
+
+    # Índices para la paginación por cursor (sort, file_id); los compuestos que
+    # empiezan por owner_id y file_name cubren también esas búsquedas
+    __table_args__ = (
+        Index("ix_files_folder_id", "folder_id"),
+        Index("ix_files_uploaded_at_file_id", "uploaded_at", "file_id"),
+        Index("ix_files_file_name_file_id", "file_name", "file_id"),
+        Index("ix_files_file_type_file_id", "file_type", "file_id"),
+        Index("ix_files_size_bytes_file_id", "size_bytes", "file_id"),
+        Index("ix_files_owner_id_uploaded_at_file_id", "owner_id", "uploaded_at", "file_id"),
+        # Los índices de la búsqueda por nombre (trigramas) necesitan pg_trgm:
+        # se crean en db/init.sql y migrations/0006_file_name_search.sql
+    )
+
+
+class Blob(Base):
+    __tablename__ = "blobs"
+    # Contenido direccionado por su SHA-256, guardado una sola vez en storage
+    sha256 = Column(String(64), primary_key=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    # Archivos que lo usan; con 0 el objeto se borra (o se reutiliza si falló el borrado)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    job_id = Column(Integer, primary_key=True)
+    job_type = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    # pending -> running -> done | failed (o pending de nuevo para reintentar)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    # Fechas en UTC sin zona (columnas TIMESTAMP)
+    run_after = Column(DateTime, nullable=False)
+    locked_by = Column(String)
+    locked_at = Column(DateTime)
+    last_error = Column(String)
+    created_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+
+    # Cola: siguientes trabajos listos para ejecutar
+    __table_args__ = (Index("ix_jobs_status_run_after", "status", "run_after", "job_id"),)
 
 
 class FileTag(Base):
@@ -59,12 +126,17 @@ class FileTag(Base):
     file_id = Column(Integer, primary_key=True)
     tag_id = Column(Integer, primary_key=True)
 
+    # Índice invertido: etiqueta -> archivos (la PK va de archivo a etiquetas)
+    __table_args__ = (Index("ix_file_tag_tag_id_file_id", "tag_id", "file_id"),)
+
 
 class FolderTag(Base):
     __tablename__ = "folder_tag"
     folder_id = Column(Integer, primary_key=True)
     tag_id = Column(Integer, primary_key=True)
 
+    __table_args__ = (Index("ix_folder_tag_tag_id_folder_id", "tag_id", "folder_id"),)
+
 
 class FolderRole(Base):
     __tablename__ = "folder_role"
@@ -72,9 +144,13 @@ class FolderRole(Base):
     role_id = Column(Integer, primary_key=True)
     access_level = Column(String)
 
+    __table_args__ = (Index("ix_folder_role_role_id", "role_id"),)
+
 
 class FileRole(Base):
     __tablename__ = "file_role"
     file_id = Column(Integer, primary_key=True)
     role_id = Column(Integer, primary_key=True)
     access_level = Column(String)
+
+    __table_args__ = (Index("ix_file_role_role_id", "role_id"),)
@@ -1,113 +1,360 @@
 import os
+import re
 import json
+import mimetypes
 import urllib.parse
-from typing import List
+from typing import List, Literal, Optional
 from database import get_db
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
-from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-
-from services import files_services
-#from models.model import File as FileModel
-from schemas.file_schema import FileCreate, FileUpdate, FileResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse, RedirectResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Query
+
+from services import files_services, permissions_services, search_services
+from services.blobs_services import blob_key, get_stored_blobs
+from storage import StorageBackend, get_storage
+from storage.streaming import iter_stream
+from models.model import File as FileModel
+from schemas.file_schema import (
+    FileCreate,
+    FileUpdate,
+    FileResponse,
+    FileFilter,
+    FilePage,
+    FileWithOwnerResponse,
+    FileWithOwnerPage,
+    FileSearchResult,
+    FileSearchPage,
+    PresignUploadRequest,
+    PresignedUpload,
+    PresignMultipartRequest,
+    PresignedMultipartUpload,
+    CompleteMultipartRequest,
+    AbortMultipartRequest,
+    FinalizeUploadRequest,
+    BatchUploadResult,
+    BatchUploadResponse,
+    BulkDeleteRequest,
+    BulkDeleteResponse,
+    SHA256_PATTERN,
+)
 from utils.files_managment import (
-    save_file_temporarily,
+    build_file_record,
+    digest_upload_file,
+    iter_upload_file,
     prepare_data_for_db,
 )
-
-load_dotenv()
-s3_bucket_name = os.getenv("S3_BUCKET")
+from utils.multipart_stream import MultipartFileStream
+from utils.concurrency import run_blocking
+from utils.auth import get_current_user
+from utils.access import require_folder_write, require_object_write
+from schemas.user_schema import CurrentUser
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.cache import make_cache_key, get_all_cache_stats
+from utils.http_range import RangeNotSatisfiable, parse_range, etag_matches
 
 router = APIRouter()
 
-@router.get("/get-files/", response_model=List[FileResponse])
-def get_all_files(db: Session = Depends(get_db)):
-    """Get all files from the database.
+
+def page_payload(files: list, next_cursor: Optional[str], schema=FileResponse) -> dict:
+    """Serialises a page of files once, so it can be cached and returned as is."""
+    return {
+        "items": [schema.model_validate(file).model_dump(mode="json") for file in files],
+        "next_cursor": next_cursor,
+    }
+
+
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Get the hit rate and size of the response caches of this process.
+
+    Returns:
+        dict: One entry per cache namespace.
+    """
+    return {"caches": get_all_cache_stats()}
+
+
+@router.get("/get-files/", response_model=FilePage)
+def get_all_files(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort_by: str = "uploaded_at",
+    order: Literal["asc", "desc"] = "desc",
+    filters: FileFilter = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a page of the files the user can read, filtered and sorted in SQL.
     
     Args:
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        sort_by (str): Column to sort by (uploaded_at, file_name, file_type, size_bytes, file_id)
+        order (str): "asc" or "desc"
+        filters (FileFilter): Owner, type, folder, upload date and size range filters
+        current_user (CurrentUser): The authenticated user
         db (Session): SQLAlchemy session object
         
     Returns:
-        List[File]: a list of File objects
+        FilePage: The files of the page and the cursor of the next one
         
     Raises:
+        HTTPException: If the sort key is not supported.
         HTTPException: If there is an error during the retrieval.
     """
     try:
-        all_files = files_services.get_all_files(db)
-        if not all_files:
+        cache_key = make_cache_key(
+            "get-files", limit=limit, cursor=cursor, sort_by=sort_by, order=order,
+            filters=filters.model_dump(mode="json"),
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
+
+        files, next_cursor = files_services.get_files_page(
+            db, sort_by, order == "desc", limit, cursor, filters, viewer=current_user
+        )
+        if not files and cursor is None:
             raise HTTPException(status_code=404, detail="No files found")
 
-        return all_files
-        
+        page = page_payload(files, next_cursor)
+        files_services.files_cache.set(cache_key, page)
+        return page
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"{str(e)}")
+
+@router.get("/get-files-with-owner/", response_model=FileWithOwnerPage)
+def get_all_files_with_owner(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort_by: str = "uploaded_at",
+    order: Literal["asc", "desc"] = "desc",
+    filters: FileFilter = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Same as ``/get-files/`` but every file also carries its owner's username
+    and full name and its folder name, joined in the same SQL query.
+
+    Args:
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        sort_by (str): Column to sort by (uploaded_at, file_name, file_type, size_bytes, file_id)
+        order (str): "asc" or "desc"
+        filters (FileFilter): Owner, type, folder, upload date and size range filters
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FileWithOwnerPage: The files of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If the sort key is not supported.
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        cache_key = make_cache_key(
+            "get-files-with-owner", limit=limit, cursor=cursor, sort_by=sort_by,
+            order=order, filters=filters.model_dump(mode="json"),
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
+
+        files, next_cursor = files_services.get_files_page(
+            db, sort_by, order == "desc", limit, cursor, filters,
+            with_owner=True, viewer=current_user,
+        )
+        if not files and cursor is None:
+            raise HTTPException(status_code=404, detail="No files found")
+
+        page = page_payload(files, next_cursor, FileWithOwnerResponse)
+        files_services.files_cache.set(cache_key, page)
+        return page
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{str(e)}")
 
 # {BASE_URL}/files/get-files-filter/{select_filter}/{select_order}
-@router.get("/get-files-by-filter/{select_filter}/{select_order}", response_model=List[FileResponse])
+@router.get("/get-files-by-filter/{select_filter}/{select_order}", response_model=FilePage)
 def get_files_by_filter(
     select_filter: str,
     select_order: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get files from the database based on filter and order.
+    """Get a page of the files the user can read based on filter and order.
 
     Args:
         select_filter (str): Filter criteria for the files
         select_order (str): Order criteria for the files
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        current_user (CurrentUser): The authenticated user
         db (Session): SQLAlchemy session object
 
     Returns:
-        List[File]: List of File objects matching the filter and order
+        FilePage: The files of the page and the cursor of the next one
 
     Raises:
+        HTTPException: If the filter is not supported.
         HTTPException: If there is an error during the retrieval.
     """
     try:
-        all_files = files_services.get_files_by_filter(
-            db, select_filter, select_order
+        cache_key = make_cache_key(
+            "get-files-by-filter", filter=select_filter, order=select_order,
+            limit=limit, cursor=cursor, scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
+
+        files, next_cursor = files_services.get_files_by_filter(
+            db, select_filter, select_order, limit, cursor, viewer=current_user
         )
-        if not all_files:
+        if not files and cursor is None:
             raise HTTPException(status_code=404, detail="No files found")
 
-        return all_files
+        page = page_payload(files, next_cursor)
+        files_services.files_cache.set(cache_key, page)
+        return page
 
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{str(e)}")
 
-@router.get("/get-files-user-id/{user_id}", response_model=List[FileResponse])
-def get_files_by_user_id(user_id: int, db: Session = Depends(get_db)):
-    """Get all files owned by a specific user.
+@router.get("/get-files-user-id/{user_id}", response_model=FilePage)
+def get_files_by_user_id(
+    user_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a page of the files owned by a specific user that the caller can read.
 
     Args:
         user_id (int): ID of the user whose files to retrieve
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        current_user (CurrentUser): The authenticated user
         db (Session): SQLAlchemy session object
 
     Returns:
-        List[File]: List of File objects owned by the user
+        FilePage: The files of the page and the cursor of the next one
 
     Raises:
         HTTPException: If there is an error during the retrieval.
     """
     try:
-        user_files = files_services.get_files_by_user_id(db, user_id)
+        cache_key = make_cache_key(
+            "get-files-user-id", user_id=user_id, limit=limit, cursor=cursor,
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
 
-        if not user_files:
+        user_files, next_cursor = files_services.get_files_by_user_id(
+            db, user_id, limit, cursor, viewer=current_user
+        )
+
+        if not user_files and cursor is None:
             raise HTTPException(status_code=404, detail="No files found for this user")
 
-        return user_files
+        page = page_payload(user_files, next_cursor)
+        files_services.files_cache.set(cache_key, page)
+        return page
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"{str(e)}")
 
 
+# {BASE_URL}/files/search-by-name?q=invoce&mode=fuzzy
+@router.get("/search-by-name", response_model=FileSearchPage)
+def search_files_by_name(
+    q: str = Query(..., min_length=1, max_length=200),
+    mode: Literal["prefix", "contains", "fuzzy"] = "fuzzy",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    filters: FileFilter = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a page of the files the user can read whose name matches ``q``, best match first.
+
+    Exact names rank first, then prefixes, then substrings, then typo-tolerant
+    matches (``fuzzy`` only); each file carries its ``score``.
+
+    Args:
+        q (str): The text to search, case-insensitive
+        mode (str): "prefix", "contains" or "fuzzy"
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        filters (FileFilter): Owner, type, folder, upload date and size range filters
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FileSearchPage: The files of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If the search is empty (400) or if there is an error during the search.
+    """
+    try:
+        cache_key = make_cache_key(
+            "search-by-name", q=q.strip().lower(), mode=mode, limit=limit, cursor=cursor,
+            filters=filters.model_dump(mode="json"),
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
+
+        files, next_cursor = search_services.search_files_by_name(
+            db, q, mode, limit, cursor, filters, viewer=current_user
+        )
+        page = page_payload(files, next_cursor, FileSearchResult)
+        files_services.files_cache.set(cache_key, page)
+        return page
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching files. {str(e)}")
+
+
 @router.get("/get-file-name/{file_name}", response_model=FileResponse)
-def get_file_by_name_in_db(file_name: str, db: Session = Depends(get_db)):
+def get_file_by_name_in_db(
+    file_name: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     """This function is used to get a file by its name from the database.
 
     Args:
         file_name (str): The name of the file to be retrieved.
+        current_user (CurrentUser): The authenticated user; needs read access.
         db (Session): SQLAlchemy session object.
 
     Returns:
@@ -118,86 +365,372 @@ def get_file_by_name_in_db(file_name: str, db: Session = Depends(get_db)):
         HTTPException: If there is an error during the retrieval.
     """
     try:
+        cache_key = make_cache_key(
+            "get-file-name", file_name=file_name,
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, file_data = files_services.files_cache.get(cache_key)
+        if hit:
+            return file_data
+
         file_data = files_services.get_file_by_name_in_db(db, file_name)
 
-        if not file_data:
+        # Sin permiso de lectura se responde igual que si no existiera
+        if not file_data or (
+            permissions_services.get_file_access_level(db, current_user, file_data.file_id)
+            < permissions_services.READ
+        ):
             raise HTTPException(status_code=404, detail="File not found")
 
+        file_data = FileResponse.model_validate(file_data).model_dump(mode="json")
+        files_services.files_cache.set(cache_key, file_data)
         return file_data
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving file: {str(e)}")
 
 
 
+@router.api_route("/{file_id}/content", methods=["GET", "HEAD"])
+async def get_file_content(
+    file_id: int,
+    request: Request,
+    redirect: bool = False,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Download the content of a file, streamed from storage chunk by chunk.
+
+    Supports ``HEAD``, single ``Range`` requests (206, with ``If-Range``) and
+    ``If-None-Match`` (304). With ``redirect=true`` it answers 302 to a
+    short-lived presigned GET instead, so the bytes skip the API entirely.
+
+    Args:
+        file_id (int): ID of the file to download.
+        request (Request): The incoming request, for the conditional headers.
+        redirect (bool): Redirect to a presigned URL instead of proxying.
+        current_user (CurrentUser): The authenticated user; needs read access.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        StreamingResponse | Response | RedirectResponse: The content, or the redirect.
+
+    Raises:
+        HTTPException: If the file or its object does not exist, or the user cannot read it (404).
+        HTTPException: If the range cannot be satisfied (416).
+    """
+    try:
+        file = await run_blocking(files_services.get_file_by_id, db, file_id)
+        # Sin permiso de lectura se responde igual que si no existiera
+        if file is None or (
+            (await run_blocking(
+                permissions_services.get_file_access_levels, db, current_user, [file]
+            ))[file.file_id]
+            < permissions_services.READ
+        ):
+            raise HTTPException(status_code=404, detail="File not found")
+        key = files_services.storage_key(file)
+        download_name = f"{file.file_name}{file.file_type}"
+
+        if redirect:
+            require_presign(storage)
+            url = await run_blocking(storage.presign_get, key, files_services.presign_expires_in)
+            return RedirectResponse(url, status_code=302)
+
+        info = await run_blocking(storage.head, key)
+        if info is None:
+            raise HTTPException(status_code=404, detail="File content not found in storage")
+
+        headers = {
+            "ETag": f'"{info.etag}"',
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f"attachment; filename*=UTF-8''{urllib.parse.quote(download_name)}",
+        }
+        if info.last_modified is not None:
+            headers["Last-Modified"] = info.last_modified.strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+        if etag_matches(request.headers.get("if-none-match"), info.etag):
+            return Response(status_code=304, headers=headers)
+
+        byte_range = None
+        if_range = request.headers.get("if-range")
+        if if_range is None or etag_matches(if_range, info.etag):
+            try:
+                byte_range = parse_range(request.headers.get("range"), info.size)
+            except RangeNotSatisfiable:
+                raise HTTPException(
+                    status_code=416,
+                    detail="Range not satisfiable",
+                    headers={"Content-Range": f"bytes */{info.size}"},
+                )
+
+        status_code = 200
+        start, end = 0, info.size - 1
+        if byte_range is not None:
+            status_code = 206
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+        headers["Content-Length"] = str(end - start + 1)
+
+        media_type = mimetypes.guess_type(download_name)[0] or "application/octet-stream"
+        if request.method == "HEAD" or info.size == 0:
+            return Response(status_code=status_code, headers=headers, media_type=media_type)
+
+        return StreamingResponse(
+            iter_stream(
+                storage,
+                key,
+                start if byte_range else None,
+                end if byte_range else None,
+                files_services.download_chunk_size,
+            ),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+        )
+
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error downloading file: {str(e)}")
+
+
 @router.post("/upload-register-file", response_model=FileResponse)
 async def upload_and_register_file(
     uploaded_file: UploadFile = File(...),
     folder_id: int = Form(1),
-    owner_id: int = Form(1),
+    sha256: Optional[str] = Form(None, pattern=SHA256_PATTERN),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
 ):
-    """This function first registers the file in the database and then uploads the file to S3.
+    """This function uploads the file to S3 and then registers it in the database.
+
+    The content is stored once per SHA-256 (see ``blobs``). The file is read
+    once: hashed while it streams to a temporary key, then copied inside S3 to
+    its blob unless that content is already stored (see
+    ``files_services.promote_staged_upload``). A client that sends the
+    ``sha256`` of a content already stored skips the upload to S3: the file
+    is only hashed to check it.
 
     Args:
         uploaded_file (UploadFile): The uploaded file.
         folder_id (int): The folder ID where the file is categorized.
+        sha256 (Optional[str]): SHA-256 of the file, computed by the client.
+        current_user (CurrentUser): The authenticated user, owner of the file.
         db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
 
     Returns:
         JSONResponse: A response indicating success or failure.
 
     Raises:
+        HTTPException: If the file does not match the declared SHA-256 (400).
+        HTTPException: If the user cannot write in the folder (403).
         HTTPException: If there is an error during the upload or database operation.
     """
+    staging_key = None
     try:
-        # Luego subir a S3
-        await upload_file_to_s3(uploaded_file=uploaded_file)
+        await run_blocking(require_folder_write, db, current_user, folder_id)
+        if sha256 is not None and await run_blocking(get_stored_blobs, db, [sha256.lower()]):
+            digest = await digest_upload_file(uploaded_file, files_services.s3_part_size)
+            if digest.sha256 != sha256.lower():
+                raise HTTPException(
+                    status_code=400, detail="The file does not match the declared SHA-256"
+                )
+            file = await files_services.register_stored_content(
+                db, storage, digest.sha256, uploaded_file.filename, folder_id,
+                current_user.user_id, digest.as_metadata(),
+            )
+            if file is not None:
+                return JSONResponse(
+                    status_code=201,
+                    content={"message": "File registered in DB; its content was already in S3"},
+                )
 
-        # Primero registrar en DB
-        await register_file_in_db(
-            uploaded_file=uploaded_file, folder_id=folder_id, owner_id=owner_id, db=db
+        await uploaded_file.seek(0)
+        staging_key, digest = await files_services.stage_upload(
+            storage, iter_upload_file(uploaded_file), sha256
+        )
+        _, copied = await files_services.promote_staged_upload(
+            db, storage, staging_key, digest, uploaded_file.filename, folder_id,
+            current_user.user_id,
         )
 
         return JSONResponse(
             status_code=201,
             content={
                 "message": "File registered in DB and uploaded to S3 successfully"
+                if copied
+                else "File registered in DB; its content was already in S3"
             },
         )
 
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to register and upload file: {str(e)}"
         )
+    finally:
+        if staging_key is not None:
+            try:
+                await run_blocking(storage.delete, staging_key)
+            except Exception:
+                pass
+
+
+@router.post("/upload-register-files", response_model=BatchUploadResponse)
+async def upload_and_register_files(
+    uploaded_files: List[UploadFile] = File(...),
+    folder_id: int = Form(1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Batch variant of ``/upload-register-file``.
+
+    Every distinct content not stored yet is uploaded once, concurrently
+    (``BATCH_UPLOAD_CONCURRENCY`` at a time), and the files whose content made
+    it are registered together with a bulk INSERT in a single transaction.
+
+    Args:
+        uploaded_files (List[UploadFile]): The files, at most MAX_BATCH_UPLOAD_FILES.
+        folder_id (int): The folder ID where the files are categorized.
+        current_user (CurrentUser): The authenticated user, owner of the files.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        JSONResponse: Per-file results; 201 if every file was stored, 207 otherwise.
+
+    Raises:
+        HTTPException: If the batch is too large (413).
+        HTTPException: If the user cannot write in the folder (403).
+    """
+    if len(uploaded_files) > files_services.MAX_BATCH_UPLOAD_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {files_services.MAX_BATCH_UPLOAD_FILES} files per batch",
+        )
+    await run_blocking(require_folder_write, db, current_user, folder_id)
+
+    try:
+        results = [
+            {"file_name": uploaded_file.filename, "status": "failed"}
+            for uploaded_file in uploaded_files
+        ]
+
+        # Los archivos se buscan y borran por nombre: no se admiten dos iguales en un lote
+        seen, to_upload = set(), []
+        for index, uploaded_file in enumerate(uploaded_files):
+            if uploaded_file.filename in seen:
+                results[index]["error"] = "Duplicate file name in batch"
+            else:
+                seen.add(uploaded_file.filename)
+                to_upload.append(index)
+
+        # Contenidos repetidos, en el lote o ya guardados, se suben una sola vez
+        digests, writers = {}, {}
+        for index in to_upload:
+            digests[index] = await digest_upload_file(
+                uploaded_files[index], files_services.s3_part_size
+            )
+            writers.setdefault(
+                digests[index].sha256,
+                files_services.upload_file_writer(storage, uploaded_files[index]),
+            )
+        written, errors = await files_services.store_blobs(db, writers)
+
+        uploaded, records = [], []
+        for index in to_upload:
+            sha256 = digests[index].sha256
+            if sha256 in errors:
+                results[index]["error"] = errors[sha256]
+                continue
+            uploaded.append(index)
+            records.append(
+                FileCreate(
+                    **build_file_record(
+                        storage, uploaded_files[index].filename, digests[index].as_metadata(),
+                        folder_id, current_user.user_id, blob_key=blob_key(sha256),
+                    )
+                )
+            )
+
+        # Si el registro falla, los blobs recién subidos se quedan en storage: otra
+        # petición puede estar subiendo el mismo contenido a la misma clave
+        try:
+            new_files, _ = await files_services.register_blob_files(db, records, writers, written)
+        except Exception as e:
+            for index in uploaded:
+                results[index]["error"] = f"Failed to register file in DB: {str(e)}"
+            new_files = []
+
+        for index, new_file in zip(uploaded, new_files):
+            results[index].update(status="uploaded", file_id=new_file.file_id)
+
+        uploaded_count = len(new_files)
+        return JSONResponse(
+            status_code=201 if uploaded_count == len(uploaded_files) else 207,
+            content={
+                "uploaded": uploaded_count,
+                "failed": len(uploaded_files) - uploaded_count,
+                "results": [BatchUploadResult(**result).model_dump() for result in results],
+            },
+        )
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to register and upload files: {str(e)}"
+        )
 
 
 @router.post("/register-file-in-db", response_model=FileResponse)
 async def register_file_in_db(
     uploaded_file: UploadFile = File(...),
     folder_id: int = Form(1),
-    owner_id: int = Form(1),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
 ):
     """This function is used to register a file in the database.
 
     Args:
         uploaded_file (UploadFile): The uploaded file.
         folder_id (int): The folder ID where the file is categorized.
-        owner_id (int): The ID of the owner of the file.
+        current_user (CurrentUser): The authenticated user, owner of the file.
         db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
 
     Returns:
         JSONResponse: A response indicating success or failure.
 
     Raises:
+        HTTPException: If the name is reserved (400).
+        HTTPException: If the user cannot write in the folder (403).
         HTTPException: If there is an error during the registration.
     """
     try:
-        data_to_save_db = await prepare_data_for_db(uploaded_file, folder_id, owner_id)
+        files_services.check_file_name(uploaded_file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    await run_blocking(require_folder_write, db, current_user, folder_id)
+
+    try:
+        data_to_save_db = await prepare_data_for_db(
+            storage, uploaded_file, folder_id, current_user.user_id,
+            files_services.s3_part_size,
+        )
 
         file_data = FileCreate(**data_to_save_db)
-        files_services.create_file_to_db(db, file_data)
+        await run_blocking(files_services.create_file_to_db, db, file_data)
 
         return JSONResponse(
             status_code=201,
@@ -213,24 +746,39 @@ async def register_file_in_db(
 @router.post("/upload-file-to-s3")
 async def upload_file_to_s3(
     uploaded_file: UploadFile = File(...),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
 ):
     """This function is used to upload a file to S3.
 
+    Overwriting the object of a registered file needs write access on it.
+
     Args:
         uploaded_file (UploadFile): The uploaded file.
+        current_user (CurrentUser): The authenticated user.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
 
     Returns:
         JSONResponse: A response indicating success or failure.
 
     Raises:
+        HTTPException: If the name is reserved (400).
+        HTTPException: If the user cannot write the file registered under the name (403).
         HTTPException: If there is an error during the upload.
     """
     try:
-        temp_file_path = save_file_temporarily(uploaded_file)
+        files_services.check_file_name(uploaded_file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    await run_blocking(require_object_write, db, current_user, uploaded_file.filename, False)
 
-        is_upload = files_services.upload_file_to_s3(
-            temp_file_path,
-            s3_bucket_name,
+    try:
+        await uploaded_file.seek(0)
+        is_upload = await files_services.upload_stream_to_storage(
+            storage,
+            iter_upload_file(uploaded_file),
             uploaded_file.filename,
         )
 
@@ -242,13 +790,312 @@ async def upload_file_to_s3(
             content={"message": "File uploaded to S3 successfully"},
         )
 
-    except Exception:
+    except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
 
-@router.delete("/delete-file/{file_id}/{file_name}/{user_id}")
+@router.post("/upload-register-file-stream", response_model=FileResponse)
+async def upload_and_register_file_stream(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Streaming variant of ``/upload-register-file``.
+
+    Takes the same multipart form (``uploaded_file``, ``folder_id``,
+    ``sha256``) but pipes the file part straight from the request body into
+    a storage multipart upload, so nothing is staged in memory or in /tmp.
+    The SHA-256 is only known at the end, so the content goes to a temporary
+    key first and is then copied inside storage to its blob, unless that blob
+    already exists. ``folder_id`` (1 if missing) must come before the file,
+    so write access is checked before anything is stored; sending ``sha256``
+    before the file too lets a content already stored skip the upload: the
+    file part is not read.
+
+    Args:
+        request (Request): The incoming multipart/form-data request.
+        current_user (CurrentUser): The authenticated user, owner of the file.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        JSONResponse: A response indicating success or failure.
+
+    Raises:
+        HTTPException: If the body is malformed or does not match the declared SHA-256 (400).
+        HTTPException: If the user cannot write in the folder (403).
+        HTTPException: If the upload/registration fails.
+    """
+    staging_key = None
+    try:
+        stream = MultipartFileStream(request, "uploaded_file")
+        filename = await stream.open()
+        folder_id = int(stream.fields.get("folder_id", 1))
+        sha256 = stream.fields.get("sha256")
+        if sha256 is not None and not re.fullmatch(SHA256_PATTERN, sha256):
+            raise HTTPException(status_code=400, detail="Invalid SHA-256")
+        await run_blocking(require_folder_write, db, current_user, folder_id)
+
+        if sha256 is not None:
+            file = await files_services.register_stored_content(
+                db, storage, sha256, filename, folder_id, current_user.user_id,
+            )
+            if file is not None:
+                return JSONResponse(
+                    status_code=201,
+                    content={"message": "File registered in DB; its content was already in S3"},
+                )
+
+        staging_key, digest = await files_services.stage_upload(
+            storage, stream.iter_file(), sha256
+        )
+        # La carpeta ya se validó: no se acepta otra en los campos tras el archivo
+        if int(stream.fields.get("folder_id", folder_id)) != folder_id:
+            raise ValueError("folder_id must be sent before the file")
+        _, copied = await files_services.promote_staged_upload(
+            db, storage, staging_key, digest, filename, folder_id, current_user.user_id,
+        )
+
+        return JSONResponse(
+            status_code=201,
+            content={
+                "message": "File registered in DB and uploaded to S3 successfully"
+                if copied
+                else "File registered in DB; its content was already in S3"
+            },
+        )
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to register and upload file: {str(e)}"
+        )
+    finally:
+        if staging_key is not None:
+            try:
+                await run_blocking(storage.delete, staging_key)
+            except Exception:
+                pass
+
+
+def require_presign(storage: StorageBackend) -> None:
+    if not storage.supports_presign:
+        raise HTTPException(
+            status_code=501,
+            detail=f"The '{storage.name}' storage backend does not support direct uploads",
+        )
+
+
+@router.post("/presign-upload", response_model=PresignedUpload)
+def presign_upload(
+    request: PresignUploadRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Get a presigned URL to PUT a file straight to storage (up to 5 GB).
+
+    Once the PUT succeeds, call ``/finalize-upload`` with the ``upload_token``
+    to register the file. With the SHA-256 of a content already stored, the
+    response has ``content_stored`` and no URL: skip the PUT and finalize.
+
+    Args:
+        request (PresignUploadRequest): File name (extension included), optional size and SHA-256.
+        current_user (CurrentUser): The authenticated user, owner of the file.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        PresignedUpload: The URL, HTTP method, validity in seconds and upload token.
+
+    Raises:
+        HTTPException: If the backend does not support presigned URLs (501).
+        HTTPException: If the file is too large or the name is reserved (400),
+            or a file with that name already exists (409).
+    """
+    require_presign(storage)
+    try:
+        return files_services.presign_upload(
+            db, storage, current_user.user_id, request.file_name, request.size_bytes,
+            request.sha256,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error presigning upload: {str(e)}")
+
+
+@router.post("/presign-multipart-upload", response_model=PresignedMultipartUpload)
+def presign_multipart_upload(
+    request: PresignMultipartRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Start a multipart upload and get one presigned URL per part.
+
+    The client PUTs slice ``n`` (``part_size`` bytes, the last one shorter) to
+    the URL of part ``n``, then calls ``/complete-multipart-upload`` with the
+    key, the upload token and the ETag of every part and finally ``/finalize-upload``. With the
+    SHA-256 of a content already stored, the response has ``content_stored``
+    and no parts: skip straight to ``/finalize-upload``.
+
+    Args:
+        request (PresignMultipartRequest): File name (extension included), size and optional SHA-256.
+        current_user (CurrentUser): The authenticated user, owner of the file.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        PresignedMultipartUpload: The key, upload ID, part size, part URLs and upload token.
+
+    Raises:
+        HTTPException: If the backend does not support presigned URLs (501).
+        HTTPException: If the name is reserved (400) or a file with that name
+            already exists (409).
+    """
+    require_presign(storage)
+    try:
+        return files_services.presign_multipart_upload(
+            db, storage, current_user.user_id, request.file_name, request.size_bytes,
+            request.sha256,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error presigning upload: {str(e)}")
+
+
+@router.post("/complete-multipart-upload")
+def complete_multipart_upload(
+    request: CompleteMultipartRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Assemble the parts of a presigned multipart upload.
+
+    Args:
+        request (CompleteMultipartRequest): Key, upload ID, upload token and the ETag of every part.
+        current_user (CurrentUser): The authenticated user; the upload must be presigned for them.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        JSONResponse: The ETag of the assembled object.
+
+    Raises:
+        HTTPException: If the upload was not presigned for this user (403).
+        HTTPException: If the parts cannot be assembled.
+    """
+    require_presign(storage)
+    try:
+        files_services.read_upload_token(request.upload_token, current_user.user_id, request.key)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=f"{str(e)}")
+
+    try:
+        etag = files_services.complete_multipart_upload(
+            storage, request.key, request.upload_id, request.parts
+        )
+        return JSONResponse(status_code=200, content={"key": request.key, "etag": etag})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error completing upload: {str(e)}")
+
+
+@router.post("/abort-multipart-upload")
+def abort_multipart_upload(
+    request: AbortMultipartRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Cancel a presigned multipart upload and discard its parts.
+
+    Args:
+        request (AbortMultipartRequest): Key, upload ID and upload token.
+        current_user (CurrentUser): The authenticated user; the upload must be presigned for them.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        JSONResponse: A response indicating success or failure.
+
+    Raises:
+        HTTPException: If the upload was not presigned for this user (403).
+    """
+    require_presign(storage)
+    try:
+        files_services.read_upload_token(request.upload_token, current_user.user_id, request.key)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=f"{str(e)}")
+
+    try:
+        files_services.abort_multipart_upload(storage, request.key, request.upload_id)
+        return JSONResponse(status_code=200, content={"message": "Upload aborted"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error aborting upload: {str(e)}")
+
+
+@router.post("/finalize-upload", response_model=FileResponse)
+async def finalize_upload(
+    request: FinalizeUploadRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Register a file uploaded through presigned URLs.
+
+    The file is registered at once, served from its temporary key; a
+    background job hashes the content and moves it to its blob (see
+    ``files_services.promote_staged_file``), so the bytes never go through
+    the API.
+
+    Args:
+        request (FinalizeUploadRequest): Upload token, folder and optional SHA-256.
+        current_user (CurrentUser): The authenticated user, owner of the file.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        FileResponse: The registered file.
+
+    Raises:
+        HTTPException: If the upload was not presigned for this user, or the
+            user cannot write in the folder (403).
+        HTTPException: If the object is not in storage (404).
+        HTTPException: If another file is registered under the same name (409).
+    """
+    try:
+        await run_blocking(require_folder_write, db, current_user, request.folder_id)
+        file = await files_services.finalize_upload(db, storage, request, current_user.user_id)
+        if file is None:
+            raise HTTPException(status_code=404, detail="Object not found in storage")
+        return file
+
+    except HTTPException as e:
+        raise e
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=f"{str(e)}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to register file: {str(e)}")
+
+
+@router.delete("/delete-file/{file_id}/{file_name}")
 def delete_file(
-    file_id: int, file_name: str, user_id: int, db: Session = Depends(get_db)
+    file_id: int,
+    file_name: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
 ):
     """
     Delete a file from the database and S3. If deletion from S3 fails, restore DB record.
@@ -256,8 +1103,9 @@ def delete_file(
     Args:
         file_id (int): ID of the file to delete.
         file_name (str): Name of the file.
-        user_id (int): ID of the user requesting deletion.
+        current_user (CurrentUser): The authenticated user requesting deletion.
         db (Session): DB session.
+        storage (StorageBackend): Storage backend.
 
     Returns:
         JSONResponse
@@ -273,6 +1121,7 @@ def delete_file(
         file_backup = {
             "file_name": file.file_name,
             "file_metadata": file.file_metadata,
+            "size_bytes": file.size_bytes,
             "file_type": file.file_type,
             "folder_id": file.folder_id,
             "owner_id": file.owner_id,
@@ -280,19 +1129,32 @@ def delete_file(
             "uploaded_at": file.uploaded_at,
         }
         file_name_extension = f"{file_backup['file_name']}{file_backup['file_type']}"
-        
-        result, message = files_services.delete_file_from_db(db, file_id, user_id)
+        by_name = file.blob_sha256 is None and file.staging_key is None
+        # Un archivo por nombre bajo un prefijo reservado no es dueño de ese objeto
+        owns_object = by_name and not files_services.is_reserved_key(file_name_extension)
+
+        # Un blob solo se borra de S3 cuando ningún otro archivo lo usa, y como
+        # el objeto temporal de una subida firmada sin blob, tras el commit
+        result, message = files_services.delete_file_from_db(
+            db, file_id, current_user, None if by_name else storage
+        )
         if result <= 0:
             raise HTTPException(status_code=403 if result == 0 else 500, detail=message)
+        if not owns_object:
+            return JSONResponse(
+                status_code=200,
+                content={"message": "File deleted successfully"},
+            )
 
-        s3_result = files_services.delete_file_from_s3(
-            db, s3_bucket_name, file_name_extension.strip()
+        s3_result = files_services.delete_file_from_storage(
+            db, storage, file_name_extension.strip()
         )
         if s3_result is None:
             try:
-                restored_file = File(**file_backup)
+                restored_file = FileModel(**file_backup)
                 db.add(restored_file)
                 db.commit()
+                files_services.invalidate_files_cache()
 
             except Exception as e:
                 db.rollback()
@@ -317,12 +1179,49 @@ def delete_file(
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
 
 
-@router.delete("/delete-file-from-db/{file_id}/{user_id}")
-def delete_file_fom_db(file_id: int, user_id, db: Session = Depends(get_db)):
+@router.post("/delete-files", response_model=BulkDeleteResponse)
+def delete_files(
+    request: BulkDeleteRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Delete many files from storage and the database at once.
+
+    Args:
+        request (BulkDeleteRequest): IDs of the files (at most MAX_BULK_DELETE_FILES).
+        current_user (CurrentUser): The authenticated user requesting the deletion.
+        db (Session): DB session.
+        storage (StorageBackend): Storage backend.
+
+    Returns:
+        JSONResponse: Per-file results; 200 if every file was deleted, 207 otherwise.
+
+    Raises:
+        HTTPException: If there is an unexpected error.
+    """
+    try:
+        results = files_services.delete_files_bulk(db, storage, request.file_ids, current_user)
+        deleted = sum(1 for result in results if result["status"] == "deleted")
+        return JSONResponse(
+            status_code=200 if deleted == len(results) else 207,
+            content={"deleted": deleted, "failed": len(results) - deleted, "results": results},
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+
+@router.delete("/delete-file-from-db/{file_id}")
+def delete_file_fom_db(
+    file_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     """This function is used to delete a file from the database.
 
     Args:
         file_id (int): The ID of the file to be deleted.
+        current_user (CurrentUser): The authenticated user requesting deletion.
         db (Session): SQLAlchemy session object.
 
     Returns:
@@ -334,7 +1233,7 @@ def delete_file_fom_db(file_id: int, user_id, db: Session = Depends(get_db)):
     """
 
     try:
-        flag = files_services.delete_file_from_db(db, file_id, user_id)
+        flag = files_services.delete_file_from_db(db, file_id, current_user)
 
         if flag[0] == 0:
             raise HTTPException(status_code=404, detail=f"{flag[1]}")
@@ -346,23 +1245,37 @@ def delete_file_fom_db(file_id: int, user_id, db: Session = Depends(get_db)):
 
 
 @router.delete("/delete-file-from-s3/{file_name}")
-def delete_file_fom_s3(file_name: str, db: Session = Depends(get_db)):
+def delete_file_fom_s3(
+    file_name: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    storage: StorageBackend = Depends(get_storage),
+):
     """This function is used to delete a file from S3.
 
+    Needs write access on the file registered under the name; objects
+    without a file can only be deleted by admins.
+
     Args:
         file_name (str): The name of the file to be deleted.
+        current_user (CurrentUser): The authenticated user requesting deletion.
+        db (Session): SQLAlchemy session object.
+        storage (StorageBackend): Storage backend.
 
     Returns:
         JSONResponse: A response indicating success or failure.
 
     Raises:
         HTTPException: If there is an error during the deletion.
-        HTTPException: If the file is not found in S3.
+        HTTPException: If the user cannot write the file (403).
+        HTTPException: If no file is registered under the name (404).
+        HTTPException: If the content of the file is a shared blob (409).
     """
 
     try:
-        response = files_services.delete_file_from_s3(
-            db, s3_bucket_name, file_name.strip()
+        require_object_write(db, current_user, file_name, True)
+        response = files_services.delete_file_from_storage(
+            db, storage, file_name.strip()
         )
 
         if response is None:
@@ -376,6 +1289,10 @@ def delete_file_fom_s3(file_name: str, db: Session = Depends(get_db)):
             content={"message": "File deleted successfully"},
         )
 
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=f"{str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting file. {str(e)}")
 
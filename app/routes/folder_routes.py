@@ -0,0 +1,270 @@
+from typing import Optional
+from database import get_db
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from services import folders_services
+from schemas.folder_schema import (
+    FolderCreate,
+    FolderRename,
+    FolderMove,
+    FolderResponse,
+    FolderPage,
+    FolderSubtree,
+    MAX_SUBTREE_FOLDERS,
+)
+from schemas.user_schema import CurrentUser
+from utils.auth import get_current_user
+from utils.access import require_folder_write
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+router = APIRouter()
+
+
+@router.get("/get-folder/{folder_id}", response_model=FolderResponse)
+def get_folder_by_id(folder_id: int, db: Session = Depends(get_db)):
+    """Get a folder by ID.
+
+    Args:
+        folder_id (int): ID of the folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderResponse: The folder
+
+    Raises:
+        HTTPException: If the folder is not found or if there is an error during the retrieval.
+    """
+    try:
+        folder = folders_services.get_folder_by_id(db, folder_id)
+        if not folder:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        return folder
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining folder. {str(e)}")
+
+
+@router.get("/get-root-folders", response_model=FolderPage)
+def get_root_folders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get a page of the folders without parent, sorted by name.
+
+    Args:
+        limit (int): Maximum number of folders in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderPage: The folders of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        folders, next_cursor = folders_services.get_children_page(db, None, limit, cursor)
+        return {"items": folders, "next_cursor": next_cursor}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining folders. {str(e)}")
+
+
+@router.get("/get-children/{folder_id}", response_model=FolderPage)
+def get_children(
+    folder_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get a page of the direct children of a folder, sorted by name.
+
+    Args:
+        folder_id (int): ID of the parent folder
+        limit (int): Maximum number of folders in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderPage: The folders of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        folders, next_cursor = folders_services.get_children_page(db, folder_id, limit, cursor)
+        return {"items": folders, "next_cursor": next_cursor}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining folders. {str(e)}")
+
+
+@router.get("/get-subtree/{folder_id}", response_model=FolderSubtree)
+def get_subtree(
+    folder_id: int,
+    max_depth: Optional[int] = Query(None, ge=0),
+    limit: int = Query(MAX_SUBTREE_FOLDERS, ge=1, le=MAX_SUBTREE_FOLDERS),
+    db: Session = Depends(get_db),
+):
+    """Get a folder and all its descendants, ordered by depth and name.
+
+    Args:
+        folder_id (int): ID of the root of the subtree
+        max_depth (Optional[int]): Levels below the folder to include (all by default)
+        limit (int): Maximum number of folders to return
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderSubtree: The folders and whether the list was cut at ``limit``
+
+    Raises:
+        HTTPException: If the folder is not found or if there is an error during the retrieval.
+    """
+    try:
+        folders, truncated = folders_services.get_subtree(db, folder_id, max_depth, limit)
+        if not folders:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        return {"folder_id": folder_id, "folders": folders, "truncated": truncated}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining subtree. {str(e)}")
+
+
+@router.get("/get-breadcrumbs/{folder_id}", response_model=list[FolderResponse])
+def get_breadcrumbs(folder_id: int, db: Session = Depends(get_db)):
+    """Get the folders from the root down to a folder, root first.
+
+    Args:
+        folder_id (int): ID of the folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        list[FolderResponse]: The ancestors and the folder itself
+
+    Raises:
+        HTTPException: If the folder is not found or if there is an error during the retrieval.
+    """
+    try:
+        folders = folders_services.get_breadcrumbs(db, folder_id)
+        if not folders:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        return folders
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining breadcrumbs. {str(e)}")
+
+
+@router.post("/create-folder", response_model=FolderResponse, status_code=201)
+def create_folder(
+    new_folder: FolderCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Create a folder, as a root or under a parent.
+
+    Args:
+        new_folder (FolderCreate): Name and parent of the folder
+        current_user (CurrentUser): The authenticated user; needs write access in the parent
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderResponse: The created folder
+
+    Raises:
+        HTTPException: If the user cannot write in the parent (403), if the
+            parent is not found (404) or if there is an error during the creation.
+    """
+    try:
+        require_folder_write(db, current_user, new_folder.parent_folder_id)
+        folder = folders_services.create_folder(db, new_folder)
+        if not folder:
+            raise HTTPException(status_code=404, detail="Parent folder not found")
+        return folder
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating folder. {str(e)}")
+
+
+@router.patch("/rename-folder/{folder_id}", response_model=FolderResponse)
+def rename_folder(
+    folder_id: int,
+    rename: FolderRename,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Rename a folder.
+
+    Args:
+        folder_id (int): ID of the folder
+        rename (FolderRename): The new name
+        current_user (CurrentUser): The authenticated user; needs write access in the folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderResponse: The renamed folder
+
+    Raises:
+        HTTPException: If the user cannot write in the folder (403), if it is
+            not found (404) or if there is an error during the update.
+    """
+    try:
+        require_folder_write(db, current_user, folder_id)
+        folder = folders_services.rename_folder(db, folder_id, rename.folder_name)
+        if not folder:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        return folder
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error renaming folder. {str(e)}")
+
+
+@router.patch("/move-folder/{folder_id}", response_model=FolderResponse)
+def move_folder(
+    folder_id: int,
+    move: FolderMove,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Move a folder, with all its subfolders, under another parent (or to the root).
+
+    The subtree inherits the rules of its new ancestors, so the user needs
+    write access both in the folder and in the new parent.
+
+    Args:
+        folder_id (int): ID of the folder to move
+        move (FolderMove): The new parent, null for the root
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderResponse: The moved folder
+
+    Raises:
+        HTTPException: If the user cannot write in the folder or the new parent
+            (403), if either is not found (404), if the move would create a
+            cycle (400) or if there is an error.
+    """
+    try:
+        require_folder_write(db, current_user, folder_id)
+        require_folder_write(db, current_user, move.parent_folder_id)
+        folder = folders_services.move_folder(db, folder_id, move.parent_folder_id)
+        if not folder:
+            raise HTTPException(status_code=404, detail="Folder not found")
+        return folder
+    except HTTPException as e:
+        raise e
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error moving folder. {str(e)}")
@@ -0,0 +1,97 @@
+from typing import Optional
+from database import get_db
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from services import jobs_services
+from schemas.job_schema import JobPage, JobResponse, JobStatus
+from utils.auth import require_admin
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from worker import get_in_process_worker
+
+router = APIRouter()
+
+
+@router.get("/stats", dependencies=[Depends(require_admin)])
+def get_job_stats(db: Session = Depends(get_db)):
+    """Get the size of the jobs queue and the counters of the worker of this process.
+
+    Args:
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        dict: ``queue`` (jobs per type and status, age of the oldest due job) and
+        ``worker`` (None if this process does not run one, see JOBS_IN_PROCESS)
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        worker = get_in_process_worker()
+        return {
+            "queue": jobs_services.get_job_stats(db),
+            "worker": worker.stats() if worker is not None else None,
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining job stats. {str(e)}")
+
+
+@router.get("/get-jobs", response_model=JobPage, dependencies=[Depends(require_admin)])
+def get_jobs(
+    status: Optional[JobStatus] = None,
+    job_type: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get a page of jobs, newest first.
+
+    Args:
+        status (Optional[str]): Only jobs in this status (pending, running, done, failed)
+        job_type (Optional[str]): Only jobs of this type
+        limit (int): Maximum number of jobs in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JobPage: The jobs of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        jobs, next_cursor = jobs_services.get_jobs_page(db, status, job_type, limit, cursor)
+        return {"items": jobs, "next_cursor": next_cursor}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining jobs. {str(e)}")
+
+
+@router.post("/retry-job/{job_id}", response_model=JobResponse, dependencies=[Depends(require_admin)])
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    """Queue a failed job again, with a fresh set of attempts.
+
+    Args:
+        job_id (int): ID of the job
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JobResponse: The job, pending again
+
+    Raises:
+        HTTPException: If the job is not found, has not failed, or if there is an error.
+    """
+    try:
+        job = jobs_services.retry_job(db, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        return job
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrying job. {str(e)}")
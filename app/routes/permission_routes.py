@@ -0,0 +1,199 @@
+from typing import List
+from database import get_db
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from services import permissions_services
+from schemas.permission_schema import (
+    FolderRoleSet,
+    FileRoleSet,
+    FolderRoleResponse,
+    FileRoleResponse,
+    AccessLevelResponse,
+)
+from schemas.user_schema import CurrentUser
+from utils.auth import get_current_user, require_admin
+
+router = APIRouter()
+
+
+@router.get("/get-access-level/{file_id}", response_model=AccessLevelResponse)
+def get_access_level(
+    file_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the effective access level of the authenticated user on a file.
+
+    Args:
+        file_id (int): ID of the file
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        AccessLevelResponse: "none", "read", "write" or "admin"
+
+    Raises:
+        HTTPException: If the file is not found or if there is an error during the resolution.
+    """
+    try:
+        access_level = permissions_services.get_file_access_level(db, current_user, file_id)
+        if access_level is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        return {
+            "file_id": file_id,
+            "access_level": permissions_services.ACCESS_LEVEL_NAMES[access_level],
+        }
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error resolving access level. {str(e)}")
+
+
+@router.get(
+    "/get-folder-roles/{folder_id}",
+    response_model=List[FolderRoleResponse],
+    dependencies=[Depends(require_admin)],
+)
+def get_folder_roles(folder_id: int, db: Session = Depends(get_db)):
+    """Get the rules set directly on a folder (its subfolders and files inherit them).
+
+    Args:
+        folder_id (int): ID of the folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        List[FolderRoleResponse]: One rule per role
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        return permissions_services.get_folder_roles(db, folder_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining folder roles. {str(e)}")
+
+
+@router.get(
+    "/get-file-roles/{file_id}",
+    response_model=List[FileRoleResponse],
+    dependencies=[Depends(require_admin)],
+)
+def get_file_roles(file_id: int, db: Session = Depends(get_db)):
+    """Get the rules set directly on a file.
+
+    Args:
+        file_id (int): ID of the file
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        List[FileRoleResponse]: One rule per role
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        return permissions_services.get_file_roles(db, file_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining file roles. {str(e)}")
+
+
+@router.post(
+    "/set-folder-role", response_model=FolderRoleResponse, dependencies=[Depends(require_admin)]
+)
+def set_folder_role(rule: FolderRoleSet, db: Session = Depends(get_db)):
+    """Create or replace the access level of a role on a folder and its subtree.
+
+    Args:
+        rule (FolderRoleSet): Folder, role and access level
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderRoleResponse: The stored rule
+
+    Raises:
+        HTTPException: If the folder or role is not found or if there is an error.
+    """
+    try:
+        return permissions_services.set_folder_role(db, rule)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error setting folder role. {str(e)}")
+
+
+@router.post(
+    "/set-file-role", response_model=FileRoleResponse, dependencies=[Depends(require_admin)]
+)
+def set_file_role(rule: FileRoleSet, db: Session = Depends(get_db)):
+    """Create or replace the access level of a role on a file, over the folder rules.
+
+    Args:
+        rule (FileRoleSet): File, role and access level
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FileRoleResponse: The stored rule
+
+    Raises:
+        HTTPException: If the file or role is not found or if there is an error.
+    """
+    try:
+        return permissions_services.set_file_role(db, rule)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error setting file role. {str(e)}")
+
+
+@router.delete(
+    "/delete-folder-role/{folder_id}/{role_id}", dependencies=[Depends(require_admin)]
+)
+def delete_folder_role(folder_id: int, role_id: int, db: Session = Depends(get_db)):
+    """Remove the rule of a role on a folder.
+
+    Args:
+        folder_id (int): ID of the folder
+        role_id (int): ID of the role
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Response indicating the result of the deletion
+
+    Raises:
+        HTTPException: If the rule is not found or if there is an error during the deletion.
+    """
+    try:
+        if not permissions_services.delete_folder_role(db, folder_id, role_id):
+            raise HTTPException(status_code=404, detail="Folder role not found")
+        return JSONResponse(status_code=200, content={"message": "Folder role deleted successfully"})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting folder role. {str(e)}")
+
+
+@router.delete("/delete-file-role/{file_id}/{role_id}", dependencies=[Depends(require_admin)])
+def delete_file_role(file_id: int, role_id: int, db: Session = Depends(get_db)):
+    """Remove the rule of a role on a file.
+
+    Args:
+        file_id (int): ID of the file
+        role_id (int): ID of the role
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Response indicating the result of the deletion
+
+    Raises:
+        HTTPException: If the rule is not found or if there is an error during the deletion.
+    """
+    try:
+        if not permissions_services.delete_file_role(db, file_id, role_id):
+            raise HTTPException(status_code=404, detail="File role not found")
+        return JSONResponse(status_code=200, content={"message": "File role deleted successfully"})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting file role. {str(e)}")
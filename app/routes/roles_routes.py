@@ -8,6 +8,7 @@ from fastapi.responses import JSONResponse
 from fastapi import APIRouter, Depends, HTTPException, Form
 from schemas.role_schema import RoleCreate, RoleUpdate, RoleResponse
 from services import roles_service
+from utils.auth import require_admin
 
 router = APIRouter()
 
@@ -80,7 +81,7 @@ def get_role_by_name(role_name: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error obtaining roles. {str(e)}")
 
 
-@router.delete("/delete-role/{role_id}")
+@router.delete("/delete-role/{role_id}", dependencies=[Depends(require_admin)])
 def delete_user_by_id(role_id: int, db: Session = Depends(get_db)):
     """Delete a role by ID from the database.
 
@@ -104,7 +105,9 @@ def delete_user_by_id(role_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error deleting role. {str(e)}")
 
 
-@router.post("/create-role", response_model=RoleResponse)
+@router.post(
+    "/create-role", response_model=RoleResponse, dependencies=[Depends(require_admin)]
+)
 def create_role(new_role: RoleCreate, db: Session = Depends(get_db)):
     """Create a new role in the database.
 
@@ -131,7 +134,9 @@ def create_role(new_role: RoleCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error creating role: {str(e)}")
 
 
-@router.patch("/update-role/{role_id}", response_model=RoleResponse)
+@router.patch(
+    "/update-role/{role_id}", response_model=RoleResponse, dependencies=[Depends(require_admin)]
+)
 def update_role(role_id: int, update_role: RoleUpdate, db: Session = Depends(get_db)):
     """Update a role in the database.
 
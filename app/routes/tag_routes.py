@@ -0,0 +1,432 @@
+from typing import List, Literal, Optional
+from database import get_db
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from services import files_services, permissions_services, tags_services
+from schemas.file_schema import FileFilter, FilePage, FileResponse
+from schemas.folder_schema import FolderPage
+from schemas.tag_schema import (
+    TagCreate,
+    TagUpdate,
+    TagResponse,
+    TagPage,
+    BulkTagFilesRequest,
+    BulkTagFoldersRequest,
+    BulkTagResponse,
+)
+from schemas.user_schema import CurrentUser
+from utils.auth import get_current_user, require_admin
+from utils.cache import make_cache_key
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from utils.tag_query import parse_tag_query, format_tag_query
+
+router = APIRouter()
+
+
+def bulk_tag_response(results: list[dict], done_status: str) -> JSONResponse:
+    """200 if every item was updated, 207 with the per-item results otherwise."""
+    updated = sum(1 for result in results if result["status"] == done_status)
+    return JSONResponse(
+        status_code=200 if updated == len(results) else 207,
+        content={"updated": updated, "failed": len(results) - updated, "results": results},
+    )
+
+
+@router.get("/get-tags", response_model=TagPage)
+def get_tags(
+    prefix: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get a page of tags sorted by name.
+
+    Args:
+        prefix (Optional[str]): Only return the tags whose name starts with it
+        limit (int): Maximum number of tags in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        TagPage: The tags of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        tags, next_cursor = tags_services.get_tags_page(db, prefix, limit, cursor)
+        return {"items": tags, "next_cursor": next_cursor}
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining tags. {str(e)}")
+
+
+@router.get("/get-tag/{tag_id}", response_model=TagResponse)
+def get_tag_by_id(tag_id: int, db: Session = Depends(get_db)):
+    """Get a tag by ID.
+
+    Args:
+        tag_id (int): ID of the tag
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        TagResponse: The tag
+
+    Raises:
+        HTTPException: If the tag is not found or if there is an error during the retrieval.
+    """
+    try:
+        tag = tags_services.get_tag_by_id(db, tag_id)
+        if not tag:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        return tag
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining tag. {str(e)}")
+
+
+@router.post(
+    "/create-tag",
+    response_model=TagResponse,
+    status_code=201,
+    dependencies=[Depends(get_current_user)],
+)
+def create_tag(new_tag: TagCreate, db: Session = Depends(get_db)):
+    """Create a tag.
+
+    Args:
+        new_tag (TagCreate): Name and description of the tag
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        TagResponse: The created tag
+
+    Raises:
+        HTTPException: If the name is already in use or if there is an error during the creation.
+    """
+    try:
+        if tags_services.get_tag_by_name(db, new_tag.tag_name):
+            raise HTTPException(status_code=409, detail="Tag name already in use")
+        return tags_services.create_tag(db, new_tag)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating tag. {str(e)}")
+
+
+@router.patch(
+    "/update-tag/{tag_id}",
+    response_model=TagResponse,
+    dependencies=[Depends(require_admin)],
+)
+def update_tag(tag_id: int, tag_update: TagUpdate, db: Session = Depends(get_db)):
+    """Rename a tag or change its description (admins only: tags are shared).
+
+    Args:
+        tag_id (int): ID of the tag
+        tag_update (TagUpdate): Fields to update
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        TagResponse: The updated tag
+
+    Raises:
+        HTTPException: If the tag is not found, if the name is already in use
+            or if there is an error during the update.
+    """
+    try:
+        if tag_update.tag_name is not None:
+            existing = tags_services.get_tag_by_name(db, tag_update.tag_name)
+            if existing and existing.tag_id != tag_id:
+                raise HTTPException(status_code=409, detail="Tag name already in use")
+        tag = tags_services.update_tag(db, tag_id, tag_update)
+        if not tag:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        return tag
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating tag. {str(e)}")
+
+
+@router.delete("/delete-tag/{tag_id}", dependencies=[Depends(require_admin)])
+def delete_tag(tag_id: int, db: Session = Depends(get_db)):
+    """Delete a tag and remove it from every file and folder (admins only).
+
+    Args:
+        tag_id (int): ID of the tag
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Response indicating the result of the deletion
+
+    Raises:
+        HTTPException: If the tag is not found or if there is an error during the deletion.
+    """
+    try:
+        if not tags_services.delete_tag(db, tag_id):
+            raise HTTPException(status_code=404, detail="Tag not found")
+        return JSONResponse(status_code=200, content={"message": "Tag deleted successfully"})
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting tag. {str(e)}")
+
+
+@router.get("/get-file-tags/{file_id}", response_model=List[TagResponse])
+def get_file_tags(
+    file_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the tags of a file the user can read.
+
+    Args:
+        file_id (int): ID of the file
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        List[TagResponse]: The tags of the file, by name
+
+    Raises:
+        HTTPException: If the file is not found (or not readable) or if there is an error.
+    """
+    try:
+        access_level = permissions_services.get_file_access_level(db, current_user, file_id)
+        if access_level is None or access_level < permissions_services.READ:
+            raise HTTPException(status_code=404, detail="File not found")
+        return tags_services.get_file_tags(db, file_id)
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining file tags. {str(e)}")
+
+
+@router.get("/get-folder-tags/{folder_id}", response_model=List[TagResponse])
+def get_folder_tags(folder_id: int, db: Session = Depends(get_db)):
+    """Get the tags of a folder.
+
+    Args:
+        folder_id (int): ID of the folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        List[TagResponse]: The tags of the folder, by name
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        return tags_services.get_folder_tags(db, folder_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining folder tags. {str(e)}")
+
+
+@router.post("/tag-files", response_model=BulkTagResponse)
+def tag_files(
+    request: BulkTagFilesRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Add tags to many files at once.
+
+    Args:
+        request (BulkTagFilesRequest): IDs of the files and of the tags
+        current_user (CurrentUser): The authenticated user; needs write access on each file
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Per-file results; 200 if every file was tagged, 207 otherwise.
+
+    Raises:
+        HTTPException: If a tag is not found or if there is an unexpected error.
+    """
+    try:
+        results = tags_services.tag_files(db, current_user, request.file_ids, request.tag_ids)
+        return bulk_tag_response(results, "tagged")
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error tagging files. {str(e)}")
+
+
+@router.post("/untag-files", response_model=BulkTagResponse)
+def untag_files(
+    request: BulkTagFilesRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Remove tags from many files at once.
+
+    Args:
+        request (BulkTagFilesRequest): IDs of the files and of the tags
+        current_user (CurrentUser): The authenticated user; needs write access on each file
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Per-file results; 200 if every file was untagged, 207 otherwise.
+
+    Raises:
+        HTTPException: If there is an unexpected error.
+    """
+    try:
+        results = tags_services.untag_files(db, current_user, request.file_ids, request.tag_ids)
+        return bulk_tag_response(results, "untagged")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error untagging files. {str(e)}")
+
+
+@router.post("/tag-folders", response_model=BulkTagResponse)
+def tag_folders(
+    request: BulkTagFoldersRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Add tags to many folders at once.
+
+    Args:
+        request (BulkTagFoldersRequest): IDs of the folders and of the tags
+        current_user (CurrentUser): The authenticated user; needs write access on each folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Per-folder results; 200 if every folder was tagged, 207 otherwise.
+
+    Raises:
+        HTTPException: If a tag is not found or if there is an unexpected error.
+    """
+    try:
+        results = tags_services.tag_folders(db, current_user, request.folder_ids, request.tag_ids)
+        return bulk_tag_response(results, "tagged")
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error tagging folders. {str(e)}")
+
+
+@router.post("/untag-folders", response_model=BulkTagResponse)
+def untag_folders(
+    request: BulkTagFoldersRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Remove tags from many folders at once.
+
+    Args:
+        request (BulkTagFoldersRequest): IDs of the folders and of the tags
+        current_user (CurrentUser): The authenticated user; needs write access on each folder
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        JSONResponse: Per-folder results; 200 if every folder was untagged, 207 otherwise.
+
+    Raises:
+        HTTPException: If there is an unexpected error.
+    """
+    try:
+        results = tags_services.untag_folders(db, current_user, request.folder_ids, request.tag_ids)
+        return bulk_tag_response(results, "untagged")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error untagging folders. {str(e)}")
+
+
+@router.get("/search-files", response_model=FilePage)
+def search_files(
+    q: str = Query(..., min_length=1, description='e.g. invoice AND (2024 OR 2025) AND NOT draft'),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort_by: str = "uploaded_at",
+    order: Literal["asc", "desc"] = "desc",
+    filters: FileFilter = Depends(),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get a page of the files the user can read that match a boolean tag expression.
+
+    Tags are names (double-quoted if they contain spaces or parentheses)
+    combined with AND, OR, NOT and parentheses; adjacent tags mean AND.
+
+    Args:
+        q (str): The tag expression
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        sort_by (str): Column to sort by (uploaded_at, file_name, file_type, size_bytes, file_id)
+        order (str): "asc" or "desc"
+        filters (FileFilter): Owner, type, folder, upload date and size range filters
+        current_user (CurrentUser): The authenticated user
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FilePage: The files of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If the expression or the sort key is invalid (400) or if
+            there is an error during the search.
+    """
+    try:
+        tag_query = parse_tag_query(q)
+        cache_key = make_cache_key(
+            "search-files-by-tags", q=format_tag_query(tag_query), limit=limit, cursor=cursor,
+            sort_by=sort_by, order=order, filters=filters.model_dump(mode="json"),
+            scope=permissions_services.listing_scope(db, current_user),
+        )
+        hit, page = files_services.files_cache.get(cache_key)
+        if hit:
+            return page
+
+        files, next_cursor = files_services.get_files_page(
+            db, sort_by, order == "desc", limit, cursor, filters,
+            viewer=current_user, tag_query=tag_query,
+        )
+        page = {
+            "items": [FileResponse.model_validate(file).model_dump(mode="json") for file in files],
+            "next_cursor": next_cursor,
+        }
+        files_services.files_cache.set(cache_key, page)
+        return page
+
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching files. {str(e)}")
+
+
+@router.get("/search-folders", response_model=FolderPage)
+def search_folders(
+    q: str = Query(..., min_length=1, description="e.g. projects AND NOT archived"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Get a page, sorted by name, of the folders that match a boolean tag expression.
+
+    Args:
+        q (str): The tag expression (same syntax as search-files)
+        limit (int): Maximum number of folders in the page
+        cursor (Optional[str]): ``next_cursor`` of the previous page
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        FolderPage: The folders of the page and the cursor of the next one
+
+    Raises:
+        HTTPException: If the expression is invalid (400) or if there is an error during the search.
+    """
+    try:
+        folders, next_cursor = tags_services.search_folders(
+            db, parse_tag_query(q), limit, cursor
+        )
+        return {"items": folders, "next_cursor": next_cursor}
+    except HTTPException as e:
+        raise e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching folders. {str(e)}")
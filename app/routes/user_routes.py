@@ -1,14 +1,95 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
-from schemas.user_schema import UserCreate, UserUpdate, UserResponse
+from schemas.user_schema import (
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserIdsRequest,
+    UsernamesRequest,
+    UsersByIdResponse,
+    UsersByUsernameResponse,
+    LoginRequest,
+    TokenResponse,
+    CurrentUser,
+)
+from utils.auth import (
+    ADMIN_ROLE_ID,
+    SIGNUP_ROLE_ID,
+    get_current_user,
+    get_optional_user,
+    issue_token,
+    require_admin,
+)
+from utils.tokens import access_token_ttl
+from utils.concurrency import run_blocking
+from utils.password_hasher import PasswordHasherBusy
 from services import users_services
 
 router = APIRouter()
 
 
+def hasher_busy() -> HTTPException:
+    """503 returned when the password hashing pool is saturated."""
+    return HTTPException(
+        status_code=503,
+        detail="Too many password operations in progress, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+    """Check a username and password and issue a signed access token.
+
+    The password is verified (bcrypt) only here; afterwards the client sends
+    ``Authorization: Bearer <access_token>`` and the API verifies the token's
+    signature without touching the database.
+
+    Args:
+        credentials (LoginRequest): Username and password
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        TokenResponse: The token, its validity in seconds and the user
+
+    Raises:
+        HTTPException: If the credentials are wrong (401), the hashing pool is
+            saturated (503) or there is an error.
+    """
+    try:
+        user = await users_services.authenticate_user(
+            db, credentials.username, credentials.password
+        )
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+
+        return {
+            "access_token": issue_token(user),
+            "token_type": "bearer",
+            "expires_in": access_token_ttl,
+            "user": user,
+        }
+    except HTTPException as e:
+        raise e
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error logging in. {str(e)}")
+
+
+@router.get("/me", response_model=CurrentUser)
+def get_me(current_user: CurrentUser = Depends(get_current_user)):
+    """Get the user the access token belongs to.
+
+    Returns:
+        CurrentUser: ID, username and role of the authenticated user
+    """
+    return current_user
+
+
 @router.get("/get-users", response_model=List[UserResponse])
 def get_all_users(db: Session = Depends(get_db)):
     """Get all users from the database.
@@ -75,7 +156,51 @@ def get_user_by_username(username: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error obtaining users. {str(e)}")
 
 
-@router.get("/get-user-password/{password}", response_model=List[UserResponse])
+@router.post("/get-users-by-ids", response_model=UsersByIdResponse)
+def get_users_by_ids(request: UserIdsRequest, db: Session = Depends(get_db)):
+    """Get many users by ID in a single query.
+
+    Args:
+        request (UserIdsRequest): IDs of the users to retrieve (at most MAX_USER_BATCH)
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        UsersByIdResponse: The users found keyed by ID, and the IDs not found
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        users = users_services.get_users_by_ids(db, request.user_ids)
+        missing = sorted(set(request.user_ids) - users.keys())
+        return {"users": users, "missing": missing}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining users. {str(e)}")
+
+
+@router.post("/get-users-by-usernames", response_model=UsersByUsernameResponse)
+def get_users_by_usernames(request: UsernamesRequest, db: Session = Depends(get_db)):
+    """Get many users by username in a single query.
+
+    Args:
+        request (UsernamesRequest): Usernames of the users to retrieve (at most MAX_USER_BATCH)
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        UsersByUsernameResponse: The users found keyed by username, and the usernames not found
+
+    Raises:
+        HTTPException: If there is an error during the retrieval.
+    """
+    try:
+        users = users_services.get_users_by_usernames(db, request.usernames)
+        missing = sorted(set(request.usernames) - users.keys())
+        return {"users": users, "missing": missing}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obtaining users. {str(e)}")
+
+
+@router.get("/get-user-password/{password}", response_model=List[UserResponse], deprecated=True)
 def get_user_by_password(password: str, db: Session = Depends(get_db)):
     """Get a user by password from the database.
 
@@ -94,14 +219,19 @@ def get_user_by_password(password: str, db: Session = Depends(get_db)):
         if not users:
             raise HTTPException(status_code=404, detail=f"Not found user")
         return users
+    except PasswordHasherBusy:
+        raise hasher_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error obtaining users. {str(e)}")
 
 
+# Obsoleto: la contraseña viaja en la URL; usar POST /users/login
 @router.get(
-    "/get-user-password-username/{username}/{password}", response_model=UserResponse
+    "/get-user-password-username/{username}/{password}",
+    response_model=UserResponse,
+    deprecated=True,
 )
-def get_user_by_password_username(
+async def get_user_by_password_username(
     username: str, password: str, db: Session = Depends(get_db)
 ):
     """Get a user by password and username from the database.
@@ -118,17 +248,21 @@ def get_user_by_password_username(
     """
 
     try:
-        user = users_services.get_user_by_password_username(db, username, password)
+        user = await users_services.authenticate_user(db, username, password)
         if not user:
             raise HTTPException(status_code=404, detail=f"Not found user")
         return user
+    except HTTPException as e:
+        raise e
+    except PasswordHasherBusy:
+        raise hasher_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error obtaining users. {str(e)}")
 
 
-@router.delete("/delete-user/{user_id}")
+@router.delete("/delete-user/{user_id}", dependencies=[Depends(require_admin)])
 def delete_user_by_id(user_id: int, db: Session = Depends(get_db)):
-    """Delete a user by ID from the database.
+    """Delete a user by ID from the database. Only admins can do it.
 
     Args:
         user_id (int): ID of the user to delete
@@ -151,60 +285,92 @@ def delete_user_by_id(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/create-user", response_model=UserResponse)
-def create_user(new_user: UserCreate, db: Session = Depends(get_db)):
+async def create_user(
+    new_user: UserCreate,
+    current_user: Optional[CurrentUser] = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
     """Create a new user in the database.
 
+    Anyone can sign up with the default role (SIGNUP_ROLE_ID); only admins
+    can create users with any other role.
+
     Args:
         new_user (UserCreate): User data to create a new user
+        current_user (Optional[CurrentUser]): The authenticated user, if any
         db (Session): SQLAlchemy session object
 
     Returns:
         User: Created User object
 
     Raises:
-        HTTPException: If there is an error during the creation.
+        HTTPException: If the role needs an admin (403) or there is an error during the creation.
     """
+    if new_user.role_id != SIGNUP_ROLE_ID and (
+        current_user is None or current_user.role_id != ADMIN_ROLE_ID
+    ):
+        raise HTTPException(status_code=403, detail="Only admins can create users with this role")
+
     try:
-        if users_services.get_user_by_username(db, new_user.username):
+        if await run_blocking(users_services.get_user_by_username, db, new_user.username):
             return JSONResponse(
                 status_code=409, content={"message": "Username already in use"}
             )
-        users_services.create_user(db, new_user)
+        await users_services.create_user(db, new_user)
         return JSONResponse(
             status_code=201, content={"message": "User created successfully"}
         )
+    except PasswordHasherBusy:
+        raise hasher_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating users: {str(e)}")
 
 
 @router.patch("/update-user/{user_id}", response_model=UserResponse)
-def update_user(user_id: int, update_user: UserUpdate, db: Session = Depends(get_db)):
+async def update_user(
+    user_id: int,
+    update_user: UserUpdate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
     """Update a user by ID in the database.
 
+    Admins can update anyone; other users only their own name, username and
+    password, never a role.
+
     Args:
         user_id (int): ID of the user to update
         update_user (UserUpdate): User data to update
+        current_user (CurrentUser): The authenticated user
         db (Session): SQLAlchemy session object
 
     Returns:
         User: Updated User object if found, None otherwise
 
     Raises:
+        HTTPException: If the user cannot make this change (403).
         HTTPException: If the user is not found or if there is an error during the update.
     """
+    if current_user.role_id != ADMIN_ROLE_ID and (
+        user_id != current_user.user_id or "role_id" in update_user.model_fields_set
+    ):
+        raise HTTPException(status_code=403, detail="Users can only update their own profile")
+
     try:
-        user = users_services.get_user_by_id(db, user_id)
+        user = await run_blocking(users_services.get_user_by_id, db, user_id)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
-        exist_user = users_services.update_user(db, user_id, update_user)
+        exist_user = await users_services.update_user(db, user_id, update_user)
 
         if exist_user:
-            updated_user = users_services.get_user_by_id(db, user_id)
+            updated_user = await run_blocking(users_services.get_user_by_id, db, user_id)
         else:
             raise HTTPException(status_code=404, detail="User not found")
 
         return updated_user
 
+    except PasswordHasherBusy:
+        raise hasher_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating users. {str(e)}")
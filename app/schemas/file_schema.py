@@ -1,15 +1,24 @@
 from typing import Optional, Any
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+
+class FileMetadata(BaseModel):
+    size: str
+    size_bytes: int
+    sha256: Optional[str] = None
+    etag: str
 
 
 class FileCreate(BaseModel):
     file_name: str
-    file_metadata: dict[str, Any]
+    file_metadata: FileMetadata
     file_type: str
     folder_id: int
     owner_id: int
     s3_url: str
+    blob_sha256: Optional[str] = None
+    staging_key: Optional[str] = None
 
 
 class FileUpdate(BaseModel):
@@ -25,6 +34,7 @@ class FileResponse(BaseModel):
     file_id: int
     file_name: str
     file_metadata: dict[str, Any]
+    size_bytes: int = 0
     file_type: str
     folder_id: int
     owner_id: int
@@ -33,3 +43,137 @@ class FileResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FileWithOwnerResponse(FileResponse):
+    owner_username: Optional[str] = None
+    owner_full_name: Optional[str] = None
+    folder_name: Optional[str] = None
+
+
+class FileFilter(BaseModel):
+    owner_id: Optional[int] = None
+    file_type: Optional[str] = None
+    folder_id: Optional[int] = None
+    uploaded_from: Optional[datetime] = None
+    uploaded_to: Optional[datetime] = None
+    min_size: Optional[int] = Field(None, ge=0)
+    max_size: Optional[int] = Field(None, ge=0)
+
+
+class FilePage(BaseModel):
+    items: list[FileResponse]
+    next_cursor: Optional[str] = None
+
+
+class FileWithOwnerPage(BaseModel):
+    items: list[FileWithOwnerResponse]
+    next_cursor: Optional[str] = None
+
+
+class FileSearchResult(FileResponse):
+    # Nivel de coincidencia (3 exacta, 2 prefijo, 1 contiene) + similitud
+    score: float
+
+
+class FileSearchPage(BaseModel):
+    items: list[FileSearchResult]
+    next_cursor: Optional[str] = None
+
+
+# SHA-256 en hexadecimal, calculado por el cliente
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
+
+
+class PresignUploadRequest(BaseModel):
+    file_name: str
+    size_bytes: Optional[int] = Field(None, ge=0)
+    sha256: Optional[str] = Field(None, pattern=SHA256_PATTERN)
+
+
+class PresignedUpload(BaseModel):
+    # Sin clave ni URL si el contenido ya está guardado (content_stored)
+    key: Optional[str] = None
+    url: Optional[str] = None
+    method: str = "PUT"
+    expires_in: int
+    upload_token: str
+    content_stored: bool = False
+
+
+class PresignMultipartRequest(BaseModel):
+    file_name: str
+    size_bytes: int = Field(..., gt=0)
+    sha256: Optional[str] = Field(None, pattern=SHA256_PATTERN)
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class PresignedMultipartUpload(BaseModel):
+    key: Optional[str] = None
+    upload_id: Optional[str] = None
+    part_size: int
+    expires_in: int
+    parts: list[PresignedPart]
+    upload_token: str
+    content_stored: bool = False
+
+
+class UploadedPart(BaseModel):
+    part_number: int = Field(..., ge=1)
+    etag: str
+
+
+class CompleteMultipartRequest(BaseModel):
+    key: str
+    upload_id: str
+    upload_token: str
+    parts: list[UploadedPart]
+
+
+class AbortMultipartRequest(BaseModel):
+    key: str
+    upload_id: str
+    upload_token: str
+
+
+class FinalizeUploadRequest(BaseModel):
+    upload_token: str
+    folder_id: int = 1
+    sha256: Optional[str] = Field(None, pattern=SHA256_PATTERN)
+
+
+class BatchUploadResult(BaseModel):
+    file_name: str
+    status: str
+    file_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    uploaded: int
+    failed: int
+    results: list[BatchUploadResult]
+
+
+# Máximo de archivos por borrado en lote
+MAX_BULK_DELETE_FILES = 5000
+
+
+class BulkDeleteRequest(BaseModel):
+    file_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_DELETE_FILES)
+
+
+class BulkDeleteResult(BaseModel):
+    file_id: int
+    status: str
+    error: Optional[str] = None
+
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+    failed: int
+    results: list[BulkDeleteResult]
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+# Máximo de carpetas devueltas por una consulta de subárbol
+MAX_SUBTREE_FOLDERS = 10000
+
+
+class FolderCreate(BaseModel):
+    folder_name: str = Field(..., min_length=1)
+    parent_folder_id: Optional[int] = None
+
+
+class FolderRename(BaseModel):
+    folder_name: str = Field(..., min_length=1)
+
+
+class FolderMove(BaseModel):
+    # None mueve la carpeta a la raíz
+    parent_folder_id: Optional[int] = None
+
+
+class FolderResponse(BaseModel):
+    folder_id: int
+    folder_name: str
+    parent_folder_id: Optional[int] = None
+    path: str
+    depth: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FolderPage(BaseModel):
+    items: list[FolderResponse]
+    next_cursor: Optional[str] = None
+
+
+class FolderSubtree(BaseModel):
+    folder_id: int
+    folders: list[FolderResponse]
+    truncated: bool = False
@@ -0,0 +1,28 @@
+from typing import Any, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+JobStatus = Literal["pending", "running", "done", "failed"]
+
+
+class JobResponse(BaseModel):
+    job_id: int
+    job_type: str
+    payload: dict[str, Any]
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    locked_by: Optional[str] = None
+    locked_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobPage(BaseModel):
+    items: list[JobResponse]
+    next_cursor: Optional[str] = None
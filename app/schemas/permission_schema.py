@@ -0,0 +1,32 @@
+from typing import Literal
+from pydantic import BaseModel
+
+# Niveles de acceso, de menor a mayor
+AccessLevel = Literal["none", "read", "write", "admin"]
+
+
+class FolderRoleSet(BaseModel):
+    folder_id: int
+    role_id: int
+    access_level: AccessLevel
+
+
+class FileRoleSet(BaseModel):
+    file_id: int
+    role_id: int
+    access_level: AccessLevel
+
+
+class FolderRoleResponse(FolderRoleSet):
+    class Config:
+        from_attributes = True
+
+
+class FileRoleResponse(FileRoleSet):
+    class Config:
+        from_attributes = True
+
+
+class AccessLevelResponse(BaseModel):
+    file_id: int
+    access_level: AccessLevel
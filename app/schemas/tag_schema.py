@@ -0,0 +1,53 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+# Máximo de archivos / carpetas y de etiquetas por operación en lote
+MAX_BULK_TAG_ITEMS = 5000
+MAX_BULK_TAG_TAGS = 100
+
+
+class TagCreate(BaseModel):
+    tag_name: str = Field(..., min_length=1, max_length=255)
+    tag_description: Optional[str] = None
+
+
+class TagUpdate(BaseModel):
+    tag_name: Optional[str] = Field(None, min_length=1, max_length=255)
+    tag_description: Optional[str] = None
+
+
+class TagResponse(BaseModel):
+    tag_id: int
+    tag_name: str
+    tag_description: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TagPage(BaseModel):
+    items: list[TagResponse]
+    next_cursor: Optional[str] = None
+
+
+class BulkTagFilesRequest(BaseModel):
+    file_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_TAG_ITEMS)
+    tag_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_TAG_TAGS)
+
+
+class BulkTagFoldersRequest(BaseModel):
+    folder_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_TAG_ITEMS)
+    tag_ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_TAG_TAGS)
+
+
+class BulkTagResult(BaseModel):
+    # file_id o folder_id según la operación
+    id: int
+    status: str
+    error: Optional[str] = None
+
+
+class BulkTagResponse(BaseModel):
+    updated: int
+    failed: int
+    results: list[BulkTagResult]
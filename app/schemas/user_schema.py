@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -26,3 +26,43 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+# Máximo de ids/usernames por consulta en lote
+MAX_USER_BATCH = 500
+
+
+class UserIdsRequest(BaseModel):
+    user_ids: list[int] = Field(..., max_length=MAX_USER_BATCH)
+
+
+class UsernamesRequest(BaseModel):
+    usernames: list[str] = Field(..., max_length=MAX_USER_BATCH)
+
+
+class UsersByIdResponse(BaseModel):
+    users: dict[int, UserResponse]
+    missing: list[int]
+
+
+class UsersByUsernameResponse(BaseModel):
+    users: dict[str, UserResponse]
+    missing: list[str]
+
+
+class LoginRequest(BaseModel):
+    username: str
+    password: str
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    user: UserResponse
+
+
+class CurrentUser(BaseModel):
+    user_id: int
+    username: str
+    role_id: int
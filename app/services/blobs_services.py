@@ -0,0 +1,163 @@
+from typing import Optional
+from sqlalchemy import case, select, insert
+from sqlalchemy.orm import Session
+
+from models.model import Blob
+from storage import StorageBackend
+
+# Prefijo de las claves de storage del contenido deduplicado
+BLOB_KEY_PREFIX = "blobs/"
+
+
+class BlobMissingError(Exception):
+    """Raised when a file references a blob that is no longer stored.
+
+    It happens when the last file using the blob was deleted between the
+    check that skipped the upload and the registration; the content must be
+    uploaded again.
+    """
+
+    def __init__(self, shas: list[str]):
+        self.shas = set(shas)
+        super().__init__(f"{len(self.shas)} blob(s) are no longer stored")
+
+
+def blob_key(sha256: str) -> str:
+    """Storage key of the content with this SHA-256."""
+    return f"{BLOB_KEY_PREFIX}{sha256}"
+
+
+def get_stored_blobs(db: Session, shas: list[str]) -> set[str]:
+    """Get which of these SHA-256 digests are already stored as blobs.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        shas (list[str]): Content digests
+
+    Returns:
+        set[str]: The digests that have a blob (its object exists in storage)
+    """
+    if not shas:
+        return set()
+    return set(db.scalars(select(Blob.sha256).where(Blob.sha256.in_(shas))))
+
+
+def _lock_blobs(db: Session, shas) -> dict[str, int]:
+    """Lock the rows of these blobs and return their ``ref_count``."""
+    # Siempre en el mismo orden, para que dos transacciones no se bloqueen mutuamente
+    rows = db.execute(
+        select(Blob.sha256, Blob.ref_count)
+        .where(Blob.sha256.in_(sorted(shas)))
+        .order_by(Blob.sha256)
+        .with_for_update()
+    )
+    return {sha: ref_count for sha, ref_count in rows}
+
+
+def reference_blobs(db: Session, refs: dict[str, tuple[int, int]], uploaded: set[str]) -> None:
+    """Add file references to blobs, inside the caller's transaction.
+
+    Existing blobs get their ``ref_count`` increased; the rows stay locked
+    until the caller commits, so a concurrent release cannot delete them in
+    between. Blobs without a row are created, but only if their content was
+    just uploaded.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        refs (dict[str, tuple[int, int]]): SHA-256 -> (new references, size in bytes)
+        uploaded (set[str]): Digests whose content this request wrote to storage
+
+    Raises:
+        BlobMissingError: If a blob whose upload was skipped is no longer stored
+    """
+    if not refs:
+        return
+    existing = _lock_blobs(db, refs)
+    missing = [sha for sha in refs if sha not in existing and sha not in uploaded]
+    if missing:
+        raise BlobMissingError(missing)
+
+    if existing:
+        db.query(Blob).filter(Blob.sha256.in_(list(existing))).update(
+            {
+                Blob.ref_count: Blob.ref_count
+                + case({sha: refs[sha][0] for sha in existing}, value=Blob.sha256)
+            },
+            synchronize_session=False,
+        )
+    new_blobs = [
+        {"sha256": sha, "size_bytes": size_bytes, "ref_count": count}
+        for sha, (count, size_bytes) in refs.items()
+        if sha not in existing
+    ]
+    if new_blobs:
+        db.execute(insert(Blob), new_blobs)
+
+
+def release_blobs(db: Session, counts: dict[str, int]) -> list[str]:
+    """Drop file references to blobs, inside the caller's transaction.
+
+    Nothing is deleted from storage here: if the caller's commit failed, the
+    surviving rows would point at missing content. Pass the returned digests
+    to delete_unreferenced_blobs once the transaction is committed.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        counts (dict[str, int]): SHA-256 -> references to drop
+
+    Returns:
+        list[str]: The digests whose blob was left without references
+    """
+    if not counts:
+        return []
+    existing = _lock_blobs(db, counts)
+    if not existing:
+        return []
+    db.query(Blob).filter(Blob.sha256.in_(list(existing))).update(
+        {
+            Blob.ref_count: Blob.ref_count
+            - case({sha: counts[sha] for sha in existing}, value=Blob.sha256)
+        },
+        synchronize_session=False,
+    )
+    return [sha for sha, ref_count in existing.items() if ref_count - counts[sha] <= 0]
+
+
+def delete_unreferenced_blobs(db: Session, storage: StorageBackend, shas: list[str]) -> list[str]:
+    """Delete from storage the blobs still without references, after a commit.
+
+    Runs in a transaction of its own: the rows are locked and checked again
+    (an upload may have referenced the content since), the objects deleted
+    and then the rows; an upload of the same content waits for the commit
+    and stores it again. If deleting an object fails, its row stays with
+    ``ref_count`` 0 and the object is reused by the next upload of that
+    content.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Backend to delete the objects from
+        shas (list[str]): Digests returned by release_blobs
+
+    Returns:
+        list[str]: The digests whose blob was deleted
+    """
+    if not shas:
+        return []
+    try:
+        unreferenced = [
+            sha for sha, ref_count in _lock_blobs(db, shas).items() if ref_count <= 0
+        ]
+        deleted = []
+        if unreferenced:
+            try:
+                errors = storage.delete_many([blob_key(sha) for sha in unreferenced])
+            except Exception:
+                errors = {blob_key(sha): "" for sha in unreferenced}
+            deleted = [sha for sha in unreferenced if blob_key(sha) not in errors]
+        if deleted:
+            db.query(Blob).filter(Blob.sha256.in_(deleted)).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+    except Exception:
+        db.rollback()
+        return []
@@ -1,83 +1,345 @@
 import os
-import boto3
-from typing import Tuple
+import math
+import uuid
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
 from dotenv import load_dotenv
+from sqlalchemy import select, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from botocore.exceptions import NoCredentialsError, PartialCredentialsError
 
-from models.model import File, User
-from schemas.file_schema import FileCreate, FileUpdate
+from models.model import File, User, Folder, FileTag, FileRole
+from schemas.user_schema import CurrentUser
+from schemas.file_schema import (
+    FileCreate,
+    FileUpdate,
+    FileFilter,
+    UploadedPart,
+    FinalizeUploadRequest,
+)
+from storage import StorageBackend, StorageError, ObjectInfo, get_storage
+from storage.streaming import put_stream
+from utils.cache import get_cache
+from utils.concurrency import run_blocking
+from utils.name_index import TrigramNameIndex
+from utils.files_managment import (
+    build_file_record,
+    digest_stored_object,
+    iter_upload_file,
+    object_metadata,
+)
+from utils.tokens import TokenError, create_access_token, decode_access_token
+from utils.upload_digest import UploadDigest
+from utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
+from services.permissions_services import (
+    WRITE,
+    filter_visible_files,
+    get_file_access_level,
+    get_file_access_levels,
+)
+from services.tags_services import files_tag_filter
+from services.jobs_services import PermanentJobError, enqueue_jobs, notify_enqueued
+from services.blobs_services import (
+    BLOB_KEY_PREFIX,
+    BlobMissingError,
+    blob_key,
+    delete_unreferenced_blobs,
+    get_stored_blobs,
+    reference_blobs,
+    release_blobs,
+)
+from utils.tag_query import TagNode
 
 load_dotenv()
-aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
-aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
-aws_region = os.getenv("AWS_REGION")
 
-ADMIN_ROLE_ID = 1
+# S3 rechaza partes de menos de 5 MiB (salvo la última)
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+s3_part_size = max(int(os.getenv("S3_PART_SIZE", 8 * 1024 * 1024)), S3_MIN_PART_SIZE)
+# Límites de S3 para un PUT simple y para el número de partes
+S3_MAX_PUT_SIZE = 5 * 1024 ** 3
+S3_MAX_PARTS = 10000
 
-def get_all_files(db: Session):
-    """Get all files from the database.
+# Validez (segundos) de las URLs firmadas y del token que permite registrar la subida
+presign_expires_in = int(os.getenv("PRESIGN_EXPIRES_IN", 900))
+upload_token_ttl = int(os.getenv("UPLOAD_TOKEN_TTL", 24 * 3600))
+
+# Subidas en lote: máximo de archivos por petición y subidas simultáneas a storage
+MAX_BATCH_UPLOAD_FILES = int(os.getenv("MAX_BATCH_UPLOAD_FILES", 500))
+batch_upload_concurrency = int(os.getenv("BATCH_UPLOAD_CONCURRENCY", 8))
+
+# Subidas por streaming y firmadas: clave temporal hasta conocer el SHA-256 del contenido
+STAGING_KEY_PREFIX = "uploads/"
+# Ningún archivo se guarda por nombre bajo estos prefijos
+RESERVED_KEY_PREFIXES = (BLOB_KEY_PREFIX, STAGING_KEY_PREFIX)
+
+# Extracción de metadatos (tipo MIME, dimensiones, páginas, texto) en segundo plano
+EXTRACT_METADATA_JOB = "extract_metadata"
+# Paso de una subida firmada de su clave temporal a su blob, en segundo plano
+PROMOTE_UPLOAD_JOB = "promote_upload"
+metadata_jobs_enabled = os.getenv("METADATA_JOBS_ENABLED", "true").lower() == "true"
+
+# Tamaño de los trozos al servir descargas
+download_chunk_size = int(os.getenv("DOWNLOAD_CHUNK_SIZE", 1024 * 1024))
+
+# Caché de listados y búsquedas por nombre; se invalida en cada escritura
+files_cache = get_cache(
+    "files",
+    ttl=float(os.getenv("FILES_CACHE_TTL", 30)),
+    max_entries=int(os.getenv("FILES_CACHE_MAX_ENTRIES", 1000)),
+)
+
+# Índice de nombres en memoria para la búsqueda cuando la base no tiene pg_trgm
+file_name_index = TrigramNameIndex(ttl=float(os.getenv("NAME_INDEX_TTL", 30)))
+
+# Claves de ordenamiento expuestas por la API
+FILE_SORT_COLUMNS = {
+    "uploaded_at": File.uploaded_at,
+    "file_name": File.file_name,
+    "file_type": File.file_type,
+    "size_bytes": File.size_bytes,
+    "file_id": File.file_id,
+}
+
+# Filtros del selector de la UI
+FILTER_LABEL_SORT_KEYS = {
+    "Nombre": "file_name",
+    "Fecha": "uploaded_at",
+    "Tipo": "file_type",
+    "Tamaño": "size_bytes",
+}
+
+
+def apply_file_filters(query, filters: FileFilter):
+    """Add the WHERE clauses of a FileFilter to a files query.
+
+    Every condition maps to an indexed column so the database, not Python,
+    does the filtering.
+
+    Args:
+        query (Query | Select): Query over File
+        filters (FileFilter): Filters to apply; unset fields are ignored
+
+    Returns:
+        Query | Select: The filtered query
+    """
+    if filters.owner_id is not None:
+        query = query.filter(File.owner_id == filters.owner_id)
+    if filters.file_type is not None:
+        file_type = filters.file_type if filters.file_type.startswith(".") else f".{filters.file_type}"
+        query = query.filter(File.file_type == file_type)
+    if filters.folder_id is not None:
+        query = query.filter(File.folder_id == filters.folder_id)
+    if filters.uploaded_from is not None:
+        query = query.filter(File.uploaded_at >= filters.uploaded_from)
+    if filters.uploaded_to is not None:
+        query = query.filter(File.uploaded_at < filters.uploaded_to)
+    if filters.min_size is not None:
+        query = query.filter(File.size_bytes >= filters.min_size)
+    if filters.max_size is not None:
+        query = query.filter(File.size_bytes <= filters.max_size)
+    return query
+
+
+def files_with_owner_query(db: Session):
+    """Build a files query that also carries the owner and folder names.
+
+    Both are resolved with LEFT JOINs on primary keys, so a page of files costs
+    a single query. Rows expose every File column plus ``owner_username``,
+    ``owner_full_name`` and ``folder_name`` (None when the user or folder no
+    longer exists).
+
+    Args:
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        Query: The joined query, ready for apply_file_filters and pagination
+    """
+    return (
+        db.query(
+            *File.__table__.columns,
+            User.username.label("owner_username"),
+            User.full_name.label("owner_full_name"),
+            Folder.folder_name.label("folder_name"),
+        )
+        .outerjoin(User, User.user_id == File.owner_id)
+        .outerjoin(Folder, Folder.folder_id == File.folder_id)
+    )
+
+
+def get_files_page(
+    db: Session,
+    sort_by: str = "uploaded_at",
+    descending: bool = True,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: Optional[FileFilter] = None,
+    with_owner: bool = False,
+    viewer: Optional[CurrentUser] = None,
+    tag_query: Optional[TagNode] = None,
+) -> Tuple[list[File], Optional[str]]:
+    """Get one keyset-paginated page of files, filtered and sorted in SQL.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        sort_by (str): One of FILE_SORT_COLUMNS
+        descending (bool): Sort direction
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+        filters (Optional[FileFilter]): Conditions the files must match
+        with_owner (bool): Return rows of files_with_owner_query instead of File objects
+        viewer (Optional[CurrentUser]): Only return the files this user can read
+        tag_query (Optional[TagNode]): Only return the files matching this tag expression
+
+    Returns:
+        Tuple[list[File], Optional[str]]: The files of the page and the cursor
+        of the next one (None on the last page)
+
+    Raises:
+        ValueError: If sort_by is not a known sort key
+    """
+    if sort_by not in FILE_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort key '{sort_by}'")
+
+    query = files_with_owner_query(db) if with_owner else db.query(File)
+    if filters is not None:
+        query = apply_file_filters(query, filters)
+    if tag_query is not None:
+        query = query.filter(files_tag_filter(db, tag_query))
+    if viewer is not None:
+        query = filter_visible_files(db, query, viewer)
+
+    return paginate_keyset(
+        query,
+        FILE_SORT_COLUMNS[sort_by],
+        File.file_id,
+        descending,
+        limit,
+        cursor,
+        sort_key=f"{sort_by}:{'desc' if descending else 'asc'}",
+    )
+
+def get_all_files(
+    db: Session, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None
+) -> Tuple[list[File], Optional[str]]:
+    """Get a page of files from the database, newest first.
     
     Args:
         db (Session): SQLAlchemy session object
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): Cursor returned with the previous page
         
     Returns:
-        List[File]: a list of File objects
+        Tuple[list[File], Optional[str]]: The files and the next page cursor
     """
-    return db.query(File).all()
+    return get_files_page(db, limit=limit, cursor=cursor)
 
-def get_files_by_filter(db: Session, filter: str, order: str) -> list[File]:
-    """Get files from the database based on filter and order criteria.
+def get_files_by_filter(
+    db: Session,
+    filter: str,
+    order: str,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    viewer: Optional[CurrentUser] = None,
+) -> Tuple[list[File], Optional[str]]:
+    """Get a page of files from the database based on filter and order criteria.
     
     Args:
         db (Session): SQLAlchemy session object
-        filter (str): Filter criteria for file retrieval
-        order (str): Order criteria for file retrieval
+        filter (str): Filter criteria for file retrieval (see FILTER_LABEL_SORT_KEYS)
+        order (str): "Ascendente" or "Descendente"
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+        viewer (Optional[CurrentUser]): Only return the files this user can read
         
     Returns:
-        List[File]: List of File objects matching the filter and order criteria
+        Tuple[list[File], Optional[str]]: The files and the next page cursor
+
+    Raises:
+        ValueError: If the filter is not supported
     """
-    if filter == "Nombre":
-        return db.query(File).order_by(File.file_name.asc()).all() if order == "Ascendente" else db.query(File).order_by(File.file_name.desc()).all()
-    elif filter == "Fecha":
-        return db.query(File).order_by(File.upload_date.asc()).all() if order == "Ascendente" else db.query(File).order_by(File.upload_date.desc()).all()
-    elif filter == "Tipo":
-        return db.query(File).order_by(File.file_size.asc()).all() if order == "Ascendente" else db.query(File).order_by(File.file_size.desc()).all()
-    elif filter == "Tamaño":
-        return db.query(File).order_by(File.file_type.asc()).all() if order == "Ascendente" else db.query(File).order_by(File.file_type.desc()).all()
+    if filter not in FILTER_LABEL_SORT_KEYS:
+        raise ValueError(f"Unsupported filter '{filter}'")
+
+    return get_files_page(
+        db,
+        sort_by=FILTER_LABEL_SORT_KEYS[filter],
+        descending=order != "Ascendente",
+        limit=limit,
+        cursor=cursor,
+        viewer=viewer,
+    )
     
 
-def get_files_by_user_id(db: Session, user_id: int) -> list[File]:
-    """Get all files owned by a specific user.
+def get_files_by_user_id(
+    db: Session,
+    user_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    viewer: Optional[CurrentUser] = None,
+) -> Tuple[list[File], Optional[str]]:
+    """Get a page of files owned by a specific user, newest first.
     
     Args:
         db (Session): SQLAlchemy session object
         user_id (int): ID of the user whose files to retrieve
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+        viewer (Optional[CurrentUser]): Only return the files this user can read
         
     Returns:
-        List[File]: List of File objects owned by the user
+        Tuple[list[File], Optional[str]]: The files and the next page cursor
     """
-    return db.query(File).filter(File.owner_id == user_id).all()
+    return get_files_page(
+        db, limit=limit, cursor=cursor, filters=FileFilter(owner_id=user_id), viewer=viewer
+    )
 
-def get_file_by_name_in_s3(db: Session, file_name: str, aws_bucket_name: str) -> File:
-    """Get a file from S3 bucket by its name.
+def storage_key(file: File) -> str:
+    """Get the storage key under which the content of a file is stored.
+
+    Args:
+        file (File): File object
+
+    Returns:
+        str: The key of its blob, the temporary key of a presigned upload not
+        promoted yet, or the file name plus extension for files stored by
+        name (files registered before deduplication)
+    """
+    if file.blob_sha256:
+        return blob_key(file.blob_sha256)
+    if file.staging_key:
+        return file.staging_key
+    return f"{file.file_name}{file.file_type}"
+
+def get_file_by_name_in_storage(
+    db: Session, storage: StorageBackend, file_name: str
+) -> list[ObjectInfo]:
+    """Get the stored objects whose key starts with a file name.
     
     Args:
         db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
         file_name (str): Name of the file to retrieve
-        aws_bucket_name (str): S3 bucket name
         
     Returns:
-        File: File object if found, None otherwise
+        list[ObjectInfo]: Matching objects, or None if the listing fails
     """
-    s3 = boto3.client("s3")
-
     try:
-        response = s3.list_objects_v2(Bucket=aws_bucket_name, Prefix=file_name)
-        return response
+        return storage.list(prefix=file_name)
     except Exception as e:
         return None
 
+def get_file_by_id(db: Session, file_id: int) -> Optional[File]:
+    """Get a file from the database by its ID.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        file_id (int): ID of the file to retrieve
+
+    Returns:
+        Optional[File]: File object if found, None otherwise
+    """
+    return db.query(File).filter(File.file_id == file_id).first()
+
 def get_file_by_name_in_db(db: Session, file_name: str) -> File:
     """Get a file from the database by its name.
 
@@ -90,100 +352,909 @@ def get_file_by_name_in_db(db: Session, file_name: str) -> File:
     """
     return db.query(File).filter(File.file_name == file_name).first()
 
-def upload_file_to_s3(file_path, bucket_name, s3_file_name) -> bool:
+def get_file_by_full_name(db: Session, file_name: str) -> Optional[File]:
+    """Get the file registered under a name with its extension (its name-keyed object).
+
+    Args:
+        db (Session): SQLAlchemy session object
+        file_name (str): Name of the file, extension included
+
+    Returns:
+        Optional[File]: File object if found, None otherwise
     """
-    Upload a file to an S3 bucket with optional extra parameters.
+    name, extension = os.path.splitext(file_name)
+    return db.query(File).filter(File.file_name == name, File.file_type == extension).first()
+
+
+def is_reserved_key(key: str) -> bool:
+    """Whether a storage key belongs to the blobs or to the staged uploads."""
+    return key.strip().startswith(RESERVED_KEY_PREFIXES)
+
+
+def check_file_name(file_name: str) -> None:
+    """Reject a file name that would be stored under a reserved key.
 
     Args:
-        file_path (str): Local path to the file.
-        bucket_name (str): S3 bucket name.
-        s3_file_name (str): Name to save the file as in S3.
+        file_name (str): Name of the file, extension included
+
+    Raises:
+        ValueError: If it starts with ``blobs/`` or ``uploads/``
+    """
+    if is_reserved_key(file_name):
+        raise ValueError(
+            f"File names cannot start with {' or '.join(RESERVED_KEY_PREFIXES)}"
+        )
+
+
+def check_file_name_available(db: Session, file_name: str) -> None:
+    """Raise FileExistsError if a file is already registered under this name."""
+    name, extension = os.path.splitext(file_name)
+    if db.query(File.file_id).filter(File.file_name == name, File.file_type == extension).first():
+        raise FileExistsError(f"A file named '{file_name}' is already registered")
+
+
+def _upload_token(
+    owner_id: int, file_name: str, key: Optional[str], sha256: Optional[str] = None
+) -> str:
+    # Sin "sub" ni "role_id": no sirve como token de acceso
+    return create_access_token(
+        {"upload_key": key, "file_name": file_name, "owner_id": owner_id, "sha256": sha256},
+        upload_token_ttl,
+    )
+
+
+def _stored_sha256(db: Session, sha256: Optional[str]) -> Optional[str]:
+    """The declared SHA-256, normalized, if its content is already stored as a blob."""
+    if sha256 is None:
+        return None
+    sha256 = sha256.lower()
+    return sha256 if get_stored_blobs(db, [sha256]) else None
+
+
+def read_upload_token(token: str, owner_id: int, key: Optional[str] = None) -> dict:
+    """Check an upload token returned by presign_upload or presign_multipart_upload.
+
+    Args:
+        token (str): The ``upload_token`` of the presigned upload
+        owner_id (int): ID of the user finalizing the upload
+        key (Optional[str]): Storage key the caller acts on, if any; it must
+            be the one the token was issued for
+
+    Returns:
+        dict: ``upload_key`` and ``file_name`` of the presigned upload
+
+    Raises:
+        PermissionError: If the token is invalid, expired, or was issued to
+            another user or for another key
+    """
+    try:
+        claims = decode_access_token(token)
+    except TokenError as e:
+        raise PermissionError(f"Invalid upload token: {str(e)}")
+    if "upload_key" not in claims or claims.get("owner_id") != owner_id:
+        raise PermissionError("This upload was not presigned for you")
+    if key is not None and claims["upload_key"] != key:
+        raise PermissionError("The upload token was issued for another upload")
+    return claims
+
+
+async def stage_upload(
+    storage: StorageBackend, chunks: AsyncIterator[bytes], sha256: Optional[str] = None
+) -> Tuple[str, UploadDigest]:
+    """Upload a stream of bytes to a temporary key, computing its digest on the way.
+
+    The content is only read once. Its blob key is not known until the end,
+    and bytes nobody verified never go to a key other files share, so the
+    content reaches its blob later with promote_staged_upload.
+
+    Args:
+        storage (StorageBackend): Storage backend
+        chunks (AsyncIterator[bytes]): The file content, in arbitrary-sized chunks
+        sha256 (Optional[str]): SHA-256 declared by the client, checked at the end
 
     Returns:
-        str: URL of the uploaded file in S3 or None if upload fails.
+        Tuple[str, UploadDigest]: The temporary key and the digest of the content
+
+    Raises:
+        ValueError: If the content does not match the declared SHA-256 (the
+            temporary object is deleted)
+    """
+    key = f"{STAGING_KEY_PREFIX}{uuid.uuid4().hex}"
+    digest = UploadDigest(s3_part_size)
+    await put_stream(storage, key, digest.wrap(chunks), s3_part_size)
+    if sha256 is not None and sha256.lower() != digest.sha256:
+        await run_blocking(storage.delete, key)
+        raise ValueError("The uploaded content does not match the declared SHA-256")
+    return key, digest
+
+
+async def promote_staged_upload(
+    db: Session,
+    storage: StorageBackend,
+    staging_key: str,
+    digest: UploadDigest,
+    file_name: str,
+    folder_id: int,
+    owner_id: int,
+) -> Tuple[File, bool]:
+    """Register a file whose content is at a temporary key, as a blob.
+
+    The content is copied to its blob key inside storage, unless it is
+    already stored. No byte goes through the API again, but the copy takes
+    time (and S3 requests) in proportion to the size; clients that send the
+    SHA-256 up front skip the upload of known contents instead (see
+    register_stored_content). The temporary object is left for the caller
+    to delete.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
+        staging_key (str): Temporary key of the content
+        digest (UploadDigest): Digest of the content
+        file_name (str): Name of the file, extension included
+        folder_id (int): ID of the folder of the file
+        owner_id (int): ID of the owner of the file
+
+    Returns:
+        Tuple[File, bool]: The registered file, and whether the content was copied
+
+    Raises:
+        StorageError: If the copy fails
     """
-    s3 = boto3.client(
-        "s3",
-        aws_access_key_id=aws_access_key,
-        aws_secret_access_key=aws_secret_key,
-        region_name=aws_region,
+
+    async def promote(key: str) -> None:
+        await run_blocking(storage.copy, staging_key, key)
+
+    writers = {digest.sha256: promote}
+    written, errors = await store_blobs(db, writers)
+    if errors:
+        raise StorageError(errors[digest.sha256])
+
+    record = build_file_record(
+        storage, file_name, digest.as_metadata(), folder_id, owner_id,
+        blob_key=blob_key(digest.sha256),
     )
+    new_files, written = await register_blob_files(db, [FileCreate(**record)], writers, written)
+    return new_files[0], bool(written)
+
+
+async def register_stored_content(
+    db: Session,
+    storage: StorageBackend,
+    sha256: str,
+    file_name: str,
+    folder_id: int,
+    owner_id: int,
+    file_metadata: Optional[dict] = None,
+) -> Optional[File]:
+    """Register a file whose content is already stored as a blob, without uploading it.
 
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
+        sha256 (str): SHA-256 of the content
+        file_name (str): Name of the file, extension included
+        folder_id (int): ID of the folder of the file
+        owner_id (int): ID of the owner of the file
+        file_metadata (Optional[dict]): Size and checksums of the content; read
+            from the blob with a HEAD if not given
+
+    Returns:
+        Optional[File]: The registered file, or None if no blob has that
+        content (anymore): it must be uploaded
+    """
+    sha256 = sha256.lower()
+    if file_metadata is None:
+        info = await run_blocking(storage.head, blob_key(sha256))
+        if info is None:
+            return None
+        file_metadata = object_metadata(info, sha256)
+
+    record = build_file_record(
+        storage, file_name, file_metadata, folder_id, owner_id, blob_key=blob_key(sha256)
+    )
     try:
-        s3.upload_file(file_path, bucket_name, s3_file_name)
+        return await run_blocking(create_file_to_db, db, FileCreate(**record))
+    except BlobMissingError:
+        return None
+
+
+async def upload_stream_to_storage(
+    storage: StorageBackend, chunks: AsyncIterator[bytes], key: str
+) -> bool:
+    """
+    Upload a stream of bytes to storage without staging it on disk.
+
+    At most one part of ``s3_part_size`` bytes is held in memory and every
+    backend call runs in the bounded I/O pool (see ``storage.streaming``).
+
+    Args:
+        storage (StorageBackend): Storage backend.
+        chunks (AsyncIterator[bytes]): The file content, in arbitrary-sized chunks.
+        key (str): Key to save the file as in storage.
+
+    Returns:
+        bool: True if the upload succeeded, False otherwise.
+    """
+    try:
+        await put_stream(storage, key, chunks, s3_part_size)
         return True
     except Exception as e:
         return False
 
 
-def create_file_to_db(db: Session, new_file_data: FileCreate):
+def presign_upload(
+    db: Session,
+    storage: StorageBackend,
+    owner_id: int,
+    file_name: str,
+    size_bytes: Optional[int] = None,
+    sha256: Optional[str] = None,
+) -> dict:
+    """Mint a presigned PUT URL so the client uploads straight to storage.
+
+    The object goes to a temporary key of its own; the ``upload_token``
+    lets only this user register it with finalize_upload. If the client
+    declares a SHA-256 whose content is already stored, there is nothing to
+    upload: ``content_stored`` is True, no URL is minted and finalize_upload
+    references the existing blob.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend (must support presigned URLs)
+        owner_id (int): ID of the user uploading the file
+        file_name (str): Name of the file, extension included
+        size_bytes (Optional[int]): Announced size, checked against the single PUT limit
+        sha256 (Optional[str]): SHA-256 of the content, computed by the client
+
+    Returns:
+        dict: ``key``, ``url``, ``method``, ``expires_in``, ``upload_token``
+        and ``content_stored``
+
+    Raises:
+        ValueError: If the file is too large for a single PUT or the name is reserved
+        FileExistsError: If a file is already registered under the name
+    """
+    check_file_name(file_name)
+    if size_bytes is not None and size_bytes > S3_MAX_PUT_SIZE:
+        raise ValueError("File too large for a single PUT, use a multipart upload")
+    check_file_name_available(db, file_name)
+
+    stored_sha256 = _stored_sha256(db, sha256)
+    if stored_sha256 is not None:
+        return {
+            "key": None,
+            "url": None,
+            "expires_in": upload_token_ttl,
+            "upload_token": _upload_token(owner_id, file_name, None, stored_sha256),
+            "content_stored": True,
+        }
+
+    key = f"{STAGING_KEY_PREFIX}{uuid.uuid4().hex}"
+    return {
+        "key": key,
+        "url": storage.presign_put(key, presign_expires_in),
+        "method": "PUT",
+        "expires_in": presign_expires_in,
+        "upload_token": _upload_token(owner_id, file_name, key),
+        "content_stored": False,
+    }
+
+
+def presign_multipart_upload(
+    db: Session,
+    storage: StorageBackend,
+    owner_id: int,
+    file_name: str,
+    size_bytes: int,
+    sha256: Optional[str] = None,
+) -> dict:
+    """Start a multipart upload and mint one presigned URL per part.
+
+    The part size is ``s3_part_size``, grown if needed so the object fits in
+    S3_MAX_PARTS parts. The client PUTs each slice to its URL, keeps the ETag
+    response headers and sends them to complete_multipart_upload. As with
+    presign_upload, the object goes to a temporary key, and a declared
+    SHA-256 whose content is already stored skips the upload.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend (must support presigned URLs)
+        owner_id (int): ID of the user uploading the file
+        file_name (str): Name of the file, extension included
+        size_bytes (int): Total size of the file
+        sha256 (Optional[str]): SHA-256 of the content, computed by the client
+
+    Returns:
+        dict: ``key``, ``upload_id``, ``part_size``, ``expires_in``, ``parts``,
+        ``upload_token`` and ``content_stored``
+
+    Raises:
+        ValueError: If the name is reserved
+        FileExistsError: If a file is already registered under the name
+    """
+    check_file_name(file_name)
+    check_file_name_available(db, file_name)
+
+    stored_sha256 = _stored_sha256(db, sha256)
+    if stored_sha256 is not None:
+        return {
+            "key": None,
+            "upload_id": None,
+            "part_size": s3_part_size,
+            "expires_in": upload_token_ttl,
+            "parts": [],
+            "upload_token": _upload_token(owner_id, file_name, None, stored_sha256),
+            "content_stored": True,
+        }
+
+    key = f"{STAGING_KEY_PREFIX}{uuid.uuid4().hex}"
+    part_size = max(s3_part_size, math.ceil(size_bytes / S3_MAX_PARTS))
+    part_count = math.ceil(size_bytes / part_size)
+    upload_id = storage.create_multipart(key)
+    parts = [
+        {
+            "part_number": part_number,
+            "url": storage.presign_upload_part(key, upload_id, part_number, presign_expires_in),
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+    return {
+        "key": key,
+        "upload_id": upload_id,
+        "part_size": part_size,
+        "expires_in": presign_expires_in,
+        "parts": parts,
+        "upload_token": _upload_token(owner_id, file_name, key),
+        "content_stored": False,
+    }
+
+
+def complete_multipart_upload(
+    storage: StorageBackend, key: str, upload_id: str, parts: list[UploadedPart]
+) -> str:
+    """Assemble the parts uploaded through presigned URLs into the final object.
+
+    Args:
+        storage (StorageBackend): Storage backend
+        key (str): Key of the multipart upload
+        upload_id (str): ID returned by presign_multipart_upload
+        parts (list[UploadedPart]): Part numbers and the ETags S3 returned for them
+
+    Returns:
+        str: The ETag of the assembled object
+    """
+    ordered = sorted(parts, key=lambda part: part.part_number)
+    return storage.complete_multipart(
+        key,
+        upload_id,
+        [{"PartNumber": part.part_number, "ETag": part.etag} for part in ordered],
+    )
+
+
+def abort_multipart_upload(storage: StorageBackend, key: str, upload_id: str) -> None:
+    """Discard a multipart upload and the parts already uploaded.
+
+    Args:
+        storage (StorageBackend): Storage backend
+        key (str): Key of the multipart upload
+        upload_id (str): ID returned by presign_multipart_upload
+    """
+    storage.abort_multipart(key, upload_id)
+
+
+async def finalize_upload(
+    db: Session, storage: StorageBackend, request: FinalizeUploadRequest, owner_id: int
+) -> Optional[File]:
+    """Register in the database a file uploaded directly to storage.
+
+    Only the user the upload was presigned for can register it. Its content
+    never went through the API and is not read here either: the file is
+    registered at once on its temporary key, with the size and ETag of a
+    HEAD, and a background job (promote_staged_file) computes its SHA-256
+    and moves it to its blob. Uploads presigned with ``content_stored`` just
+    reference the existing blob.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
+        request (FinalizeUploadRequest): Upload token, folder and optional SHA-256
+        owner_id (int): ID of the user registering the file
+
+    Returns:
+        Optional[File]: The registered file, or None if the object (or the
+        stored content) does not exist
+
+    Raises:
+        PermissionError: If the upload token is not valid for this user
+        FileExistsError: If another file is already registered under that name
+    """
+    claims = read_upload_token(request.upload_token, owner_id)
+    key, file_name = claims["upload_key"], claims["file_name"]
+    check_file_name(file_name)
+    await run_blocking(check_file_name_available, db, file_name)
+    if key is None:
+        return await register_stored_content(
+            db, storage, claims["sha256"], file_name, request.folder_id, owner_id
+        )
+    info = await run_blocking(storage.head, key)
+    if info is None:
+        return None
+    return await run_blocking(
+        register_staged_upload, db, storage, key, info, file_name, request.folder_id,
+        owner_id, request.sha256,
+    )
+
+
+def register_staged_upload(
+    db: Session,
+    storage: StorageBackend,
+    key: str,
+    info: ObjectInfo,
+    file_name: str,
+    folder_id: int,
+    owner_id: int,
+    sha256: Optional[str] = None,
+) -> File:
+    """Register a file on the temporary key of its upload and queue its promotion.
+
+    The row and its PROMOTE_UPLOAD_JOB are committed together. Until the job
+    runs the file is served from the temporary key (see storage_key).
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
+        key (str): Temporary key of the content
+        info (ObjectInfo): HEAD of the temporary object
+        file_name (str): Name of the file, extension included
+        folder_id (int): ID of the folder of the file
+        owner_id (int): ID of the owner of the file
+        sha256 (Optional[str]): SHA-256 declared by the client, checked by the job
+
+    Returns:
+        File: The registered file
+    """
+    record = FileCreate(
+        **build_file_record(
+            storage, file_name, object_metadata(info, None), folder_id, owner_id,
+            staging_key=key,
+        )
+    )
+    new_file = File(**record.dict(), size_bytes=info.size)
+    try:
+        db.add(new_file)
+        db.flush()
+        enqueue_jobs(
+            db, PROMOTE_UPLOAD_JOB,
+            [{"file_id": new_file.file_id, "sha256": sha256.lower() if sha256 else None}],
+        )
+        db.commit()
+        db.refresh(new_file)
+    except Exception:
+        db.rollback()
+        raise
+
+    invalidate_files_cache()
+    notify_enqueued(PROMOTE_UPLOAD_JOB)
+    return new_file
+
+
+def promote_staged_file(db: Session, payload: dict) -> None:
+    """Job handler: move a presigned upload from its temporary key to its blob.
+
+    The object is read once from storage to compute its SHA-256 and copied
+    inside storage to its blob, unless that content is already stored. The
+    file then references the blob, its metadata extraction is queued and the
+    temporary object is deleted. Deleted and already promoted files are
+    skipped.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        payload (dict): ``file_id`` of the file, and the ``sha256`` declared by the client
+
+    Raises:
+        StorageError: If the object cannot be read or copied (the job is retried)
+        PermanentJobError: If the object is gone or does not match the declared
+            SHA-256; the file keeps its temporary key
+    """
+    file = db.get(File, payload["file_id"])
+    if file is None or file.staging_key is None:
+        return
+    key = file.staging_key
+    storage = get_storage()
+    if storage.head(key) is None:
+        raise PermanentJobError(f"Object '{key}' not found in storage")
+
+    digest = digest_stored_object(storage, key, s3_part_size)
+    if payload.get("sha256") and payload["sha256"] != digest.sha256:
+        raise PermanentJobError("The uploaded content does not match the declared SHA-256")
+    uploaded = set()
+    if not get_stored_blobs(db, [digest.sha256]):
+        storage.copy(key, blob_key(digest.sha256))
+        uploaded.add(digest.sha256)
+
+    try:
+        # El archivo puede haberse borrado mientras se copiaba
+        file = (
+            db.query(File)
+            .filter(File.file_id == payload["file_id"])
+            .populate_existing()
+            .with_for_update()
+            .first()
+        )
+        if file is None or file.staging_key != key:
+            db.rollback()
+            return
+        reference_blobs(db, {digest.sha256: (1, digest.size_bytes)}, uploaded)
+        file.blob_sha256 = digest.sha256
+        file.staging_key = None
+        file.s3_url = storage.url(blob_key(digest.sha256))
+        file.size_bytes = digest.size_bytes
+        file.file_metadata = {**(file.file_metadata or {}), **digest.as_metadata()}
+        if metadata_jobs_enabled:
+            enqueue_jobs(db, EXTRACT_METADATA_JOB, [{"file_id": file.file_id}])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    invalidate_files_cache()
+    if metadata_jobs_enabled:
+        notify_enqueued(EXTRACT_METADATA_JOB)
+    try:
+        storage.delete(key)
+    except Exception:
+        pass
+
+
+def invalidate_files_cache() -> None:
+    """Drop every cached listing and lookup after the files catalog changed."""
+    files_cache.invalidate()
+    file_name_index.invalidate()
+
+
+def upload_file_writer(storage: StorageBackend, uploaded_file) -> Callable[[str], Awaitable]:
+    """Build a store_blobs writer that streams an uploaded file from its start."""
+
+    async def write(key: str) -> None:
+        await uploaded_file.seek(0)
+        await put_stream(storage, key, iter_upload_file(uploaded_file), s3_part_size)
+
+    return write
+
+
+def create_files_to_db(
+    db: Session, new_files_data: list[FileCreate], uploaded_blobs: frozenset = frozenset()
+) -> list[File]:
+    """Create many files in the database with one bulk INSERT and one commit.
+
+    Either every row is inserted or none is. Files with ``blob_sha256`` add a
+    reference to their blob in the same transaction, and so is the job that
+    extracts the metadata of each file in the background (unless
+    METADATA_JOBS_ENABLED is false).
+
+    Args:
+        db (Session): SQLAlchemy session object
+        new_files_data (list[FileCreate]): Files to be created
+        uploaded_blobs (frozenset): Digests whose content was just written to storage
+
+    Returns:
+        list[File]: Created File objects, in the same order
+
+    Raises:
+        BlobMissingError: If a blob whose upload was skipped is no longer stored
+    """
+    if not new_files_data:
+        return []
+
+    rows = [
+        {**file_data.dict(), "size_bytes": file_data.file_metadata.size_bytes}
+        for file_data in new_files_data
+    ]
+    refs: dict[str, tuple[int, int]] = {}
+    for row in rows:
+        if row["blob_sha256"]:
+            count, size_bytes = refs.get(row["blob_sha256"], (0, row["size_bytes"]))
+            refs[row["blob_sha256"]] = (count + 1, size_bytes)
+
+    # Si otra petición crea el mismo blob a la vez, se reintenta y se suma a él
+    for attempt in range(2):
+        try:
+            reference_blobs(db, refs, uploaded_blobs)
+            new_files = db.scalars(
+                insert(File).returning(File, sort_by_parameter_order=True), rows
+            ).all()
+            if metadata_jobs_enabled:
+                enqueue_jobs(
+                    db, EXTRACT_METADATA_JOB, [{"file_id": file.file_id} for file in new_files]
+                )
+            db.commit()
+            break
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+        except Exception:
+            db.rollback()
+            raise
+
+    invalidate_files_cache()
+    if metadata_jobs_enabled:
+        notify_enqueued(EXTRACT_METADATA_JOB)
+    return list(new_files)
+
+
+def create_file_to_db(
+    db: Session, new_file_data: FileCreate, uploaded_blobs: frozenset = frozenset()
+) -> File:
     """Create a new file in the database.
 
     Args:
         db (Session): SQLAlchemy session object
         new_file_data (FileCreate): File data to be created
+        uploaded_blobs (frozenset): Digests whose content was just written to storage
 
     Returns:
         File: Created File object
     """
+    return create_files_to_db(db, [new_file_data], uploaded_blobs)[0]
 
-    new_file = File(**new_file_data.dict())
 
-    db.add(new_file)
-    db.commit()
-    db.refresh(new_file)
-    return new_file
+async def store_blobs(
+    db: Session,
+    writers: dict[str, Callable[[str], Awaitable]],
+    skip_stored: bool = True,
+    concurrency: int = batch_upload_concurrency,
+) -> Tuple[frozenset, dict[str, str]]:
+    """Write to storage the contents that are not stored as blobs yet.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        writers (dict[str, Callable]): SHA-256 -> coroutine function that writes
+            that content under the key it receives
+        skip_stored (bool): Skip the contents that already have a blob
+        concurrency (int): Maximum number of writes in flight
+
+    Returns:
+        Tuple[frozenset, dict[str, str]]: The digests written, and an error
+        message for each one that failed
+    """
+    stored = await run_blocking(get_stored_blobs, db, list(writers)) if skip_stored else set()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    written, errors = set(), {}
 
+    async def write_one(sha256: str):
+        async with semaphore:
+            try:
+                await writers[sha256](blob_key(sha256))
+                written.add(sha256)
+            except Exception as e:
+                errors[sha256] = f"Failed to upload file to storage: {str(e)}"
 
-def delete_file_from_db(db: Session, file_id: int, user_id: int) -> Tuple[int, str]:
+    await asyncio.gather(*(write_one(sha256) for sha256 in writers if sha256 not in stored))
+    return frozenset(written), errors
+
+
+async def register_blob_files(
+    db: Session,
+    records: list[FileCreate],
+    writers: dict[str, Callable[[str], Awaitable]],
+    written: frozenset,
+) -> Tuple[list[File], frozenset]:
+    """Create the files of records whose content went through store_blobs.
+
+    If a blob whose upload was skipped was deleted in the meantime (its last
+    file was removed concurrently), that content is written again and the
+    registration retried once.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        records (list[FileCreate]): Files to be created, with ``blob_sha256`` set
+        writers (dict[str, Callable]): The writers passed to store_blobs
+        written (frozenset): The digests store_blobs wrote
+
+    Returns:
+        Tuple[list[File], frozenset]: Created File objects, in the same order,
+        and every digest written to storage
+    """
+    try:
+        return await run_blocking(create_files_to_db, db, records, written), written
+    except BlobMissingError as e:
+        rewritten, errors = await store_blobs(
+            db, {sha256: writers[sha256] for sha256 in e.shas}, skip_stored=False
+        )
+        if errors:
+            raise
+        written = written | rewritten
+        return await run_blocking(create_files_to_db, db, records, written), written
+
+
+def delete_file_from_db(
+    db: Session, file_id: int, user: CurrentUser, storage: Optional[StorageBackend] = None
+) -> Tuple[int, str]:
     """Delete a file from the database.
 
+    The reference to its blob, if any, is dropped in the same transaction.
+
     Args:
         db (Session): SQLAlchemy session object
         file_id (int): ID of the file to be deleted
+        user (CurrentUser): User requesting the deletion; needs write access
+        storage (Optional[StorageBackend]): If given, a blob left without files
+            is deleted from it after the commit (see delete_unreferenced_blobs),
+            and so is the temporary object of a presigned upload not promoted yet
 
     Returns:
-        bool: True if deletion was successful, False otherwise
+        Tuple[int, str]: 1 if deleted, 0 if not found or forbidden, -1 on error,
+        and a message
     """
 
     try:
-        is_user_owner = db.query(File).filter(File.file_id == file_id, File.owner_id == user_id).first()
-        is_admin = db.query(User).filter(User.user_id == user_id, User.role_id == ADMIN_ROLE_ID).first()
-        if not (is_user_owner or is_admin):
-            return (0, "You are not the owner of this file or an admin")
-        
-        file_to_delete = db.query(File).filter(File.file_id == file_id).first()
-        if not file_to_delete:
+        access_level = get_file_access_level(db, user, file_id)
+        if access_level is None:
             return (0, "File not found")
+        if access_level < WRITE:
+            return (0, "You do not have write access to this file")
 
-        db.delete(file_to_delete)
+        blob_sha256, staging_key = (
+            db.query(File.blob_sha256, File.staging_key).filter(File.file_id == file_id).one()
+        )
+        db.query(FileTag).filter(FileTag.file_id == file_id).delete(synchronize_session=False)
+        db.query(FileRole).filter(FileRole.file_id == file_id).delete(synchronize_session=False)
+        db.query(File).filter(File.file_id == file_id).delete(synchronize_session=False)
+        unreferenced = release_blobs(db, {blob_sha256: 1}) if blob_sha256 else []
         db.commit()
+        invalidate_files_cache()
+        if unreferenced and storage is not None:
+            delete_unreferenced_blobs(db, storage, unreferenced)
+        if staging_key and storage is not None:
+            try:
+                storage.delete(staging_key)
+            except Exception:
+                pass
         return (1, "File deleted successfully")
     except Exception as e:
+        db.rollback()
         return (-1, f"Error deleting file. {str(e)}")
 
 
-def delete_file_from_s3(db: Session, s3_bucket_name: str, file_name: str) -> str:
-    """Delete a file from S3 bucket.
-    
+def delete_files_bulk(
+    db: Session, storage: StorageBackend, file_ids: list[int], user: CurrentUser
+) -> list[dict]:
+    """Delete many files from storage and from the database.
+
+    Write access is resolved for every file at once (one query for the files,
+    the folder levels mostly from the ACL cache).
+    Files stored by name have their objects removed with the backend's batch
+    delete (S3 DeleteObjects, 1000 keys per request) and then, in a single
+    transaction, exactly the rows whose object was deleted are removed together
+    with their tag and role links. Files stored as blobs are removed in that
+    same transaction, dropping their blob references; only blobs left without
+    files are deleted from storage. Presigned uploads not promoted yet lose
+    their temporary objects after the commit.
+
     Args:
         db (Session): SQLAlchemy session object
-        s3_bucket_name (str): S3 bucket name
+        storage (StorageBackend): Storage backend
+        file_ids (list[int]): IDs of the files to delete (duplicates are ignored)
+        user (CurrentUser): User requesting the deletion
+
+    Returns:
+        list[dict]: One ``{"file_id", "status", "error"}`` per file, where status is
+        "deleted", "not_found", "forbidden" or "failed"
+    """
+    results = {
+        file_id: {"file_id": file_id, "status": "not_found", "error": "File not found"}
+        for file_id in dict.fromkeys(file_ids)
+    }
+
+    rows = (
+        db.query(
+            File.file_id, File.file_name, File.file_type, File.owner_id, File.folder_id,
+            File.blob_sha256, File.staging_key,
+        )
+        .filter(File.file_id.in_(list(results)))
+        .all()
+    )
+    access_levels = get_file_access_levels(db, user, rows)
+
+    # Clave de storage -> archivos que la usan; blob -> referencias a soltar
+    keys: dict[str, list[int]] = {}
+    blob_refs: dict[str, int] = {}
+    blob_file_ids, deleted_ids, staging_keys = set(), [], []
+    for row in rows:
+        if access_levels[row.file_id] < WRITE:
+            results[row.file_id].update(
+                status="forbidden", error="You do not have write access to this file"
+            )
+        elif row.blob_sha256:
+            blob_refs[row.blob_sha256] = blob_refs.get(row.blob_sha256, 0) + 1
+            blob_file_ids.add(row.file_id)
+            deleted_ids.append(row.file_id)
+        elif row.staging_key:
+            # Subida firmada aún sin blob: su objeto temporal se borra tras el commit
+            staging_keys.append(row.staging_key)
+            blob_file_ids.add(row.file_id)
+            deleted_ids.append(row.file_id)
+        elif is_reserved_key(f"{row.file_name}{row.file_type}"):
+            # Esa clave no es del archivo (es un blob o una subida): solo se borra la fila
+            deleted_ids.append(row.file_id)
+        else:
+            keys.setdefault(f"{row.file_name}{row.file_type}", []).append(row.file_id)
+
+    errors = storage.delete_many(list(keys)) if keys else {}
+    for key, ids in keys.items():
+        for file_id in ids:
+            if key in errors:
+                results[file_id].update(status="failed", error=errors[key])
+            else:
+                deleted_ids.append(file_id)
+
+    if deleted_ids:
+        try:
+            db.query(FileTag).filter(FileTag.file_id.in_(deleted_ids)).delete(synchronize_session=False)
+            db.query(FileRole).filter(FileRole.file_id.in_(deleted_ids)).delete(synchronize_session=False)
+            db.query(File).filter(File.file_id.in_(deleted_ids)).delete(synchronize_session=False)
+            unreferenced = release_blobs(db, blob_refs)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            for file_id in deleted_ids:
+                results[file_id].update(
+                    status="failed",
+                    error=f"Error deleting file from DB: {str(e)}"
+                    if file_id in blob_file_ids
+                    else f"Deleted from storage but not from DB: {str(e)}",
+                )
+        else:
+            invalidate_files_cache()
+            for file_id in deleted_ids:
+                results[file_id].update(status="deleted", error=None)
+            delete_unreferenced_blobs(db, storage, unreferenced)
+            if staging_keys:
+                try:
+                    storage.delete_many(staging_keys)
+                except Exception:
+                    pass
+
+    return list(results.values())
+
+
+def delete_file_from_storage(
+    db: Session, storage: StorageBackend, file_name: str
+) -> bool:
+    """Delete a file from storage.
+
+    Blobs are shared by every file with the same content, so they are only
+    deleted through delete_file_from_db; keys under the reserved prefixes
+    (blobs and staged uploads) are never deleted by name.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        storage (StorageBackend): Storage backend
         file_name (str): Name of the file to be deleted
-        
+
     Returns:
-        str: Response from S3 delete operation or None if file not found
+        bool: True if the object was deleted, None if the deletion failed
+
+    Raises:
+        ValueError: If the file is stored as a blob, or the key is reserved
     """
-    
-    file = get_file_by_name_in_db(db, file_name)
+
+    file = get_file_by_full_name(db, file_name)
     if file is not None:
-        file_type = file.file_type if file else None
-        
-        file_name = f"{file_name}{file_type}"
-    s3 = boto3.client("s3")
+        if file.blob_sha256:
+            raise ValueError("The content of this file is shared; delete the file instead")
+        file_name = storage_key(file)
+    if is_reserved_key(file_name):
+        raise ValueError("Blobs and staged uploads are only deleted through their files")
 
     try:
-        response = s3.delete_object(Bucket=s3_bucket_name, Key=file_name)
-        return response
+        storage.delete(file_name)
+        return True
     except Exception as e:
         return None
+
+
+# Manejadores de los trabajos de este módulo, por tipo
+UPLOAD_JOB_HANDLERS = {PROMOTE_UPLOAD_JOB: promote_staged_file}
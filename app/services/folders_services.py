@@ -0,0 +1,275 @@
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+from sqlalchemy import String, and_, case, cast, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from models.model import Folder
+from schemas.folder_schema import FolderCreate, MAX_SUBTREE_FOLDERS
+from services.files_services import invalidate_files_cache
+from services.permissions_services import invalidate_acl_cache
+from utils.folder_paths import folder_prefix, prefix_upper_bound
+from utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
+
+
+def get_folder_by_id(db: Session, folder_id: int):
+    """Get a folder by ID from the database.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder to retrieve
+
+    Returns:
+        Folder: Folder object if found, None otherwise
+    """
+
+    return db.query(Folder).filter(Folder.folder_id == folder_id).first()
+
+
+def create_folder(db: Session, folder_data: FolderCreate):
+    """Create a folder with a single INSERT, under a parent or as a root.
+
+    The path and depth are computed from the parent row in the same
+    ``INSERT ... SELECT``, so no extra round trip is needed.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_data (FolderCreate): Name and parent of the new folder
+
+    Returns:
+        Folder: Created Folder object, or None if the parent does not exist
+    """
+
+    now = datetime.now(timezone.utc)
+    if folder_data.parent_folder_id is None:
+        folder = Folder(folder_name=folder_data.folder_name, path="/", depth=0)
+        db.add(folder)
+        db.commit()
+        db.refresh(folder)
+        return folder
+
+    parent = aliased(Folder)
+    rows = select(
+        literal(folder_data.folder_name),
+        parent.folder_id,
+        parent.path + cast(parent.folder_id, String) + "/",
+        parent.depth + 1,
+        literal(now),
+        literal(now),
+    ).where(parent.folder_id == folder_data.parent_folder_id)
+    stmt = (
+        insert(Folder)
+        .from_select(
+            ["folder_name", "parent_folder_id", "path", "depth", "created_at", "updated_at"],
+            rows,
+        )
+        .returning(Folder)
+    )
+    folder = db.scalars(stmt).first()
+    db.commit()
+    return folder
+
+
+def rename_folder(db: Session, folder_id: int, folder_name: str):
+    """Rename a folder. Paths hold ids, so no descendant needs to change.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder to rename
+        folder_name (str): New name
+
+    Returns:
+        Folder: Updated Folder object if found, None otherwise
+    """
+
+    stmt = (
+        update(Folder)
+        .where(Folder.folder_id == folder_id)
+        .values(folder_name=folder_name, updated_at=datetime.now(timezone.utc))
+        .returning(Folder)
+        .execution_options(synchronize_session=False)
+    )
+    folder = db.scalars(stmt).first()
+    db.commit()
+    if folder:
+        # Los listados de archivos incluyen el nombre de la carpeta
+        invalidate_files_cache()
+    return folder
+
+
+def move_folder(db: Session, folder_id: int, parent_folder_id: Optional[int]):
+    """Move a folder, with its whole subtree, under another parent.
+
+    The folder and the new parent are read (and locked) with one query; then
+    a single set-based UPDATE rewrites the path prefix and depth of every
+    folder in the subtree.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder to move
+        parent_folder_id (Optional[int]): ID of the new parent, None to make it a root
+
+    Returns:
+        Folder: Moved Folder object, or None if the folder does not exist
+
+    Raises:
+        LookupError: If the new parent does not exist.
+        ValueError: If the new parent is the folder itself or one of its descendants.
+    """
+
+    ids = {folder_id} if parent_folder_id is None else {folder_id, parent_folder_id}
+    rows = {
+        folder.folder_id: folder
+        for folder in db.query(Folder).filter(Folder.folder_id.in_(ids)).with_for_update()
+    }
+    folder = rows.get(folder_id)
+    if folder is None:
+        db.rollback()
+        return None
+
+    old_path, old_prefix = folder.path, folder_prefix(folder.path, folder.folder_id)
+    if parent_folder_id is None:
+        new_path = "/"
+    else:
+        parent = rows.get(parent_folder_id)
+        if parent is None:
+            db.rollback()
+            raise LookupError(f"Parent folder #{parent_folder_id} not found")
+        new_path = folder_prefix(parent.path, parent.folder_id)
+        if parent_folder_id == folder_id or new_path.startswith(old_prefix):
+            db.rollback()
+            raise ValueError("A folder cannot be moved into itself or one of its descendants")
+
+    depth_delta = new_path.count("/") - old_path.count("/")
+    db.execute(
+        update(Folder)
+        .where(
+            or_(
+                Folder.folder_id == folder_id,
+                and_(Folder.path >= old_prefix, Folder.path < prefix_upper_bound(old_prefix)),
+            )
+        )
+        .values(
+            path=literal(new_path) + func.substr(Folder.path, len(old_path) + 1),
+            depth=Folder.depth + depth_delta,
+            parent_folder_id=case(
+                (Folder.folder_id == folder_id, parent_folder_id),
+                else_=Folder.parent_folder_id,
+            ),
+            updated_at=case(
+                (Folder.folder_id == folder_id, datetime.now(timezone.utc)),
+                else_=Folder.updated_at,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    # Los permisos heredados dependen de los ancestros
+    invalidate_acl_cache()
+    db.refresh(folder)
+    return folder
+
+
+def get_children_page(
+    db: Session,
+    parent_folder_id: Optional[int],
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list[Folder], Optional[str]]:
+    """Get one keyset-paginated page of the direct children of a folder, by name.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        parent_folder_id (Optional[int]): ID of the parent, None for the root folders
+        limit (int): Maximum number of folders in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+
+    Returns:
+        Tuple[list[Folder], Optional[str]]: The folders of the page and the
+        cursor of the next one (None on the last page)
+    """
+
+    query = db.query(Folder).filter(
+        Folder.parent_folder_id.is_(None)
+        if parent_folder_id is None
+        else Folder.parent_folder_id == parent_folder_id
+    )
+    return paginate_keyset(
+        query, Folder.folder_name, Folder.folder_id, False, limit, cursor, sort_key="folder_name:asc"
+    )
+
+
+def get_subtree(
+    db: Session,
+    folder_id: int,
+    max_depth: Optional[int] = None,
+    limit: int = MAX_SUBTREE_FOLDERS,
+) -> Tuple[list[Folder], bool]:
+    """Get a folder and all its descendants with a single query.
+
+    Descendants are the folders whose path starts with the folder's prefix,
+    which the index on ``path`` serves as a range scan however deep the tree is.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the root of the subtree
+        max_depth (Optional[int]): Levels below the root to include, None for all
+        limit (int): Maximum number of folders to return
+
+    Returns:
+        Tuple[list[Folder], bool]: The folders ordered by depth and name (empty
+        if the folder does not exist) and whether the result was truncated
+    """
+
+    root = aliased(Folder)
+    prefix = root.path + cast(root.folder_id, String) + "/"
+    upper_bound = root.path + cast(root.folder_id, String) + "0"
+    query = (
+        db.query(Folder)
+        .join(root, root.folder_id == folder_id)
+        .filter(
+            or_(
+                Folder.folder_id == root.folder_id,
+                and_(Folder.path >= prefix, Folder.path < upper_bound),
+            )
+        )
+    )
+    if max_depth is not None:
+        query = query.filter(Folder.depth <= root.depth + max_depth)
+
+    folders = (
+        query.order_by(Folder.depth, Folder.folder_name, Folder.folder_id).limit(limit + 1).all()
+    )
+    return folders[:limit], len(folders) > limit
+
+
+def get_breadcrumbs(db: Session, folder_id: int) -> list[Folder]:
+    """Get the chain of folders from the root down to a folder with a single query.
+
+    A recursive CTE follows ``parent_folder_id`` upwards, one primary key
+    lookup per level.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the last folder of the chain
+
+    Returns:
+        list[Folder]: The ancestors and the folder itself, root first (empty if
+        the folder does not exist)
+    """
+
+    chain = (
+        select(Folder.folder_id, Folder.parent_folder_id)
+        .where(Folder.folder_id == folder_id)
+        .cte("chain", recursive=True)
+    )
+    chain = chain.union_all(
+        select(Folder.folder_id, Folder.parent_folder_id).join(
+            chain, Folder.folder_id == chain.c.parent_folder_id
+        )
+    )
+    return (
+        db.query(Folder)
+        .join(chain, Folder.folder_id == chain.c.folder_id)
+        .order_by(Folder.depth)
+        .all()
+    )
@@ -0,0 +1,347 @@
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from models.model import Job
+from utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
+
+load_dotenv()
+
+# Estados de un trabajo
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+JOB_STATUSES = (PENDING, RUNNING, DONE, FAILED)
+
+# Intentos por trabajo y espera (segundos) antes de cada reintento: base * 2^(intento-1)
+job_max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+job_retry_base_delay = float(os.getenv("JOB_RETRY_BASE_DELAY", 5))
+job_retry_max_delay = float(os.getenv("JOB_RETRY_MAX_DELAY", 600))
+# Un trabajo en ejecución más tiempo que esto se da por abandonado (worker caído)
+job_lock_timeout = float(os.getenv("JOB_LOCK_TIMEOUT", 300))
+# Días que se guardan los trabajos terminados
+job_retention_days = float(os.getenv("JOB_RETENTION_DAYS", 7))
+
+# Longitud máxima del error guardado de un intento fallido
+MAX_ERROR_LENGTH = 2000
+
+# Avisos de trabajos nuevos a los workers de este proceso
+_enqueue_listeners: list[Callable[[str], None]] = []
+_listeners_lock = threading.Lock()
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler when retrying cannot succeed; the job fails at once."""
+
+
+def _utcnow() -> datetime:
+    # Las columnas son TIMESTAMP sin zona, siempre en UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def add_enqueue_listener(listener: Callable[[str], None]) -> None:
+    """Register a callback run with the job type after new jobs are committed."""
+    with _listeners_lock:
+        _enqueue_listeners.append(listener)
+
+
+def remove_enqueue_listener(listener: Callable[[str], None]) -> None:
+    """Unregister a callback added with add_enqueue_listener."""
+    with _listeners_lock:
+        if listener in _enqueue_listeners:
+            _enqueue_listeners.remove(listener)
+
+
+def notify_enqueued(job_type: str) -> None:
+    """Wake the in-process workers after committing jobs of ``job_type``.
+
+    Workers in other processes find the jobs on their next poll.
+    """
+    with _listeners_lock:
+        listeners = list(_enqueue_listeners)
+    for listener in listeners:
+        listener(job_type)
+
+
+def enqueue_jobs(
+    db: Session,
+    job_type: str,
+    payloads: Iterable[dict],
+    max_attempts: Optional[int] = None,
+    delay: float = 0,
+) -> int:
+    """Add jobs to the queue, inside the caller's transaction.
+
+    Nothing is committed: the jobs become visible with whatever the caller
+    writes in the same transaction (e.g. the file rows they process), and are
+    discarded with it on rollback. Call notify_enqueued after the commit.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        job_type (str): Name of the handler that runs the jobs
+        payloads (Iterable[dict]): One JSON payload per job
+        max_attempts (Optional[int]): Attempts before failing, JOB_MAX_ATTEMPTS by default
+        delay (float): Seconds before the jobs can run
+
+    Returns:
+        int: Number of jobs added
+    """
+    now = _utcnow()
+    rows = [
+        {
+            "job_type": job_type,
+            "payload": payload,
+            "status": PENDING,
+            "attempts": 0,
+            "max_attempts": max_attempts or job_max_attempts,
+            "run_after": now + timedelta(seconds=delay),
+            "created_at": now,
+        }
+        for payload in payloads
+    ]
+    if rows:
+        db.execute(insert(Job), rows)
+    return len(rows)
+
+
+def release_stale_jobs(db: Session) -> int:
+    """Return to the queue the jobs whose worker stopped without finishing them.
+
+    A job running for longer than JOB_LOCK_TIMEOUT counts as a failed attempt:
+    it is retried, or failed if it has no attempts left.
+
+    Returns:
+        int: Number of jobs released
+    """
+    now = _utcnow()
+    stale = db.query(Job).filter(
+        Job.status == RUNNING, Job.locked_at < now - timedelta(seconds=job_lock_timeout)
+    )
+    released = {
+        Job.locked_by: None,
+        Job.locked_at: None,
+        Job.last_error: "Lock expired: the worker stopped while running the job",
+    }
+    failed = stale.filter(Job.attempts >= Job.max_attempts).update(
+        {**released, Job.status: FAILED, Job.finished_at: now}, synchronize_session=False
+    )
+    retried = stale.filter(Job.attempts < Job.max_attempts).update(
+        {**released, Job.status: PENDING, Job.run_after: now}, synchronize_session=False
+    )
+    db.commit()
+    return failed + retried
+
+
+def claim_jobs(
+    db: Session, worker_id: str, job_types: Iterable[str], limit: int
+) -> list[Tuple[int, str, dict, int]]:
+    """Take up to ``limit`` due jobs of these types for a worker, oldest first.
+
+    The rows are locked with ``FOR UPDATE SKIP LOCKED`` (PostgreSQL), so
+    concurrent workers, in this process or others, never take the same job
+    and do not wait for each other; the update only applies to rows that are
+    still pending. Each claim counts as one attempt.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        worker_id (str): Identifier of the worker, stored in ``locked_by``
+        job_types (Iterable[str]): Types the worker has handlers for
+        limit (int): Maximum number of jobs
+
+    Returns:
+        list[Tuple[int, str, dict, int]]: ``(job_id, job_type, payload, attempts)``
+        of the claimed jobs
+    """
+    job_types = list(job_types)
+    if limit <= 0 or not job_types:
+        return []
+    now = _utcnow()
+    try:
+        job_ids = list(
+            db.scalars(
+                select(Job.job_id)
+                .where(Job.status == PENDING, Job.run_after <= now, Job.job_type.in_(job_types))
+                .order_by(Job.run_after, Job.job_id)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+        )
+        if not job_ids:
+            db.rollback()
+            return []
+        claimed = db.execute(
+            update(Job)
+            .where(Job.job_id.in_(job_ids), Job.status == PENDING)
+            .values(
+                status=RUNNING,
+                attempts=Job.attempts + 1,
+                locked_by=worker_id,
+                locked_at=now,
+            )
+            .returning(Job.job_id, Job.job_type, Job.payload, Job.attempts)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return sorted((tuple(row) for row in claimed), key=lambda row: job_ids.index(row[0]))
+
+
+def complete_job(db: Session, job_id: int) -> None:
+    """Mark a claimed job as done.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        job_id (int): ID of the job
+    """
+    now = _utcnow()
+    db.query(Job).filter(Job.job_id == job_id).update(
+        {
+            Job.status: DONE,
+            Job.locked_by: None,
+            Job.locked_at: None,
+            Job.last_error: None,
+            Job.finished_at: now,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before the next attempt of a job that failed ``attempts`` times."""
+    return min(job_retry_base_delay * 2 ** max(attempts - 1, 0), job_retry_max_delay)
+
+
+def fail_job(db: Session, job_id: int, error: str, permanent: bool = False) -> bool:
+    """Record a failed attempt of a claimed job.
+
+    The job goes back to the queue with exponential backoff, or fails for
+    good when it has no attempts left or the error is ``permanent``.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        job_id (int): ID of the job
+        error (str): Description of the error
+        permanent (bool): Whether retrying cannot succeed
+
+    Returns:
+        bool: True if the job will be retried, False if it failed for good
+    """
+    job = db.get(Job, job_id)
+    if job is None:
+        return False
+    now = _utcnow()
+    retry = not permanent and job.attempts < job.max_attempts
+    job.status = PENDING if retry else FAILED
+    job.run_after = now + timedelta(seconds=retry_delay(job.attempts)) if retry else job.run_after
+    job.finished_at = None if retry else now
+    job.locked_by = None
+    job.locked_at = None
+    job.last_error = error[:MAX_ERROR_LENGTH]
+    db.commit()
+    return retry
+
+
+def retry_job(db: Session, job_id: int) -> Optional[Job]:
+    """Queue a failed job again, with a fresh set of attempts.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        job_id (int): ID of the job
+
+    Returns:
+        Optional[Job]: The job, or None if it does not exist
+
+    Raises:
+        ValueError: If the job has not failed
+    """
+    job = db.get(Job, job_id)
+    if job is None:
+        return None
+    if job.status != FAILED:
+        raise ValueError(f"Only failed jobs can be retried (job is {job.status})")
+    job.status = PENDING
+    job.attempts = 0
+    job.run_after = _utcnow()
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    notify_enqueued(job.job_type)
+    return job
+
+
+def delete_finished_jobs(db: Session, older_than_days: float = job_retention_days) -> int:
+    """Delete the done jobs finished more than ``older_than_days`` ago.
+
+    Failed jobs are kept so they can be inspected and retried.
+
+    Returns:
+        int: Number of jobs deleted
+    """
+    cutoff = _utcnow() - timedelta(days=older_than_days)
+    deleted = db.query(Job).filter(Job.status == DONE, Job.finished_at < cutoff).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    return deleted
+
+
+def get_job_stats(db: Session) -> dict:
+    """Get the size of the queue: jobs per type and status, and the oldest due job.
+
+    Args:
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        dict: ``counts`` ({job_type: {status: n}}) and ``oldest_pending_seconds``,
+        how long the oldest due pending job has been waiting (None if none is due)
+    """
+    counts: dict[str, dict[str, int]] = {}
+    for job_type, status, count in db.query(Job.job_type, Job.status, func.count()).group_by(
+        Job.job_type, Job.status
+    ):
+        counts.setdefault(job_type, {s: 0 for s in JOB_STATUSES})[status] = count
+
+    now = _utcnow()
+    oldest = db.query(func.min(Job.run_after)).filter(
+        Job.status == PENDING, Job.run_after <= now
+    ).scalar()
+    return {
+        "counts": counts,
+        "oldest_pending_seconds": (now - oldest).total_seconds() if oldest else None,
+    }
+
+
+def get_jobs_page(
+    db: Session,
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list[Job], Optional[str]]:
+    """Get a page of jobs, newest first.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        status (Optional[str]): Only jobs in this status
+        job_type (Optional[str]): Only jobs of this type
+        limit (int): Maximum number of jobs in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+
+    Returns:
+        Tuple[list[Job], Optional[str]]: The jobs and the cursor of the next page
+    """
+    query = db.query(Job)
+    if status is not None:
+        query = query.filter(Job.status == status)
+    if job_type is not None:
+        query = query.filter(Job.job_type == job_type)
+    sort_key = f"jobs:{status or ''}:{job_type or ''}"
+    return paginate_keyset(query, Job.job_id, Job.job_id, True, limit, cursor, sort_key)
@@ -0,0 +1,132 @@
+import os
+from datetime import datetime, timezone
+from typing import Optional
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from models.model import File
+from storage import StorageBackend, get_storage
+from utils.file_metadata import extract_metadata
+from services.jobs_services import PermanentJobError, enqueue_jobs, notify_enqueued
+from services.files_services import EXTRACT_METADATA_JOB, invalidate_files_cache, storage_key
+
+load_dotenv()
+
+# Archivos de hasta este tamaño se leen enteros (páginas y texto de PDF y Word);
+# de los mayores solo se leen los primeros bytes (tipo MIME y dimensiones)
+metadata_max_bytes = int(os.getenv("METADATA_MAX_BYTES", 20 * 1024 * 1024))
+metadata_head_bytes = int(os.getenv("METADATA_HEAD_BYTES", 256 * 1024))
+metadata_snippet_chars = int(os.getenv("METADATA_SNIPPET_CHARS", 500))
+
+# Claves de file_metadata que escribe la extracción
+EXTRACTED_KEYS = ("mime_type", "width", "height", "pages", "text_snippet", "extracted_at")
+
+# Archivos por lote al encolar los que no tienen metadatos extraídos
+_BACKFILL_BATCH_SIZE = 1000
+
+
+def _read_content(storage: StorageBackend, key: str, size_bytes: int) -> tuple[bytes, bool]:
+    if size_bytes <= metadata_max_bytes:
+        return b"".join(storage.get_stream(key)), True
+    return b"".join(storage.get_stream(key, 0, metadata_head_bytes - 1)), False
+
+
+def _extracted_from_blob(db: Session, file: File) -> Optional[dict]:
+    # Otro archivo con el mismo contenido ya pasó por la extracción
+    for (file_metadata,) in db.query(File.file_metadata).filter(
+        File.blob_sha256 == file.blob_sha256, File.file_id != file.file_id
+    ).limit(20):
+        if file_metadata and file_metadata.get("extracted_at"):
+            return {key: file_metadata[key] for key in EXTRACTED_KEYS if key in file_metadata}
+    return None
+
+
+def extract_file_metadata(db: Session, payload: dict) -> None:
+    """Job handler: add the MIME type, image size, page count and text snippet of a file.
+
+    The results are merged into ``file_metadata`` with the time of the
+    extraction; files that share their blob with an already processed file
+    reuse its results without reading the content. Deleted files and files
+    already processed are skipped.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        payload (dict): ``file_id`` of the file, and ``force`` to extract it again
+
+    Raises:
+        StorageError: If the content cannot be read (the job is retried)
+        PermanentJobError: If the file has no content in storage
+    """
+    file = db.get(File, payload["file_id"])
+    if file is None:
+        return
+    current = dict(file.file_metadata or {})
+    if current.get("extracted_at") and not payload.get("force"):
+        return
+
+    extracted = _extracted_from_blob(db, file) if file.blob_sha256 else None
+    if extracted is None:
+        storage = get_storage()
+        key = storage_key(file)
+        info = storage.head(key)
+        if info is None:
+            raise PermanentJobError(f"Object '{key}' not found in storage")
+        data, complete = _read_content(storage, key, info.size)
+        extracted = extract_metadata(
+            data, f"{file.file_name}{file.file_type}", complete, metadata_snippet_chars
+        )
+        extracted["extracted_at"] = datetime.now(timezone.utc).isoformat()
+
+    # Un reintento no deja claves de una extracción anterior
+    for key in EXTRACTED_KEYS:
+        current.pop(key, None)
+    file.file_metadata = {**current, **extracted}
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_files_cache()
+
+
+def enqueue_missing_metadata_jobs(db: Session) -> int:
+    """Queue the extraction of every file whose metadata was never extracted.
+
+    Used once after enabling the extraction on a database with files.
+
+    Args:
+        db (Session): SQLAlchemy session object
+
+    Returns:
+        int: Number of jobs queued
+    """
+    queued = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(File.file_id, File.file_metadata)
+            .filter(File.file_id > last_id)
+            .order_by(File.file_id)
+            .limit(_BACKFILL_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].file_id
+        queued += enqueue_jobs(
+            db,
+            EXTRACT_METADATA_JOB,
+            [
+                {"file_id": row.file_id}
+                for row in rows
+                if not (row.file_metadata or {}).get("extracted_at")
+            ],
+        )
+        db.commit()
+    if queued:
+        notify_enqueued(EXTRACT_METADATA_JOB)
+    return queued
+
+
+# Manejadores de los trabajos de este módulo, por tipo
+METADATA_JOB_HANDLERS = {EXTRACT_METADATA_JOB: extract_file_metadata}
@@ -0,0 +1,426 @@
+import os
+from typing import Iterable, Optional
+from dotenv import load_dotenv
+from sqlalchemy import String, and_, case, cast, exists, literal, or_
+from sqlalchemy.orm import Session, aliased
+
+from models.model import File, Folder, FileRole, FolderRole, Role
+from schemas.user_schema import CurrentUser
+from schemas.permission_schema import FolderRoleSet, FileRoleSet
+from utils.auth import ADMIN_ROLE_ID
+from utils.cache import get_cache, make_cache_key, invalidate_cache
+from utils.folder_paths import folder_prefix, prefix_upper_bound
+
+load_dotenv()
+
+# Niveles de acceso; cada uno incluye a los anteriores
+ACCESS_LEVELS = {"none": 0, "read": 1, "write": 2, "admin": 3}
+NONE, READ, WRITE, ADMIN = 0, 1, 2, 3
+ACCESS_LEVEL_NAMES = {rank: name for name, rank in ACCESS_LEVELS.items()}
+
+# Nivel de un rol sobre los archivos sin ninguna regla que lo cubra
+# ("read" mantiene el comportamiento anterior: todos ven todos los archivos)
+default_access_level = ACCESS_LEVELS[os.getenv("DEFAULT_ACCESS_LEVEL", "read")]
+
+# Políticas por rol y niveles por (rol, carpeta); se invalida con cada cambio de ACL
+acl_cache = get_cache(
+    "acl",
+    ttl=float(os.getenv("ACL_CACHE_TTL", 300)),
+    max_entries=int(os.getenv("ACL_CACHE_MAX_ENTRIES", 10000)),
+)
+
+
+def invalidate_acl_cache() -> None:
+    """Drop every cached policy and folder level, and the file listings built from them."""
+    acl_cache.invalidate()
+    invalidate_cache("files")
+
+
+def access_level_rank(access_level_column):
+    """SQL expression with the rank of an ``access_level`` column ("none" if unknown)."""
+    return case(ACCESS_LEVELS, value=access_level_column, else_=NONE)
+
+
+def get_role_policy(db: Session, role_id: int) -> dict:
+    """Get everything needed to resolve the access of a role, cached per role.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        role_id (int): ID of the role
+
+    Returns:
+        dict: ``is_admin``; ``max_level``, the cap set by the role flags;
+        ``folders``, the ``[prefix, rank]`` of the folder rules of the role,
+        deepest first; and ``has_file_roles``, whether any file rule exists.
+    """
+    key = make_cache_key("role-policy", role_id=role_id)
+    hit, policy = acl_cache.get(key)
+    if hit:
+        return policy
+
+    role = db.query(Role.can_create_files).filter(Role.role_id == role_id).first()
+    folder_rules = (
+        db.query(Folder.path, Folder.folder_id, FolderRole.access_level)
+        .join(Folder, Folder.folder_id == FolderRole.folder_id)
+        .filter(FolderRole.role_id == role_id)
+        .order_by(Folder.depth.desc())
+        .all()
+    )
+    policy = {
+        "is_admin": role_id == ADMIN_ROLE_ID,
+        # Un rol sin can_create_files es de solo lectura, diga lo que diga la regla
+        "max_level": ADMIN if role is not None and role.can_create_files else READ,
+        "folders": [
+            [folder_prefix(path, folder_id), ACCESS_LEVELS.get(access_level, NONE)]
+            for path, folder_id, access_level in folder_rules
+        ],
+        "has_file_roles": db.query(exists().where(FileRole.role_id == role_id)).scalar(),
+    }
+    acl_cache.set(key, policy)
+    return policy
+
+
+def folder_level_from_rules(policy: dict, full_path: str) -> int:
+    """Level given by the deepest folder rule that covers ``full_path``."""
+    for prefix, rank in policy["folders"]:
+        if full_path.startswith(prefix):
+            return rank
+    return default_access_level
+
+
+def get_folder_access_levels(
+    db: Session, role_id: int, folder_ids: Iterable[Optional[int]]
+) -> dict[Optional[int], int]:
+    """Get the level a role inherits in each folder, cached per (role, folder).
+
+    The nearest folder rule up the folder's ancestors wins. Folders missing
+    from the cache are resolved together with one query for their paths.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        role_id (int): ID of the role
+        folder_ids (Iterable[Optional[int]]): IDs of the folders
+
+    Returns:
+        dict[Optional[int], int]: Level rank per folder ID, before the role cap
+    """
+    policy = get_role_policy(db, role_id)
+    levels, missing = {}, []
+    for folder_id in set(folder_ids):
+        if folder_id is None or not policy["folders"]:
+            levels[folder_id] = default_access_level
+            continue
+        hit, level = acl_cache.get(make_cache_key("folder-level", role_id=role_id, folder_id=folder_id))
+        if hit:
+            levels[folder_id] = level
+        else:
+            missing.append(folder_id)
+
+    if missing:
+        paths = dict(
+            db.query(Folder.folder_id, Folder.path).filter(Folder.folder_id.in_(missing)).all()
+        )
+        for folder_id in missing:
+            path = paths.get(folder_id)
+            if path is None:
+                # No se cachea: la carpeta puede crearse después con ese id
+                levels[folder_id] = default_access_level
+                continue
+            level = folder_level_from_rules(policy, folder_prefix(path, folder_id))
+            acl_cache.set(make_cache_key("folder-level", role_id=role_id, folder_id=folder_id), level)
+            levels[folder_id] = level
+    return levels
+
+
+def get_user_folder_access_levels(
+    db: Session, user: CurrentUser, folder_ids: Iterable[Optional[int]]
+) -> dict[Optional[int], int]:
+    """Get the effective level of a user in many folders.
+
+    Folders have no owner: admins get "admin", everyone else the level their
+    role inherits in each folder, capped by the role flags.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): The user
+        folder_ids (Iterable[Optional[int]]): IDs of the folders, None for the root
+
+    Returns:
+        dict[Optional[int], int]: Level rank per folder ID
+    """
+    policy = get_role_policy(db, user.role_id)
+    if policy["is_admin"]:
+        return {folder_id: ADMIN for folder_id in folder_ids}
+    levels = get_folder_access_levels(db, user.role_id, folder_ids)
+    return {folder_id: min(level, policy["max_level"]) for folder_id, level in levels.items()}
+
+
+def get_folder_access_level(db: Session, user: CurrentUser, folder_id: Optional[int]) -> int:
+    """Get the effective level of a user in a folder.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): The user
+        folder_id (Optional[int]): ID of the folder, None for the root
+
+    Returns:
+        int: The level rank (see get_user_folder_access_levels)
+    """
+    return get_user_folder_access_levels(db, user, [folder_id])[folder_id]
+
+
+def get_file_access_levels(db: Session, user: CurrentUser, files: list) -> dict[int, int]:
+    """Get the effective level of a user on many files.
+
+    Admins and owners get "admin". Otherwise a file rule for the user's role
+    wins over the rules inherited from the folders, and the result is capped
+    by the role flags.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): The user
+        files (list): Rows with ``file_id``, ``owner_id`` and ``folder_id``
+
+    Returns:
+        dict[int, int]: Level rank per file ID
+    """
+    policy = get_role_policy(db, user.role_id)
+    if policy["is_admin"]:
+        return {file.file_id: ADMIN for file in files}
+
+    explicit = {}
+    if policy["has_file_roles"] and files:
+        explicit = dict(
+            db.query(FileRole.file_id, FileRole.access_level)
+            .filter(
+                FileRole.role_id == user.role_id,
+                FileRole.file_id.in_({file.file_id for file in files}),
+            )
+            .all()
+        )
+    folder_levels = get_folder_access_levels(
+        db, user.role_id, [file.folder_id for file in files if file.file_id not in explicit]
+    )
+
+    levels = {}
+    for file in files:
+        if file.owner_id == user.user_id:
+            levels[file.file_id] = ADMIN
+        elif file.file_id in explicit:
+            rank = ACCESS_LEVELS.get(explicit[file.file_id], NONE)
+            levels[file.file_id] = min(rank, policy["max_level"])
+        else:
+            levels[file.file_id] = min(folder_levels[file.folder_id], policy["max_level"])
+    return levels
+
+
+def get_file_access_level(db: Session, user: CurrentUser, file_id: int) -> Optional[int]:
+    """Get the effective level of a user on one file.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): The user
+        file_id (int): ID of the file
+
+    Returns:
+        Optional[int]: The level rank, or None if the file does not exist
+    """
+    file = (
+        db.query(File.file_id, File.owner_id, File.folder_id)
+        .filter(File.file_id == file_id)
+        .first()
+    )
+    if file is None:
+        return None
+    return get_file_access_levels(db, user, [file])[file_id]
+
+
+def sees_every_file(db: Session, user: CurrentUser) -> bool:
+    """Whether no rule restricts what the user can read (listings need no filter)."""
+    policy = get_role_policy(db, user.role_id)
+    return policy["is_admin"] or (
+        not policy["folders"] and not policy["has_file_roles"] and default_access_level >= READ
+    )
+
+
+def listing_scope(db: Session, user: CurrentUser) -> str:
+    """Part of the cache key of a listing that depends on who is asking.
+
+    Users who can read every file share one scope, so they share cache entries.
+    """
+    if sees_every_file(db, user):
+        return "all"
+    return f"role:{user.role_id}:user:{user.user_id}"
+
+
+def filter_visible_files(db: Session, query, user: CurrentUser, min_level: int = READ):
+    """Keep only the files on which the user has at least ``min_level``, in SQL.
+
+    The folder rules of the role become one CASE over the path of each
+    file's folder (deepest rule first) and the file rules one LEFT JOIN, so
+    the whole page is still a single query. If no rule restricts the user
+    the query is returned untouched.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        query (Query): Query over File
+        user (CurrentUser): The user the listing is for
+        min_level (int): Minimum level rank required
+
+    Returns:
+        Query: The filtered query
+    """
+    policy = get_role_policy(db, user.role_id)
+    if policy["is_admin"]:
+        return query
+    if policy["max_level"] < min_level:
+        return query.filter(File.owner_id == user.user_id)
+
+    folder_level = literal(default_access_level)
+    if policy["folders"]:
+        folder = aliased(Folder)
+        query = query.outerjoin(folder, folder.folder_id == File.folder_id)
+        full_path = folder.path + cast(folder.folder_id, String) + "/"
+        folder_level = case(
+            *[
+                (and_(full_path >= prefix, full_path < prefix_upper_bound(prefix)), rank)
+                for prefix, rank in policy["folders"]
+            ],
+            else_=default_access_level,
+        )
+
+    if policy["has_file_roles"]:
+        file_role = aliased(FileRole)
+        query = query.outerjoin(
+            file_role, and_(file_role.file_id == File.file_id, file_role.role_id == user.role_id)
+        )
+        level = case(
+            (file_role.access_level.is_(None), folder_level),
+            else_=access_level_rank(file_role.access_level),
+        )
+    elif policy["folders"]:
+        level = folder_level
+    elif default_access_level >= min_level:
+        return query
+    else:
+        return query.filter(File.owner_id == user.user_id)
+
+    return query.filter(or_(File.owner_id == user.user_id, level >= min_level))
+
+
+def get_folder_roles(db: Session, folder_id: int) -> list[FolderRole]:
+    """Get the rules set directly on a folder.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder
+
+    Returns:
+        list[FolderRole]: One rule per role
+    """
+    return db.query(FolderRole).filter(FolderRole.folder_id == folder_id).all()
+
+
+def get_file_roles(db: Session, file_id: int) -> list[FileRole]:
+    """Get the rules set directly on a file.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        file_id (int): ID of the file
+
+    Returns:
+        list[FileRole]: One rule per role
+    """
+    return db.query(FileRole).filter(FileRole.file_id == file_id).all()
+
+
+def set_folder_role(db: Session, rule: FolderRoleSet) -> FolderRole:
+    """Create or replace the rule of a role on a folder (inherited by its subtree).
+
+    Args:
+        db (Session): SQLAlchemy session object
+        rule (FolderRoleSet): Folder, role and access level
+
+    Returns:
+        FolderRole: The stored rule
+
+    Raises:
+        LookupError: If the folder or the role does not exist.
+    """
+    if db.get(Folder, rule.folder_id) is None:
+        raise LookupError(f"Folder #{rule.folder_id} not found")
+    if db.get(Role, rule.role_id) is None:
+        raise LookupError(f"Role #{rule.role_id} not found")
+
+    folder_role = db.merge(FolderRole(**rule.dict()))
+    db.commit()
+    invalidate_acl_cache()
+    return folder_role
+
+
+def set_file_role(db: Session, rule: FileRoleSet) -> FileRole:
+    """Create or replace the rule of a role on a file (overrides the folder rules).
+
+    Args:
+        db (Session): SQLAlchemy session object
+        rule (FileRoleSet): File, role and access level
+
+    Returns:
+        FileRole: The stored rule
+
+    Raises:
+        LookupError: If the file or the role does not exist.
+    """
+    if db.get(File, rule.file_id) is None:
+        raise LookupError(f"File #{rule.file_id} not found")
+    if db.get(Role, rule.role_id) is None:
+        raise LookupError(f"Role #{rule.role_id} not found")
+
+    file_role = db.merge(FileRole(**rule.dict()))
+    db.commit()
+    invalidate_acl_cache()
+    return file_role
+
+
+def delete_folder_role(db: Session, folder_id: int, role_id: int) -> bool:
+    """Remove the rule of a role on a folder.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder
+        role_id (int): ID of the role
+
+    Returns:
+        bool: True if a rule was removed
+    """
+    deleted = (
+        db.query(FolderRole)
+        .filter(FolderRole.folder_id == folder_id, FolderRole.role_id == role_id)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    if deleted:
+        invalidate_acl_cache()
+    return bool(deleted)
+
+
+def delete_file_role(db: Session, file_id: int, role_id: int) -> bool:
+    """Remove the rule of a role on a file.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        file_id (int): ID of the file
+        role_id (int): ID of the role
+
+    Returns:
+        bool: True if a rule was removed
+    """
+    deleted = (
+        db.query(FileRole)
+        .filter(FileRole.file_id == file_id, FileRole.role_id == role_id)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    if deleted:
+        invalidate_acl_cache()
+    return bool(deleted)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from models.model import Role
 from schemas.role_schema import RoleCreate, RoleUpdate, RoleResponse
 from utils.password_hasher import hash_password, verify_password
+from services.permissions_services import invalidate_acl_cache
 
 def get_all_roles(db: Session):
     """Get all roles from the database.
@@ -77,6 +78,7 @@ def delete_role_by_id(db: Session, role_id: int):
     if delete_role:
         db.delete(delete_role)
         db.commit()
+        invalidate_acl_cache()
     return delete_role
 
 
@@ -100,5 +102,7 @@ def update_role(db: Session, role_id: int, role_update: RoleUpdate):
         setattr(role, field, value)
 
     db.commit()
+    # can_create_files limita el nivel de acceso del rol
+    invalidate_acl_cache()
     db.refresh(role)
     return True
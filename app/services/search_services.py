@@ -0,0 +1,171 @@
+import os
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy import Float, case, cast, func, or_, text
+from sqlalchemy.orm import Session
+
+from models.model import File
+from schemas.user_schema import CurrentUser
+from schemas.file_schema import FileFilter
+from utils.name_index import escape_like
+from utils.pagination import DEFAULT_PAGE_SIZE, clamp_limit, decode_cursor, encode_cursor, paginate_keyset
+from services.files_services import apply_file_filters, file_name_index
+from services.permissions_services import filter_visible_files
+
+load_dotenv()
+
+# Similitud mínima (0..1) de una coincidencia aproximada
+name_search_similarity = float(os.getenv("NAME_SEARCH_SIMILARITY", 0.4))
+
+NAME_SEARCH_MODES = ("prefix", "contains", "fuzzy")
+MAX_NAME_QUERY_LENGTH = 200
+# Con menos caracteres no hay trigramas útiles y "fuzzy" se resuelve como prefijo
+MIN_FUZZY_QUERY_LENGTH = 3
+
+# Filas que se leen por consulta al recorrer los resultados del índice en memoria
+_FALLBACK_BATCH_SIZE = 500
+
+# Si cada base (por URL) tiene pg_trgm, consultado una sola vez
+_trigram_support: dict[str, bool] = {}
+
+
+def has_trigram_search(db: Session) -> bool:
+    """Whether the database is PostgreSQL with the pg_trgm extension installed."""
+    bind = db.get_bind()
+    url = str(bind.url)
+    if url not in _trigram_support:
+        _trigram_support[url] = bind.dialect.name == "postgresql" and bool(
+            db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).scalar()
+        )
+    return _trigram_support[url]
+
+
+def normalize_name_query(q: str, mode: str) -> Tuple[str, str]:
+    """Validate a name search and return its lowercase query and effective mode.
+
+    Raises:
+        ValueError: If the query is empty or too long, or the mode is unknown
+    """
+    if mode not in NAME_SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{mode}'")
+    q = q.strip().lower()
+    if not q:
+        raise ValueError("The search is empty")
+    if len(q) > MAX_NAME_QUERY_LENGTH:
+        raise ValueError(f"Searches are limited to {MAX_NAME_QUERY_LENGTH} characters")
+    if mode == "fuzzy" and len(q) < MIN_FUZZY_QUERY_LENGTH:
+        mode = "prefix"
+    return q, mode
+
+
+def search_files_by_name(
+    db: Session,
+    q: str,
+    mode: str = "fuzzy",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: Optional[FileFilter] = None,
+    viewer: Optional[CurrentUser] = None,
+) -> Tuple[list, Optional[str]]:
+    """Get one page of the files whose name matches ``q``, best match first.
+
+    Every match is scored as its tier (3 exact name, 2 prefix, 1 substring,
+    0 typo-tolerant only) plus the trigram word similarity between the query
+    and the name, so exact and prefix hits always come before fuzzy ones.
+    On PostgreSQL with pg_trgm the matching and ranking run in SQL over the
+    trigram index; elsewhere (SQLite, Postgres without the extension) an
+    in-memory trigram index ranks the names and only the page rows are read.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        q (str): The text to search, case-insensitive
+        mode (str): "prefix", "contains" or "fuzzy" (prefix, substring or typo-tolerant)
+        limit (int): Maximum number of files in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+        filters (Optional[FileFilter]): Conditions the files must match
+        viewer (Optional[CurrentUser]): Only return the files this user can read
+
+    Returns:
+        Tuple[list, Optional[str]]: Rows with every File column plus ``score``,
+        and the cursor of the next page (None on the last page)
+
+    Raises:
+        ValueError: If the query or the mode is invalid
+    """
+    q, mode = normalize_name_query(q, mode)
+    sort_key = f"name-search:{mode}:{q}"
+    if has_trigram_search(db):
+        return _search_with_trigram_index(db, q, mode, limit, cursor, filters, viewer, sort_key)
+    return _search_with_name_index(db, q, mode, limit, cursor, filters, viewer, sort_key)
+
+
+def _search_with_trigram_index(db, q, mode, limit, cursor, filters, viewer, sort_key):
+    name = func.lower(File.file_name)
+    prefix = escape_like(q) + "%"
+    substring = "%" + escape_like(q) + "%"
+    tier = case(
+        (name == q, 3),
+        (name.like(prefix, escape="\\"), 2),
+        (name.like(substring, escape="\\"), 1),
+        else_=0,
+    )
+    score = cast(tier + func.word_similarity(q, name), Float).label("score")
+
+    if mode == "prefix":
+        condition = name.like(prefix, escape="\\")
+    elif mode == "contains":
+        condition = name.like(substring, escape="\\")
+    else:
+        # El operador %> usa el índice GIN y el umbral de la transacción
+        db.execute(
+            text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+            {"threshold": str(name_search_similarity)},
+        )
+        condition = or_(name.like(substring, escape="\\"), name.op("%>")(q))
+
+    query = db.query(*File.__table__.columns, score).filter(condition)
+    if filters is not None:
+        query = apply_file_filters(query, filters)
+    if viewer is not None:
+        query = filter_visible_files(db, query, viewer)
+    return paginate_keyset(query, score, File.file_id, True, limit, cursor, sort_key)
+
+
+def _search_with_name_index(db, q, mode, limit, cursor, filters, viewer, sort_key):
+    limit = clamp_limit(limit)
+    ranked = file_name_index.search(
+        q, mode, lambda: db.query(File.file_id, File.file_name).yield_per(10000),
+        name_search_similarity,
+    )
+    if cursor:
+        last = tuple(decode_cursor(cursor, sort_key))
+        ranked = [entry for entry in ranked if entry < last]
+
+    # Se leen las filas en el orden del ranking hasta completar la página; los
+    # filtros y permisos se aplican en SQL a cada lote
+    rows = []
+    for start in range(0, len(ranked), _FALLBACK_BATCH_SIZE):
+        batch = ranked[start:start + _FALLBACK_BATCH_SIZE]
+        query = db.query(File).filter(File.file_id.in_([file_id for _, file_id in batch]))
+        if filters is not None:
+            query = apply_file_filters(query, filters)
+        if viewer is not None:
+            query = filter_visible_files(db, query, viewer)
+        files = {file.file_id: file for file in query}
+        for score, file_id in batch:
+            file = files.get(file_id)
+            if file is not None:
+                rows.append(_scored_row(file, score))
+        if len(rows) > limit:
+            break
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_key, [rows[-1]["score"], rows[-1]["file_id"]])
+
+
+def _scored_row(file: File, score: float) -> dict:
+    row = {column.key: getattr(file, column.key) for column in File.__table__.columns}
+    row["score"] = score
+    return row
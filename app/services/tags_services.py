@@ -0,0 +1,470 @@
+from typing import Optional, Tuple
+from sqlalchemy import and_, exists, false, insert, not_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models.model import File, Folder, Tag, FileTag, FolderTag
+from schemas.tag_schema import TagCreate, TagUpdate
+from schemas.user_schema import CurrentUser
+from services.permissions_services import (
+    WRITE,
+    get_file_access_levels,
+    get_user_folder_access_levels,
+)
+from utils.cache import invalidate_cache
+from utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
+from utils.tag_query import TagNode, TagTerm, TagNot, TagAnd
+
+
+def invalidate_tag_searches() -> None:
+    """Drop the cached searches by tag (they live in the files cache)."""
+    invalidate_cache("files")
+
+
+def get_tag_by_id(db: Session, tag_id: int) -> Optional[Tag]:
+    """Get a tag by ID from the database.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        tag_id (int): ID of the tag to retrieve
+
+    Returns:
+        Optional[Tag]: Tag object if found, None otherwise
+    """
+    return db.query(Tag).filter(Tag.tag_id == tag_id).first()
+
+
+def get_tag_by_name(db: Session, tag_name: str) -> Optional[Tag]:
+    """Get a tag by name from the database.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        tag_name (str): Name of the tag to retrieve
+
+    Returns:
+        Optional[Tag]: Tag object if found, None otherwise
+    """
+    return db.query(Tag).filter(Tag.tag_name == tag_name).first()
+
+
+def get_tags_page(
+    db: Session,
+    prefix: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list[Tag], Optional[str]]:
+    """Get one keyset-paginated page of tags, by name.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        prefix (Optional[str]): Only return the tags whose name starts with it
+        limit (int): Maximum number of tags in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+
+    Returns:
+        Tuple[list[Tag], Optional[str]]: The tags of the page and the cursor
+        of the next one (None on the last page)
+    """
+    query = db.query(Tag)
+    if prefix:
+        query = query.filter(Tag.tag_name.startswith(prefix, autoescape=True))
+    return paginate_keyset(
+        query, Tag.tag_name, Tag.tag_id, False, limit, cursor, sort_key="tag_name:asc"
+    )
+
+
+def create_tag(db: Session, tag_data: TagCreate) -> Tag:
+    """Create a new tag in the database.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        tag_data (TagCreate): Name and description of the tag
+
+    Returns:
+        Tag: Created Tag object
+    """
+    tag = Tag(**tag_data.dict())
+    db.add(tag)
+    db.commit()
+    db.refresh(tag)
+    return tag
+
+
+def update_tag(db: Session, tag_id: int, tag_update: TagUpdate) -> Optional[Tag]:
+    """Update the name or description of a tag.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        tag_id (int): ID of the tag to update
+        tag_update (TagUpdate): Fields to update
+
+    Returns:
+        Optional[Tag]: Updated Tag object if found, None otherwise
+    """
+    tag = get_tag_by_id(db, tag_id)
+    if not tag:
+        return None
+
+    for field, value in tag_update.dict(exclude_unset=True).items():
+        setattr(tag, field, value)
+    db.commit()
+    # Las búsquedas guardadas usan el nombre anterior
+    invalidate_tag_searches()
+    db.refresh(tag)
+    return tag
+
+
+def delete_tag(db: Session, tag_id: int) -> bool:
+    """Delete a tag and remove it from every file and folder.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        tag_id (int): ID of the tag to delete
+
+    Returns:
+        bool: True if the tag existed and was deleted, False otherwise
+    """
+    db.query(FileTag).filter(FileTag.tag_id == tag_id).delete(synchronize_session=False)
+    db.query(FolderTag).filter(FolderTag.tag_id == tag_id).delete(synchronize_session=False)
+    deleted = db.query(Tag).filter(Tag.tag_id == tag_id).delete(synchronize_session=False)
+    db.commit()
+    invalidate_tag_searches()
+    return bool(deleted)
+
+
+def get_file_tags(db: Session, file_id: int) -> list[Tag]:
+    """Get the tags of a file, by name.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        file_id (int): ID of the file
+
+    Returns:
+        list[Tag]: The tags of the file
+    """
+    return (
+        db.query(Tag)
+        .join(FileTag, FileTag.tag_id == Tag.tag_id)
+        .filter(FileTag.file_id == file_id)
+        .order_by(Tag.tag_name)
+        .all()
+    )
+
+
+def get_folder_tags(db: Session, folder_id: int) -> list[Tag]:
+    """Get the tags of a folder, by name.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        folder_id (int): ID of the folder
+
+    Returns:
+        list[Tag]: The tags of the folder
+    """
+    return (
+        db.query(Tag)
+        .join(FolderTag, FolderTag.tag_id == Tag.tag_id)
+        .filter(FolderTag.folder_id == folder_id)
+        .order_by(Tag.tag_name)
+        .all()
+    )
+
+
+def _existing_tag_ids(db: Session, tag_ids: list[int]) -> list[int]:
+    """Deduplicate tag IDs, failing if any of them does not exist."""
+    tag_ids = list(dict.fromkeys(tag_ids))
+    found = {tag_id for (tag_id,) in db.query(Tag.tag_id).filter(Tag.tag_id.in_(tag_ids))}
+    missing = [tag_id for tag_id in tag_ids if tag_id not in found]
+    if missing:
+        raise LookupError(f"Tags not found: {', '.join(str(tag_id) for tag_id in missing)}")
+    return tag_ids
+
+
+def _insert_links(db: Session, link_model, target_id_column, ids: list[int], tag_ids: list[int]):
+    """Link every (id, tag) pair not linked yet with a single INSERT ... SELECT.
+
+    A concurrent request can insert the same pair between the NOT EXISTS and
+    the INSERT; the statement is then retried once, and it skips that pair.
+    """
+    link_id_column = link_model.__table__.c[target_id_column.key]
+    pairs = (
+        select(target_id_column, Tag.tag_id)
+        .join(Tag, Tag.tag_id.in_(tag_ids))
+        .where(
+            target_id_column.in_(ids),
+            ~exists().where(link_id_column == target_id_column, link_model.tag_id == Tag.tag_id),
+        )
+    )
+    stmt = insert(link_model).from_select([target_id_column.key, "tag_id"], pairs)
+    for attempt in range(2):
+        try:
+            db.execute(stmt)
+            db.commit()
+            return
+        except IntegrityError:
+            db.rollback()
+            if attempt:
+                raise
+
+
+def _writable_files(db: Session, user: CurrentUser, file_ids: list[int]) -> Tuple[dict, list[int]]:
+    """Resolve which files exist and which of them the user can write, at once."""
+    results = {
+        file_id: {"id": file_id, "status": "not_found", "error": "File not found"}
+        for file_id in dict.fromkeys(file_ids)
+    }
+    rows = (
+        db.query(File.file_id, File.owner_id, File.folder_id)
+        .filter(File.file_id.in_(list(results)))
+        .all()
+    )
+    access_levels = get_file_access_levels(db, user, rows)
+
+    writable = []
+    for row in rows:
+        if access_levels[row.file_id] < WRITE:
+            results[row.file_id].update(
+                status="forbidden", error="You do not have write access to this file"
+            )
+        else:
+            writable.append(row.file_id)
+    return results, writable
+
+
+def _writable_folders(
+    db: Session, user: CurrentUser, folder_ids: list[int]
+) -> Tuple[dict, list[int]]:
+    """Resolve which folders exist and which of them the user can write, at once."""
+    results = {
+        folder_id: {"id": folder_id, "status": "not_found", "error": "Folder not found"}
+        for folder_id in dict.fromkeys(folder_ids)
+    }
+    found = [
+        folder_id
+        for (folder_id,) in db.query(Folder.folder_id).filter(Folder.folder_id.in_(list(results)))
+    ]
+    access_levels = get_user_folder_access_levels(db, user, found)
+
+    writable = []
+    for folder_id in found:
+        if access_levels[folder_id] < WRITE:
+            results[folder_id].update(
+                status="forbidden", error="You do not have write access to this folder"
+            )
+        else:
+            writable.append(folder_id)
+    return results, writable
+
+
+def tag_files(
+    db: Session, user: CurrentUser, file_ids: list[int], tag_ids: list[int]
+) -> list[dict]:
+    """Add tags to many files with one access check query and one INSERT.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): User tagging the files; needs write access on each
+        file_ids (list[int]): IDs of the files (duplicates are ignored)
+        tag_ids (list[int]): IDs of the tags to add
+
+    Returns:
+        list[dict]: One ``{"id", "status", "error"}`` per file, where status is
+        "tagged", "not_found" or "forbidden"
+
+    Raises:
+        LookupError: If any of the tags does not exist.
+    """
+    tag_ids = _existing_tag_ids(db, tag_ids)
+    results, writable = _writable_files(db, user, file_ids)
+    if writable:
+        _insert_links(db, FileTag, File.file_id, writable, tag_ids)
+        invalidate_tag_searches()
+    for file_id in writable:
+        results[file_id].update(status="tagged", error=None)
+    return list(results.values())
+
+
+def untag_files(
+    db: Session, user: CurrentUser, file_ids: list[int], tag_ids: list[int]
+) -> list[dict]:
+    """Remove tags from many files with one access check query and one DELETE.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): User untagging the files; needs write access on each
+        file_ids (list[int]): IDs of the files (duplicates are ignored)
+        tag_ids (list[int]): IDs of the tags to remove
+
+    Returns:
+        list[dict]: One ``{"id", "status", "error"}`` per file, where status is
+        "untagged", "not_found" or "forbidden"
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    results, writable = _writable_files(db, user, file_ids)
+    if writable:
+        db.query(FileTag).filter(
+            FileTag.file_id.in_(writable), FileTag.tag_id.in_(tag_ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+        invalidate_tag_searches()
+    for file_id in writable:
+        results[file_id].update(status="untagged", error=None)
+    return list(results.values())
+
+
+def tag_folders(
+    db: Session, user: CurrentUser, folder_ids: list[int], tag_ids: list[int]
+) -> list[dict]:
+    """Add tags to many folders with one access check and one INSERT.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): User tagging the folders; needs write access on each
+        folder_ids (list[int]): IDs of the folders (duplicates are ignored)
+        tag_ids (list[int]): IDs of the tags to add
+
+    Returns:
+        list[dict]: One ``{"id", "status", "error"}`` per folder, where status
+        is "tagged", "not_found" or "forbidden"
+
+    Raises:
+        LookupError: If any of the tags does not exist.
+    """
+    tag_ids = _existing_tag_ids(db, tag_ids)
+    results, writable = _writable_folders(db, user, folder_ids)
+    if writable:
+        _insert_links(db, FolderTag, Folder.folder_id, writable, tag_ids)
+    for folder_id in writable:
+        results[folder_id].update(status="tagged", error=None)
+    return list(results.values())
+
+
+def untag_folders(
+    db: Session, user: CurrentUser, folder_ids: list[int], tag_ids: list[int]
+) -> list[dict]:
+    """Remove tags from many folders with one access check and one DELETE.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user (CurrentUser): User untagging the folders; needs write access on each
+        folder_ids (list[int]): IDs of the folders (duplicates are ignored)
+        tag_ids (list[int]): IDs of the tags to remove
+
+    Returns:
+        list[dict]: One ``{"id", "status", "error"}`` per folder, where status
+        is "untagged", "not_found" or "forbidden"
+    """
+    tag_ids = list(dict.fromkeys(tag_ids))
+    results, writable = _writable_folders(db, user, folder_ids)
+    if writable:
+        db.query(FolderTag).filter(
+            FolderTag.folder_id.in_(writable), FolderTag.tag_id.in_(tag_ids)
+        ).delete(synchronize_session=False)
+        db.commit()
+    for folder_id in writable:
+        results[folder_id].update(status="untagged", error=None)
+    return list(results.values())
+
+
+def _tag_names(node: TagNode) -> set[str]:
+    if isinstance(node, TagTerm):
+        return {node.name}
+    if isinstance(node, TagNot):
+        return _tag_names(node.operand)
+    return set().union(*(_tag_names(operand) for operand in node.operands))
+
+
+def _compile_tag_query(node: TagNode, tag_ids: dict[str, int], link_model, target_id_column):
+    """Translate an expression tree into EXISTS / NOT EXISTS over a tag link table.
+
+    Each tag becomes a semi-join on the ``(id, tag_id)`` primary key, with
+    the tag ID as a literal so the planner uses its statistics: for frequent
+    tags it walks the sort index and probes the key until the page is full,
+    for rare ones it hashes the tag's entries from the ``(tag_id, id)`` index.
+    Unknown tags match nothing.
+    """
+    link_id_column = link_model.__table__.c[target_id_column.key]
+    if isinstance(node, TagTerm):
+        tag_id = tag_ids.get(node.name)
+        if tag_id is None:
+            return false()
+        return exists().where(link_id_column == target_id_column, link_model.tag_id == tag_id)
+    if isinstance(node, TagNot):
+        return not_(_compile_tag_query(node.operand, tag_ids, link_model, target_id_column))
+    if isinstance(node, TagAnd):
+        return and_(
+            *[
+                _compile_tag_query(operand, tag_ids, link_model, target_id_column)
+                for operand in node.operands
+            ]
+        )
+
+    # Las etiquetas sueltas de un OR van en un único EXISTS ... tag_id IN (...):
+    # un EXISTS dentro de un OR no puede ser semi-join y Postgres lo resuelve
+    # hasheando todas las filas de cada etiqueta, aunque la página sea de 50
+    terms = [operand for operand in node.operands if isinstance(operand, TagTerm)]
+    clauses = [
+        _compile_tag_query(operand, tag_ids, link_model, target_id_column)
+        for operand in node.operands
+        if not isinstance(operand, TagTerm)
+    ]
+    term_ids = sorted({tag_ids[term.name] for term in terms if term.name in tag_ids})
+    if term_ids:
+        clauses.append(
+            exists().where(link_id_column == target_id_column, link_model.tag_id.in_(term_ids))
+        )
+    return or_(*clauses) if clauses else false()
+
+
+def tag_filter(db: Session, node: TagNode, link_model, target_id_column):
+    """WHERE clause that keeps the rows matching a tag expression.
+
+    The tag names are resolved to IDs with one query before building it.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        node (TagNode): Parsed expression (see utils.tag_query.parse_tag_query)
+        link_model: FileTag or FolderTag
+        target_id_column: File.file_id or Folder.folder_id
+
+    Returns:
+        ColumnElement: Condition on ``target_id_column``
+    """
+    tag_ids = dict(
+        db.query(Tag.tag_name, Tag.tag_id).filter(Tag.tag_name.in_(_tag_names(node))).all()
+    )
+    return _compile_tag_query(node, tag_ids, link_model, target_id_column)
+
+
+def files_tag_filter(db: Session, node: TagNode):
+    """WHERE clause that keeps the files matching a tag expression (see tag_filter)."""
+    return tag_filter(db, node, FileTag, File.file_id)
+
+
+def folders_tag_filter(db: Session, node: TagNode):
+    """WHERE clause that keeps the folders matching a tag expression (see tag_filter)."""
+    return tag_filter(db, node, FolderTag, Folder.folder_id)
+
+
+def search_folders(
+    db: Session,
+    node: TagNode,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list[Folder], Optional[str]]:
+    """Get one keyset-paginated page, by name, of the folders matching a tag expression.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        node (TagNode): Parsed expression
+        limit (int): Maximum number of folders in the page
+        cursor (Optional[str]): Cursor returned with the previous page
+
+    Returns:
+        Tuple[list[Folder], Optional[str]]: The folders of the page and the
+        cursor of the next one (None on the last page)
+    """
+    query = db.query(Folder).filter(folders_tag_filter(db, node))
+    return paginate_keyset(
+        query, Folder.folder_name, Folder.folder_id, False, limit, cursor, sort_key="folder_name:asc"
+    )
@@ -1,7 +1,15 @@
 from sqlalchemy.orm import Session
 from models.model import User
 from schemas.user_schema import UserCreate, UserUpdate
-from utils.password_hasher import hash_password, verify_password
+from utils.concurrency import run_blocking
+from utils.password_hasher import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+    needs_rehash,
+)
+from services.files_services import invalidate_files_cache
 
 def get_all_users(db: Session):
     """Get all users from the database.
@@ -44,6 +52,42 @@ def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
 
+def get_users_by_ids(db: Session, user_ids: list[int]) -> dict[int, User]:
+    """Get many users by ID with a single ``IN`` query.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        user_ids (list[int]): IDs of the users to retrieve (duplicates are ignored)
+
+    Returns:
+        dict[int, User]: The users found, keyed by ID
+    """
+
+    ids = set(user_ids)
+    if not ids:
+        return {}
+    users = db.query(User).filter(User.user_id.in_(ids)).all()
+    return {user.user_id: user for user in users}
+
+
+def get_users_by_usernames(db: Session, usernames: list[str]) -> dict[str, User]:
+    """Get many users by username with a single ``IN`` query.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        usernames (list[str]): Usernames of the users to retrieve (duplicates are ignored)
+
+    Returns:
+        dict[str, User]: The users found, keyed by username
+    """
+
+    names = set(usernames)
+    if not names:
+        return {}
+    users = db.query(User).filter(User.username.in_(names)).all()
+    return {user.username: user for user in users}
+
+
 def get_user_by_password(db: Session, password: str):
     """Get a user by password from the database.
 
@@ -80,7 +124,35 @@ def get_user_by_password_username(db: Session,  username:str, password: str):
     return None
 
 
-def create_user(db: Session, user_data: UserCreate):
+async def authenticate_user(db: Session, username: str, password: str):
+    """Check a username and password without blocking the event loop.
+
+    The bcrypt check runs in the hashing pool. If the stored hash was made with
+    a cost other than BCRYPT_COST, it is recomputed from the verified password.
+
+    Args:
+        db (Session): SQLAlchemy session object
+        username (str): Username of the user
+        password (str): Plain password to check
+
+    Returns:
+        User: User object if the credentials are right, None otherwise
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
+    """
+
+    user = await run_blocking(get_user_by_username, db, username)
+    if not user or not await verify_password_async(password, user.password):
+        return None
+
+    if needs_rehash(user.password):
+        user.password = await hash_password_async(password)
+        await run_blocking(db.commit)
+    return user
+
+
+async def create_user(db: Session, user_data: UserCreate):
     """Create a new user in the database.
 
     Args:
@@ -89,15 +161,21 @@ def create_user(db: Session, user_data: UserCreate):
 
     Returns:
         User: Created User object
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
     """
 
     new_user = User(**user_data.dict())
-    new_user.password = hash_password(user_data.password)
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    new_user.password = await hash_password_async(user_data.password)
+
+    def save():
+        db.add(new_user)
+        db.commit()
+        db.refresh(new_user)
+        return new_user
+
+    return await run_blocking(save)
 
 
 def delete_user_by_id(db: Session, user_id: int):
@@ -115,10 +193,12 @@ def delete_user_by_id(db: Session, user_id: int):
     if delete_user:
         db.delete(delete_user)
         db.commit()
+        # Los listados de archivos incluyen el nombre del dueño
+        invalidate_files_cache()
     return delete_user
 
 
-def update_user(db: Session, user_id: int, user_update: UserUpdate):
+async def update_user(db: Session, user_id: int, user_update: UserUpdate):
     """Update a user in the database.
 
     Args:
@@ -128,15 +208,27 @@ def update_user(db: Session, user_id: int, user_update: UserUpdate):
 
     Returns:
         User: Updated User object if found, None otherwise
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
     """
 
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        return False
+    changes = user_update.dict(exclude_unset=True)
+    # La contraseña se guarda siempre hasheada
+    if changes.get("password"):
+        changes["password"] = await hash_password_async(changes["password"])
+
+    def save():
+        user = db.query(User).filter(User.user_id == user_id).first()
+        if not user:
+            return False
 
-    for field, value in user_update.dict(exclude_unset=True).items():
-        setattr(user, field, value)
+        for field, value in changes.items():
+            setattr(user, field, value)
+
+        db.commit()
+        invalidate_files_cache()
+        db.refresh(user)
+        return True
 
-    db.commit()
-    db.refresh(user)
-    return True
+    return await run_blocking(save)
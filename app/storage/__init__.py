@@ -0,0 +1,58 @@
+import os
+import threading
+from typing import Optional
+from dotenv import load_dotenv
+
+from storage.base import StorageBackend, StorageError, ObjectInfo
+from storage.local import LocalStorageBackend
+from storage.s3 import S3StorageBackend
+from utils.s3_client import init_s3_client
+
+load_dotenv()
+storage_backend_name = os.getenv("STORAGE_BACKEND", "s3").lower()
+local_storage_dir = os.getenv("LOCAL_STORAGE_DIR", "/data/storage")
+s3_bucket_name = os.getenv("S3_BUCKET")
+aws_region = os.getenv("AWS_REGION", "us-east-2")
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def init_storage() -> StorageBackend:
+    """Creates the process-wide storage backend selected by ``STORAGE_BACKEND``.
+
+    Returns:
+        StorageBackend: ``S3StorageBackend`` for ``s3`` (default) or
+        ``LocalStorageBackend`` for ``local``.
+
+    Raises:
+        ValueError: If ``STORAGE_BACKEND`` names an unknown backend.
+    """
+    global _storage
+
+    with _storage_lock:
+        if _storage is None:
+            if storage_backend_name == "s3":
+                _storage = S3StorageBackend(init_s3_client(), s3_bucket_name, aws_region)
+            elif storage_backend_name == "local":
+                _storage = LocalStorageBackend(local_storage_dir)
+            else:
+                raise ValueError(f"Unknown STORAGE_BACKEND '{storage_backend_name}'")
+        return _storage
+
+
+# Dependencia
+def get_storage() -> StorageBackend:
+    """Returns the shared storage backend, creating it if the app did not at startup."""
+    return _storage if _storage is not None else init_storage()
+
+
+__all__ = [
+    "StorageBackend",
+    "StorageError",
+    "ObjectInfo",
+    "S3StorageBackend",
+    "LocalStorageBackend",
+    "init_storage",
+    "get_storage",
+]
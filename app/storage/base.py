@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, Optional
+
+
+class StorageError(Exception):
+    """Raised when a storage backend cannot complete an operation."""
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+class StorageBackend(ABC):
+    """Object storage used for file contents.
+
+    Keys are flat strings (``"report.pdf"``). Every method is blocking; async
+    callers go through ``utils.concurrency.run_blocking`` or the helpers in
+    ``storage.streaming``. Large writes use the multipart primitives so no
+    backend ever needs the whole object in memory.
+    """
+
+    name: str = "base"
+    # Si los clientes pueden subir/descargar directamente con URLs firmadas
+    supports_presign: bool = False
+
+    @abstractmethod
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Stores ``data`` under ``key`` in one request. Returns the ETag."""
+
+    @abstractmethod
+    def create_multipart(self, key: str) -> str:
+        """Starts a multipart upload. Returns its upload id."""
+
+    @abstractmethod
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Uploads one part (1-based ``part_number``). Returns the part ETag."""
+
+    @abstractmethod
+    def complete_multipart(self, key: str, upload_id: str, parts: list[dict]) -> str:
+        """Assembles ``parts`` (``{"PartNumber", "ETag"}``) into the object. Returns its ETag."""
+
+    @abstractmethod
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        """Discards a multipart upload and its parts."""
+
+    @abstractmethod
+    def get_stream(
+        self,
+        key: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        """Yields the object (or the inclusive byte range ``start``-``end``) in chunks."""
+
+    @abstractmethod
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        """Returns the object's size/ETag, or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Deletes the object. Deleting a missing key is not an error."""
+
+    def delete_many(self, keys: list[str]) -> dict[str, str]:
+        """Deletes several objects. Returns ``{key: error}`` for the ones that failed.
+
+        Backends with a batch delete API override this; the default deletes
+        one key at a time.
+        """
+        errors = {}
+        for key in keys:
+            try:
+                self.delete(key)
+            except Exception as e:
+                errors[key] = str(e)
+        return errors
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> list[ObjectInfo]:
+        """Lists the objects whose key starts with ``prefix``."""
+
+    @abstractmethod
+    def copy(self, source_key: str, dest_key: str) -> None:
+        """Copies an object inside the backend, without moving bytes through the API."""
+
+    @abstractmethod
+    def presign_get(self, key: str, expires_in: int = 900) -> str:
+        """Returns a short-lived URL to download the object directly."""
+
+    @abstractmethod
+    def presign_put(self, key: str, expires_in: int = 900) -> str:
+        """Returns a short-lived URL to upload the object directly."""
+
+    @abstractmethod
+    def presign_upload_part(
+        self, key: str, upload_id: str, part_number: int, expires_in: int = 900
+    ) -> str:
+        """Returns a short-lived URL to upload one part of a multipart upload directly."""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """Returns the canonical (non-signed) location of the object."""
@@ -0,0 +1,195 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from storage.base import StorageBackend, StorageError, ObjectInfo
+
+# Directorios internos, fuera del espacio de claves
+MULTIPART_DIR = ".multipart"
+META_DIR = ".meta"
+
+
+class LocalStorageBackend(StorageBackend):
+    """Stores objects as plain files under ``root_dir``.
+
+    Meant for development, benchmarks and edge boxes without AWS. ETags follow
+    the S3 rules (MD5 for single puts, MD5-of-MD5s for multipart) so metadata
+    computed during uploads lines up regardless of the backend.
+    """
+
+    name = "local"
+
+    def __init__(self, root_dir: str):
+        self.root = Path(root_dir).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root not in path.parents:
+            raise StorageError(f"Invalid key '{key}'")
+        if path.relative_to(self.root).parts[0] in (MULTIPART_DIR, META_DIR):
+            raise StorageError(f"Invalid key '{key}'")
+        return path
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / META_DIR / f"{key}.json"
+
+    def _write_meta(self, key: str, etag: str) -> None:
+        meta_path = self._meta_path(key)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(json.dumps({"etag": etag}))
+
+    def _parts_dir(self, upload_id: str) -> Path:
+        if not upload_id.isalnum():
+            raise StorageError(f"Invalid upload id '{upload_id}'")
+        return self.root / MULTIPART_DIR / upload_id
+
+    def _commit(self, key: str, tmp_path: Path, etag: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, path)
+        self._write_meta(key, etag)
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        etag = hashlib.md5(data).hexdigest()
+        self._commit(key, tmp_path, etag)
+        return etag
+
+    def create_multipart(self, key: str) -> str:
+        self._path(key)
+        upload_id = uuid.uuid4().hex
+        self._parts_dir(upload_id).mkdir(parents=True)
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        parts_dir = self._parts_dir(upload_id)
+        if not parts_dir.is_dir():
+            raise StorageError(f"Unknown upload id '{upload_id}'")
+        (parts_dir / f"{part_number:05d}").write_bytes(data)
+        return f'"{hashlib.md5(data).hexdigest()}"'
+
+    def complete_multipart(self, key: str, upload_id: str, parts: list[dict]) -> str:
+        parts_dir = self._parts_dir(upload_id)
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{upload_id}.tmp")
+
+        digests = []
+        with open(tmp_path, "wb") as target:
+            for part in sorted(parts, key=lambda p: p["PartNumber"]):
+                part_path = parts_dir / f"{part['PartNumber']:05d}"
+                if not part_path.is_file():
+                    raise StorageError(f"Missing part {part['PartNumber']} for '{key}'")
+                md5 = hashlib.md5()
+                with open(part_path, "rb") as source:
+                    while chunk := source.read(1024 * 1024):
+                        md5.update(chunk)
+                        target.write(chunk)
+                digests.append(md5.digest())
+
+        etag = f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+        self._commit(key, tmp_path, etag)
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        return etag
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._parts_dir(upload_id), ignore_errors=True)
+
+    def get_stream(
+        self,
+        key: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        path = self._path(key)
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError as e:
+            raise StorageError(f"Cannot read '{key}': not found") from e
+
+        with handle:
+            handle.seek(start or 0)
+            remaining = None if end is None else end - (start or 0) + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = handle.read(size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+
+        stat = path.stat()
+        meta_path = self._meta_path(key)
+        if meta_path.is_file():
+            etag = json.loads(meta_path.read_text())["etag"]
+        else:
+            md5 = hashlib.md5()
+            with open(path, "rb") as handle:
+                while chunk := handle.read(1024 * 1024):
+                    md5.update(chunk)
+            etag = md5.hexdigest()
+            self._write_meta(key, etag)
+
+        return ObjectInfo(
+            key=key,
+            size=stat.st_size,
+            etag=etag,
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        )
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+        self._meta_path(key).unlink(missing_ok=True)
+
+    def list(self, prefix: str = "") -> list[ObjectInfo]:
+        objects = []
+        for path in sorted(self.root.rglob("*")):
+            relative = path.relative_to(self.root)
+            if not path.is_file() or relative.parts[0] in (MULTIPART_DIR, META_DIR):
+                continue
+            if path.name.startswith(".") and path.name.endswith(".tmp"):
+                continue
+            key = relative.as_posix()
+            if key.startswith(prefix):
+                objects.append(self.head(key))
+        return objects
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        source = self._path(source_key)
+        if not source.is_file():
+            raise StorageError(f"Cannot copy '{source_key}': not found")
+        dest = self._path(dest_key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(source, tmp_path)
+        self._commit(dest_key, tmp_path, self.head(source_key).etag)
+
+    def presign_get(self, key: str, expires_in: int = 900) -> str:
+        raise StorageError("The local storage backend does not support presigned URLs")
+
+    def presign_put(self, key: str, expires_in: int = 900) -> str:
+        raise StorageError("The local storage backend does not support presigned URLs")
+
+    def presign_upload_part(
+        self, key: str, upload_id: str, part_number: int, expires_in: int = 900
+    ) -> str:
+        raise StorageError("The local storage backend does not support presigned URLs")
+
+    def url(self, key: str) -> str:
+        return self._path(key).as_uri()
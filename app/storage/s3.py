@@ -0,0 +1,164 @@
+import urllib.parse
+from typing import Iterator, Optional
+from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+
+from storage.base import StorageBackend, StorageError, ObjectInfo
+
+
+# DeleteObjects acepta como máximo 1000 claves por petición
+S3_DELETE_BATCH_SIZE = 1000
+
+
+class S3StorageBackend(StorageBackend):
+    """Amazon S3 (or S3-compatible) storage on top of the shared boto3 client."""
+
+    name = "s3"
+    supports_presign = True
+
+    def __init__(self, client: BaseClient, bucket_name: str, region: str):
+        self.client = client
+        self.bucket_name = bucket_name
+        self.region = region
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        response = self.client.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+        return response["ETag"].strip('"')
+
+    def create_multipart(self, key: str) -> str:
+        response = self.client.create_multipart_upload(Bucket=self.bucket_name, Key=key)
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = self.client.upload_part(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return response["ETag"]
+
+    def complete_multipart(self, key: str, upload_id: str, parts: list[dict]) -> str:
+        response = self.client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+        return response["ETag"].strip('"')
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id
+        )
+
+    def get_stream(
+        self,
+        key: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = 1024 * 1024,
+    ) -> Iterator[bytes]:
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if start is not None or end is not None:
+            params["Range"] = f"bytes={start or 0}-{'' if end is None else end}"
+        try:
+            body = self.client.get_object(**params)["Body"]
+        except ClientError as e:
+            raise StorageError(f"Cannot read '{key}': {e}") from e
+
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise StorageError(f"Cannot stat '{key}': {e}") from e
+
+        return ObjectInfo(
+            key=key,
+            size=response["ContentLength"],
+            etag=response["ETag"].strip('"'),
+            last_modified=response.get("LastModified"),
+        )
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def delete_many(self, keys: list[str]) -> dict[str, str]:
+        errors = {}
+        for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+            try:
+                response = self.client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                )
+            except ClientError as e:
+                errors.update({key: str(e) for key in batch})
+                continue
+            for error in response.get("Errors", []):
+                errors[error["Key"]] = f"{error.get('Code')}: {error.get('Message')}"
+        return errors
+
+    def list(self, prefix: str = "") -> list[ObjectInfo]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        objects = []
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for item in page.get("Contents", []):
+                objects.append(
+                    ObjectInfo(
+                        key=item["Key"],
+                        size=item["Size"],
+                        etag=item["ETag"].strip('"'),
+                        last_modified=item.get("LastModified"),
+                    )
+                )
+        return objects
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        # copy() gestiona por sí mismo las copias multipart de más de 5 GB
+        self.client.copy(
+            {"Bucket": self.bucket_name, "Key": source_key}, self.bucket_name, dest_key
+        )
+
+    def presign_get(self, key: str, expires_in: int = 900) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket_name, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def presign_put(self, key: str, expires_in: int = 900) -> str:
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket_name, "Key": key},
+            ExpiresIn=expires_in,
+        )
+
+    def presign_upload_part(
+        self, key: str, upload_id: str, part_number: int, expires_in: int = 900
+    ) -> str:
+        return self.client.generate_presigned_url(
+            "upload_part",
+            Params={
+                "Bucket": self.bucket_name,
+                "Key": key,
+                "UploadId": upload_id,
+                "PartNumber": part_number,
+            },
+            ExpiresIn=expires_in,
+        )
+
+    def url(self, key: str) -> str:
+        safe_chars = (
+            "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-._~,:;/=?& ()"
+        )
+        encoded_key = urllib.parse.quote(key, safe=safe_chars)
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{encoded_key.replace(' ', '+')}"
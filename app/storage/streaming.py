@@ -0,0 +1,91 @@
+from typing import AsyncIterator, Optional
+
+from storage.base import StorageBackend
+from utils.concurrency import run_blocking
+
+
+async def put_stream(
+    storage: StorageBackend, key: str, chunks: AsyncIterator[bytes], part_size: int
+) -> None:
+    """Uploads a stream of bytes to storage holding at most one part in memory.
+
+    The chunks are regrouped into parts of ``part_size`` bytes and sent as a
+    multipart upload; streams smaller than one part go in a single put. Every
+    backend call runs in the bounded I/O pool, so the event loop keeps
+    serving other requests while parts are in flight.
+
+    Args:
+        storage (StorageBackend): Target backend.
+        key (str): Key to store the object under.
+        chunks (AsyncIterator[bytes]): The content, in arbitrary-sized chunks.
+        part_size (int): Size of each multipart part.
+
+    Raises:
+        Exception: Whatever the backend or the chunk source raised. A started
+        multipart upload is aborted first.
+    """
+    buffer = bytearray()
+    parts = []
+    upload_id = None
+
+    async def send_part(data: bytes):
+        part_number = len(parts) + 1
+        etag = await run_blocking(storage.upload_part, key, upload_id, part_number, data)
+        parts.append({"ETag": etag, "PartNumber": part_number})
+
+    try:
+        async for chunk in chunks:
+            buffer.extend(chunk)
+            while len(buffer) >= part_size:
+                if upload_id is None:
+                    upload_id = await run_blocking(storage.create_multipart, key)
+                await send_part(bytes(buffer[:part_size]))
+                del buffer[:part_size]
+
+        if upload_id is None:
+            await run_blocking(storage.put_bytes, key, bytes(buffer))
+            return
+
+        if buffer:
+            await send_part(bytes(buffer))
+        await run_blocking(storage.complete_multipart, key, upload_id, parts)
+    except BaseException:
+        if upload_id is not None:
+            try:
+                await run_blocking(storage.abort_multipart, key, upload_id)
+            except Exception:
+                pass
+        raise
+
+
+async def iter_stream(
+    storage: StorageBackend,
+    key: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    chunk_size: int = 1024 * 1024,
+) -> AsyncIterator[bytes]:
+    """Reads an object (or the inclusive byte range ``start``-``end``) chunk by chunk.
+
+    Each chunk is pulled from the backend in the bounded I/O pool, so a
+    download holds at most one chunk in memory and never blocks the loop.
+
+    Args:
+        storage (StorageBackend): Source backend.
+        key (str): Key of the object.
+        start (Optional[int]): First byte to read.
+        end (Optional[int]): Last byte to read, inclusive.
+        chunk_size (int): Maximum size of each chunk.
+
+    Yields:
+        bytes: The next chunk of the object.
+    """
+    chunks = storage.get_stream(key, start, end, chunk_size)
+    try:
+        while True:
+            chunk = await run_blocking(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await run_blocking(chunks.close)
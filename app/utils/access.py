@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from services import files_services, permissions_services
+from schemas.user_schema import CurrentUser
+from utils.auth import ADMIN_ROLE_ID
+
+
+def require_folder_write(db: Session, user: CurrentUser, folder_id: Optional[int]) -> None:
+    """Raises 403 unless the user can write in the folder (None: the root).
+
+    The level is the effective one, so roles without ``can_create_files``
+    never get past it (see permissions_services.get_role_policy).
+    """
+    if permissions_services.get_folder_access_level(db, user, folder_id) < permissions_services.WRITE:
+        raise HTTPException(status_code=403, detail="Not enough permissions on the folder")
+
+
+
+def require_object_write(db: Session, user: CurrentUser, file_name: str, must_exist: bool) -> None:
+    """Raises unless the user can write the name-keyed object of ``file_name``.
+
+    The object is guarded by the file registered under that name: WRITE on
+    it is required. An object without a file belongs to nobody; with
+    ``must_exist`` only admins may touch it (404 for everyone else).
+    """
+    file = files_services.get_file_by_full_name(db, file_name.strip())
+    if file is None:
+        if must_exist and user.role_id != ADMIN_ROLE_ID:
+            raise HTTPException(status_code=404, detail="File not found in database")
+        return
+    level = permissions_services.get_file_access_levels(db, user, [file])[file.file_id]
+    if level < permissions_services.WRITE:
+        raise HTTPException(status_code=403, detail="Not enough permissions on the file")
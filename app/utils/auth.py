@@ -0,0 +1,78 @@
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from schemas.user_schema import CurrentUser
+from utils.tokens import TokenError, create_access_token, decode_access_token, access_token_ttl
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+# Rol con acceso total y rol de quien se registra solo (ver db/init.sql)
+ADMIN_ROLE_ID = 1
+SIGNUP_ROLE_ID = 2
+
+
+def issue_token(user) -> str:
+    """Issues an access token for a User row."""
+    return create_access_token(
+        {"sub": str(user.user_id), "username": user.username, "role_id": user.role_id},
+        access_token_ttl,
+    )
+
+
+# Dependencia
+def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> CurrentUser:
+    """Resolves the user of the request from its ``Authorization: Bearer`` token.
+
+    The token is verified statelessly (HMAC signature and expiry), so this
+    costs no database query; FastAPI runs it once per request however many
+    dependencies use it.
+
+    Raises:
+        HTTPException: 401 if the token is missing, invalid or expired.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=401,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    try:
+        claims = decode_access_token(credentials.credentials)
+        return CurrentUser(
+            user_id=int(claims["sub"]), username=claims["username"], role_id=claims["role_id"]
+        )
+    except (TokenError, KeyError, ValueError) as e:
+        raise HTTPException(
+            status_code=401,
+            detail=f"Invalid token: {str(e)}",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Dependencia
+def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+) -> Optional[CurrentUser]:
+    """Like get_current_user, but None instead of 401 when no token is sent.
+
+    Raises:
+        HTTPException: 401 if a token is sent but is invalid or expired.
+    """
+    if credentials is None:
+        return None
+    return get_current_user(credentials)
+
+
+# Dependencia
+def require_admin(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    """Only lets users with the admin role through.
+
+    Raises:
+        HTTPException: 401 without a valid token, 403 if the user is not an admin.
+    """
+    if current_user.role_id != ADMIN_ROLE_ID:
+        raise HTTPException(status_code=403, detail="Only admins can do this")
+    return current_user
@@ -0,0 +1,194 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import Any
+from dotenv import load_dotenv
+
+try:
+    import redis
+except ImportError:  # redis es opcional: sin él solo hay caché en memoria
+    redis = None
+
+load_dotenv()
+cache_redis_url = os.getenv("CACHE_REDIS_URL")
+
+
+def make_cache_key(name: str, **params) -> str:
+    """Builds a deterministic cache key from an endpoint name and its parameters."""
+    return f"{name}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+class TTLCache:
+    """In-process LRU cache with per-entry TTL and whole-namespace invalidation.
+
+    Each worker process has its own copy, so invalidation only reaches the
+    current process; the TTL bounds how stale other workers can be. Use
+    ``RedisCache`` (``CACHE_REDIS_URL``) when that is not acceptable.
+    """
+
+    backend = "memory"
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        """Returns ``(True, value)`` on a fresh hit, ``(False, None)`` otherwise."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drops every entry of the namespace."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def size(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "backend": self.backend,
+            "ttl_seconds": self.ttl,
+            "max_entries": self.max_entries,
+            "size": self.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+class RedisCache(TTLCache):
+    """Cache shared by every worker through Redis.
+
+    Keys embed a namespace generation number; ``invalidate`` increments it so
+    every process stops seeing the old entries at once, and Redis expires them
+    by TTL. Values must be JSON-serialisable. Hit/miss counters are per process.
+
+    If Redis is unreachable, invalidations are counted locally and the cache
+    is bypassed by this process until the increment reaches Redis.
+    """
+
+    backend = "redis"
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int, url: str):
+        super().__init__(namespace, ttl, max_entries)
+        self._redis = redis.Redis.from_url(url)
+        self._generation_key = f"cache:{namespace}:generation"
+        # Invalidaciones que aún no llegaron a Redis
+        self._pending_invalidations = 0
+
+    def _flush_invalidations(self) -> bool:
+        """Applies the pending invalidations; False if some are still pending."""
+        with self._lock:
+            pending = self._pending_invalidations
+        if pending:
+            try:
+                self._redis.incrby(self._generation_key, pending)
+            except redis.RedisError:
+                return False
+            with self._lock:
+                self._pending_invalidations -= pending
+        return True
+
+    def _key(self, key: str) -> str:
+        generation = int(self._redis.get(self._generation_key) or 0)
+        return f"cache:{self.namespace}:{generation}:{key}"
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        try:
+            # Con invalidaciones pendientes las entradas pueden estar obsoletas
+            raw = self._redis.get(self._key(key)) if self._flush_invalidations() else None
+        except redis.RedisError:
+            raw = None
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, json.loads(raw)
+
+    def set(self, key: str, value: Any) -> None:
+        if not self._flush_invalidations():
+            return
+        try:
+            self._redis.set(self._key(key), json.dumps(value, default=str), ex=max(1, int(self.ttl)))
+        except redis.RedisError:
+            pass
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._pending_invalidations += 1
+            self.invalidations += 1
+        self._flush_invalidations()
+
+    def size(self) -> int:
+        try:
+            generation = int(self._redis.get(self._generation_key) or 0)
+            pattern = f"cache:{self.namespace}:{generation}:*"
+            return sum(1 for _ in self._redis.scan_iter(match=pattern, count=500))
+        except redis.RedisError:
+            return 0
+
+
+_caches: dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, ttl: float, max_entries: int = 1000) -> TTLCache:
+    """Returns the process-wide cache for ``namespace``, creating it on first use.
+
+    Redis-backed when ``CACHE_REDIS_URL`` is set and the ``redis`` package is
+    installed, in-memory otherwise.
+    """
+    with _caches_lock:
+        if namespace not in _caches:
+            if cache_redis_url and redis is not None:
+                _caches[namespace] = RedisCache(namespace, ttl, max_entries, cache_redis_url)
+            else:
+                _caches[namespace] = TTLCache(namespace, ttl, max_entries)
+        return _caches[namespace]
+
+
+def invalidate_cache(namespace: str) -> None:
+    """Invalidates ``namespace`` without importing the module that owns it.
+
+    Does nothing if the namespace was never created in this process.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+    if cache is not None:
+        cache.invalidate()
+
+
+def get_all_cache_stats() -> list[dict]:
+    """Returns the stats of every cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
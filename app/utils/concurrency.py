@@ -0,0 +1,54 @@
+import os
+import asyncio
+import functools
+import threading
+from typing import Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+blocking_io_workers = int(os.getenv("BLOCKING_IO_WORKERS", 32))
+
+# Pool acotado para las llamadas bloqueantes (boto3, SQLAlchemy síncrono); se crea
+# al primer uso y de nuevo tras shutdown_executor (otro arranque del mismo proceso)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=blocking_io_workers, thread_name_prefix="blocking-io"
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs a blocking call in the bounded I/O pool without stalling the event loop.
+
+    Args:
+        func (Callable): The blocking function to run.
+        *args: Positional arguments for ``func``.
+        **kwargs: Keyword arguments for ``func``.
+
+    Returns:
+        Any: Whatever ``func`` returns. Exceptions are re-raised in the caller.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_executor() -> None:
+    """Waits for in-flight blocking calls and releases the pool threads.
+
+    The next ``run_blocking`` call creates a new pool.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
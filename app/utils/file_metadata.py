@@ -0,0 +1,285 @@
+import io
+import re
+import html
+import struct
+import zipfile
+import mimetypes
+from typing import Optional, Tuple
+
+# Opcional: lectura completa de PDFs (páginas y texto), si el paquete está instalado
+try:
+    from pypdf import PdfReader
+except ImportError:
+    PdfReader = None
+
+# Firmas (magic bytes) al inicio del contenido
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"%PDF-", "application/pdf"),
+    (b"\x1f\x8b", "application/gzip"),
+    (b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed"),
+    (b"Rar!\x1a\x07", "application/vnd.rar"),
+    (b"OggS", "audio/ogg"),
+    (b"fLaC", "audio/flac"),
+    (b"ID3", "audio/mpeg"),
+    (b"\x1a\x45\xdf\xa3", "video/webm"),
+)
+
+# Documentos de Office: son ZIP y se distinguen por su contenido
+_OFFICE_TYPES = (
+    ("word/", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    ("xl/", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    ("ppt/", "application/vnd.openxmlformats-officedocument.presentationml.presentation"),
+)
+
+# Tipos no text/* cuyo contenido también es texto
+_TEXT_TYPES = {"application/json", "application/xml", "application/javascript", "image/svg+xml"}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TAG_RE = re.compile(r"<[^>]*>")
+_DOCX_PARAGRAPH_RE = re.compile(rb"</w:p>")
+_PDF_PAGES_RE = re.compile(rb"/Type\s*/Pages(?![A-Za-z])")
+_PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+_PDF_COUNT_RE = re.compile(rb"/Count\s+(\d+)")
+
+# Marcadores SOF de JPEG (los que llevan alto y ancho de la imagen)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _is_text(data: bytes) -> bool:
+    if b"\x00" in data[:8192]:
+        return False
+    try:
+        data[:8192].decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Un carácter multibyte cortado al final del fragmento no cuenta
+        return e.start >= len(data[:8192]) - 3
+    return True
+
+
+def _zip_mime_type(data: bytes) -> str:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            names = archive.namelist()
+    except zipfile.BadZipFile:
+        # Solo tenemos el principio del archivo: la primera entrada suele bastar
+        names = [data[30:30 + struct.unpack("<H", data[26:28])[0]].decode("utf-8", "replace")]
+    for prefix, mime_type in _OFFICE_TYPES:
+        if any(name.startswith(prefix) for name in names):
+            return mime_type
+    return "application/zip"
+
+
+def sniff_mime_type(data: bytes, file_name: str = "") -> str:
+    """Detects the MIME type of a content from its first bytes.
+
+    Known binary signatures win over the extension; text content and
+    unknown signatures fall back to the type of the extension.
+
+    Args:
+        data (bytes): The content, or at least its first few KB.
+        file_name (str): The file name, extension included.
+
+    Returns:
+        str: The MIME type, ``application/octet-stream`` if unknown.
+    """
+    for signature, mime_type in _SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b"RIFF" and data[8:12] in (b"WEBP", b"WAVE", b"AVI "):
+        return {b"WEBP": "image/webp", b"WAVE": "audio/wav", b"AVI ": "video/x-msvideo"}[data[8:12]]
+    if data[4:8] == b"ftyp":
+        return "video/quicktime" if data[8:10] == b"qt" else "video/mp4"
+    if data.startswith(b"PK\x03\x04") and len(data) >= 30:
+        return _zip_mime_type(data)
+    if data.startswith(b"BM") and len(data) >= 26 and data[6:10] == b"\x00\x00\x00\x00":
+        return "image/bmp"
+
+    guessed, _ = mimetypes.guess_type(file_name)
+    if guessed:
+        return guessed
+    if data and _is_text(data):
+        return "text/plain"
+    return "application/octet-stream"
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    i = 2
+    while i + 9 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        i += 2 + struct.unpack(">H", data[i + 2:i + 4])[0]
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def image_size(data: bytes, mime_type: str) -> Optional[Tuple[int, int]]:
+    """Reads the width and height of a PNG, GIF, JPEG, BMP or WebP image from its header.
+
+    Args:
+        data (bytes): The content, or at least its first few KB (JPEG may need more).
+        mime_type (str): The type returned by ``sniff_mime_type``.
+
+    Returns:
+        Optional[Tuple[int, int]]: ``(width, height)`` in pixels, or None if unknown.
+    """
+    try:
+        if mime_type == "image/png" and data[12:16] == b"IHDR":
+            return struct.unpack(">II", data[16:24])
+        if mime_type == "image/gif":
+            return struct.unpack("<HH", data[6:10])
+        if mime_type == "image/bmp":
+            width, height = struct.unpack("<ii", data[18:26])
+            # Alto negativo: filas de arriba abajo
+            return width, abs(height)
+        if mime_type == "image/jpeg":
+            return _jpeg_size(data)
+        if mime_type == "image/webp":
+            return _webp_size(data)
+    except struct.error:
+        return None
+    return None
+
+
+def pdf_page_count(data: bytes) -> Optional[int]:
+    """Counts the pages of a PDF.
+
+    Uses pypdf when it is installed. Otherwise the ``/Count`` of the root
+    page tree is read from the raw bytes, falling back to counting the page
+    objects; PDFs that keep them in compressed object streams return None.
+
+    Args:
+        data (bytes): The whole PDF.
+
+    Returns:
+        Optional[int]: The number of pages, or None if it cannot be read.
+    """
+    if PdfReader is not None:
+        try:
+            return len(PdfReader(io.BytesIO(data)).pages)
+        except Exception:
+            pass
+
+    # El árbol de páginas raíz es el nodo /Pages con mayor /Count
+    counts = []
+    for match in _PDF_PAGES_RE.finditer(data):
+        start = data.rfind(b"<<", 0, match.start())
+        end = data.find(b">>", match.end())
+        if start == -1 or end == -1:
+            continue
+        count = _PDF_COUNT_RE.search(data, start, end)
+        if count:
+            counts.append(int(count.group(1)))
+    if counts:
+        return max(counts)
+    pages = len(_PDF_PAGE_RE.findall(data))
+    return pages or None
+
+
+def _clean_text(text: str, max_chars: int) -> str:
+    return _WHITESPACE_RE.sub(" ", text).strip()[:max_chars]
+
+
+def text_snippet(data: bytes, mime_type: str, max_chars: int = 500) -> Optional[str]:
+    """Extracts the beginning of the text of a document.
+
+    Supports text types (HTML and XML without tags), Word documents and,
+    with pypdf installed, PDFs.
+
+    Args:
+        data (bytes): The content (the whole file for Word and PDF).
+        mime_type (str): The type returned by ``sniff_mime_type``.
+        max_chars (int): Maximum length of the snippet.
+
+    Returns:
+        Optional[str]: The text with its whitespace collapsed, or None if the
+        type has no text or it cannot be read.
+    """
+    text = None
+    if mime_type.startswith("text/") or mime_type in _TEXT_TYPES:
+        # Se decodifica un margen de sobra: los espacios se colapsan después
+        text = data[:max_chars * 8].decode("utf-8", "replace")
+        if mime_type in ("text/html", "application/xml", "text/xml", "image/svg+xml"):
+            text = html.unescape(_TAG_RE.sub(" ", text))
+    elif mime_type == _OFFICE_TYPES[0][1]:
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                document = archive.read("word/document.xml")
+        except (zipfile.BadZipFile, KeyError):
+            return None
+        document = _DOCX_PARAGRAPH_RE.sub(b" ", document)
+        text = html.unescape(_TAG_RE.sub("", document.decode("utf-8", "replace")))
+    elif mime_type == "application/pdf" and PdfReader is not None:
+        try:
+            reader = PdfReader(io.BytesIO(data))
+            parts = []
+            for page in reader.pages:
+                parts.append(page.extract_text() or "")
+                if sum(len(part) for part in parts) >= max_chars:
+                    break
+            text = " ".join(parts)
+        except Exception:
+            return None
+
+    if text is None:
+        return None
+    return _clean_text(text, max_chars) or None
+
+
+def extract_metadata(data: bytes, file_name: str, complete: bool, snippet_chars: int = 500) -> dict:
+    """Extracts the metadata of a file content.
+
+    Args:
+        data (bytes): The content, or only its beginning if ``complete`` is False.
+        file_name (str): The file name, extension included.
+        complete (bool): Whether ``data`` is the whole content. Page counts and
+            text of PDF and Word documents need it.
+        snippet_chars (int): Maximum length of the text snippet.
+
+    Returns:
+        dict: ``mime_type`` always; ``width`` and ``height`` for images,
+        ``pages`` for PDFs and ``text_snippet`` for documents with text, when
+        they can be read.
+    """
+    mime_type = sniff_mime_type(data, file_name)
+    metadata = {"mime_type": mime_type}
+
+    size = image_size(data, mime_type)
+    if size is not None:
+        metadata["width"], metadata["height"] = size
+
+    if mime_type == "application/pdf" and complete:
+        pages = pdf_page_count(data)
+        if pages is not None:
+            metadata["pages"] = pages
+
+    if complete or not (mime_type == "application/pdf" or mime_type.startswith("application/vnd.")):
+        snippet = text_snippet(data, mime_type, snippet_chars)
+        if snippet:
+            metadata["text_snippet"] = snippet
+    return metadata
@@ -1,40 +1,93 @@
 import os
-import urllib.parse
-from typing import Optional
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter
 from dotenv import load_dotenv
 from fastapi.responses import JSONResponse
 from fastapi import UploadFile, HTTPException
+from storage import StorageBackend, ObjectInfo
+from utils.upload_digest import UploadDigest
 
 load_dotenv()
-s3_bucket_name = os.getenv("S3_BUCKET")
-aws_region = os.getenv("AWS_REGION", "us-east-2")
+upload_chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))
 
 
-def create_s3_url(file_name: str) -> str:
-    """This function is used to create S3 URL.
+def build_file_record(
+    storage: StorageBackend,
+    filename: str,
+    file_metadata: dict,
+    folder_id: int,
+    owner_id: int,
+    blob_key: Optional[str] = None,
+    staging_key: Optional[str] = None,
+) -> dict:
+    """This function is used to build the data-file to db once the file has been read.
 
     Args:
-        file_name (str): The name of the file.
+        storage (StorageBackend): The storage backend holding the file.
+        filename (str): The client-side name of the file, extension included.
+        file_metadata (dict): Size and checksums, see UploadDigest.as_metadata and object_metadata.
+        folder_id (int): The folder ID where the file is stored.
+        owner_id (int): The ID of the owner of the file.
+        blob_key (Optional[str]): Key of the blob holding the content (its SHA-256
+            must be the one in ``file_metadata``); None if it is stored by name.
+        staging_key (Optional[str]): Temporary key of a direct upload not moved
+            to its blob yet.
 
     Returns:
-        str: The S3 URL of the uploaded file.
+        dict: A dictionary containing file information.
     """
+    return {
+        "file_name": (os.path.splitext(filename)[0]),
+        "file_metadata": file_metadata,
+        "file_type": os.path.splitext(filename)[1],
+        "folder_id": folder_id,
+        "owner_id": owner_id,
+        "s3_url": storage.url(blob_key or staging_key or filename),
+        "blob_sha256": file_metadata["sha256"] if blob_key else None,
+        "staging_key": staging_key,
+    }
+
+
+def object_metadata(info: ObjectInfo, sha256: Optional[str]) -> dict:
+    """This function is used to build the file metadata of content already in storage.
 
-    safe_chars = (
-        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-._~,:;/=?& ()"
-    )
-    encoded_file_name = urllib.parse.quote(file_name, safe=safe_chars)
-    return f"https://{s3_bucket_name}.s3.{aws_region}.amazonaws.com/{encoded_file_name.replace(' ', '+')}"
+    Used when a file reuses a stored blob without uploading it, or registers
+    a direct upload before its hash is known: size and ETag come from a HEAD
+    of the object.
 
+    Args:
+        info (ObjectInfo): The HEAD result of the object.
+        sha256 (Optional[str]): The SHA-256 of the content, None if not computed yet.
 
-async def prepare_data_for_db(uploaded_file: UploadFile, folder_id: int, owner_id: int) -> dict:
+    Returns:
+        dict: The same keys as UploadDigest.as_metadata.
+    """
+    return {
+        "size": f"{info.size / 1024:.2f}kb",
+        "size_bytes": info.size,
+        "sha256": sha256,
+        "etag": info.etag,
+    }
+
+
+async def prepare_data_for_db(
+    storage: StorageBackend,
+    uploaded_file: UploadFile,
+    folder_id: int,
+    owner_id: int,
+    part_size: int,
+) -> dict:
     """This function is used to get data-file to db.
 
+    Only used when the file is registered without being uploaded; uploads get
+    the same data from the digest computed while streaming to S3.
+
     Args:
+        storage (StorageBackend): The storage backend the file belongs to.
         uploaded_file (UploadFile): The uploaded file.
-        s3_url (str): The S3 URL of the uploaded file.
         folder_id (int): The folder ID where the file is stored.
+        owner_id (int): The ID of the owner of the file.
+        part_size (int): The multipart part size used to compute the ETag.
 
     Returns:
         dict: A dictionary containing file information.
@@ -43,44 +96,67 @@ async def prepare_data_for_db(uploaded_file: UploadFile, folder_id: int, owner_i
         HTTPException: If there is an error while processing the file.
     """
     try:
-
-        await uploaded_file.seek(0)
-        file_metadata = {
-            "size": f"{len(await uploaded_file.read()) / 1024:.2f}kb",
-        }
-        await uploaded_file.seek(0)
-
-        response = {
-            "file_name": (os.path.splitext(uploaded_file.filename)[0]),
-            "file_metadata": file_metadata,
-            "file_type": os.path.splitext(uploaded_file.filename)[1],
-            "folder_id": folder_id,
-            "owner_id": owner_id,
-            "s3_url": create_s3_url(uploaded_file.filename),
-        }
-
-        return response
+        digest = await digest_upload_file(uploaded_file, part_size)
+        return build_file_record(
+            storage, uploaded_file.filename, digest.as_metadata(), folder_id, owner_id
+        )
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-def save_file_temporarily(uploaded_file: UploadFile) -> str:
-    """This function is used to save the file temporarily.
+async def digest_upload_file(uploaded_file: UploadFile, part_size: int) -> UploadDigest:
+    """This function is used to compute the size and checksums of an uploaded file.
+
+    The file is read from the start and rewound afterwards, so it can be read
+    again (e.g. to upload it).
 
     Args:
         uploaded_file (UploadFile): The uploaded file.
+        part_size (int): The multipart part size used to compute the ETag.
 
     Returns:
-        str: The path of the temporarily saved file.
+        UploadDigest: The digest of the whole file.
+    """
+    await uploaded_file.seek(0)
+    digest = UploadDigest(part_size)
+    async for chunk in iter_upload_file(uploaded_file):
+        digest.update(chunk)
+    await uploaded_file.seek(0)
+    return digest
 
-    Raises:
-        HTTPException: If there is an error while saving the file.
+
+def digest_stored_object(storage: StorageBackend, key: str, part_size: int) -> UploadDigest:
+    """This function is used to compute the size and checksums of an object already in storage.
+
+    Used by the background job that promotes uploads that never went through
+    the API (presigned URLs); the object is read once.
+
+    Args:
+        storage (StorageBackend): The storage backend holding the object.
+        key (str): The key of the object.
+        part_size (int): The multipart part size used to compute the ETag.
+
+    Returns:
+        UploadDigest: The digest of the whole object.
     """
-    try:
-        temp_file_path = f"/tmp/{uploaded_file.filename}"
-        with open(temp_file_path, "wb") as f:
-            f.write(uploaded_file.file.read())
-        return temp_file_path
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    digest = UploadDigest(part_size)
+    for chunk in storage.get_stream(key, chunk_size=upload_chunk_size):
+        digest.update(chunk)
+    return digest
+
+
+async def iter_upload_file(
+    uploaded_file: UploadFile, chunk_size: int = upload_chunk_size
+) -> AsyncIterator[bytes]:
+    """This function is used to read an uploaded file in fixed-size chunks.
+
+    Args:
+        uploaded_file (UploadFile): The uploaded file.
+        chunk_size (int): The maximum number of bytes per chunk.
+
+    Yields:
+        bytes: The next chunk of the file.
+    """
+    while chunk := await uploaded_file.read(chunk_size):
+        yield chunk
@@ -0,0 +1,13 @@
+def folder_prefix(path: str, folder_id: int) -> str:
+    """Path shared by every descendant of a folder (its own path plus its id)."""
+    return f"{path}{folder_id}/"
+
+
+def prefix_upper_bound(prefix: str) -> str:
+    """Smallest string greater than every string starting with ``prefix``.
+
+    Paths end in "/" and "0" is the next byte, so ``path >= prefix AND
+    path < prefix_upper_bound(prefix)`` is a prefix match that an index on
+    ``path`` (COLLATE "C" in PostgreSQL) can answer with a range scan.
+    """
+    return prefix[:-1] + "0"
@@ -0,0 +1,64 @@
+from typing import Optional
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header does not overlap the object."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Parses a single-range ``Range`` header against an object of ``size`` bytes.
+
+    Supports ``bytes=start-end``, ``bytes=start-`` and ``bytes=-suffix``.
+    Headers that are malformed, use another unit or ask for several ranges
+    are ignored, which per RFC 9110 means serving the whole object.
+
+    Args:
+        header (Optional[str]): The raw Range header.
+        size (int): Size of the object in bytes.
+
+    Returns:
+        Optional[tuple[int, int]]: The inclusive ``(start, end)`` to serve, or
+        None to serve the whole object.
+
+    Raises:
+        RangeNotSatisfiable: If the range starts past the end of the object.
+    """
+    if not header or not header.startswith("bytes=") or "," in header or size == 0:
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - suffix, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Checks an ``If-None-Match`` / ``If-Range`` header against an ETag (weak comparison).
+
+    Args:
+        header (Optional[str]): The raw header, e.g. ``"abc", W/"def"`` or ``*``.
+        etag (str): The current ETag, without quotes.
+
+    Returns:
+        bool: True if any listed tag (or ``*``) matches.
+    """
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/").strip('"') == etag:
+            return True
+    return False
@@ -0,0 +1,159 @@
+from collections import deque
+from typing import AsyncIterator, Optional
+from fastapi import Request, HTTPException
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class MultipartFileStream:
+    """Incremental reader for a ``multipart/form-data`` request body.
+
+    Unlike ``UploadFile``, the file part is never spooled to memory or disk:
+    its bytes are yielded as they arrive from the socket, so memory stays
+    bounded by the size of a single network chunk.
+
+    Usage:
+        stream = MultipartFileStream(request, "uploaded_file")
+        filename = await stream.open()
+        async for chunk in stream.iter_file():
+            ...
+        folder_id = stream.fields.get("folder_id")
+
+    Plain form fields sent before the file are available after ``open()``;
+    the ones sent after it are available once ``iter_file()`` is exhausted.
+    """
+
+    def __init__(self, request: Request, field_name: str = "uploaded_file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.fields: dict[str, str] = {}
+
+        self._body = request.stream().__aiter__()
+        self._body_done = False
+        self._events: deque = deque()
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._parser = MultipartParser(
+            params[b"boundary"],
+            {
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    def _on_part_begin(self) -> None:
+        self._disposition = b""
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+        if filename is not None:
+            filename = filename.decode("utf-8", errors="replace")
+        self._events.append(("part", name, filename))
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        self._events.append(("data", bytes(data[start:end])))
+
+    def _on_part_end(self) -> None:
+        self._events.append(("end",))
+
+    async def _next_event(self) -> Optional[tuple]:
+        """Returns the next parser event, reading more of the body when needed."""
+        while not self._events:
+            if self._body_done:
+                return None
+            try:
+                chunk = await self._body.__anext__()
+            except StopAsyncIteration:
+                self._parser.finalize()
+                self._body_done = True
+                continue
+            if chunk:
+                self._parser.write(chunk)
+        return self._events.popleft()
+
+    async def _read_field(self, name: str) -> None:
+        """Buffers a (small) form field until its part ends."""
+        value = bytearray()
+        while (event := await self._next_event()) is not None:
+            if event[0] == "end":
+                break
+            if event[0] == "data":
+                value.extend(event[1])
+                if len(value) > MAX_FIELD_SIZE:
+                    raise HTTPException(status_code=413, detail=f"Form field '{name}' is too large")
+        self.fields[name] = value.decode("utf-8", errors="replace")
+
+    async def _skip_part(self) -> None:
+        while (event := await self._next_event()) is not None:
+            if event[0] == "end":
+                break
+
+    async def open(self) -> str:
+        """Advances the body up to the start of the file part.
+
+        Returns:
+            str: The client-side filename of the uploaded file.
+
+        Raises:
+            HTTPException: If the body has no file part named ``field_name``.
+        """
+        while (event := await self._next_event()) is not None:
+            if event[0] != "part":
+                continue
+            _, name, filename = event
+            if filename is None:
+                await self._read_field(name)
+            elif name == self.field_name and filename:
+                self.filename = filename
+                return filename
+            else:
+                await self._skip_part()
+
+        raise HTTPException(status_code=400, detail=f"Missing file field '{self.field_name}'")
+
+    async def iter_file(self) -> AsyncIterator[bytes]:
+        """Yields the file bytes as they arrive, then reads the trailing fields."""
+        if self.filename is None:
+            await self.open()
+
+        while (event := await self._next_event()) is not None:
+            if event[0] == "end":
+                break
+            if event[0] == "data" and event[1]:
+                yield event[1]
+
+        while (event := await self._next_event()) is not None:
+            if event[0] == "part":
+                if event[2] is None:
+                    await self._read_field(event[1])
+                else:
+                    await self._skip_part()
@@ -0,0 +1,143 @@
+import re
+import time
+import threading
+from typing import Callable, Iterable, Optional
+
+# Palabras como las separa pg_trgm: letras y dígitos; el resto es separador
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def escape_like(value: str) -> str:
+    """Escapes the LIKE wildcards of a user string (to use with ``escape="\\\\"``)."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _word_trigrams(word: str) -> list[str]:
+    padded = f"  {word} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def trigram_sequence(text: str) -> list[str]:
+    """The trigrams of a string in order, pg_trgm style (lowercase, padded words)."""
+    return [trigram for word in _WORD_RE.findall(text.lower()) for trigram in _word_trigrams(word)]
+
+
+def word_similarity(query: str, text: str) -> float:
+    """Same measure as pg_trgm's ``word_similarity``.
+
+    The greatest similarity between the trigrams of ``query`` and those of any
+    contiguous extent of ``text``, so ``word_similarity("word", "two words")``
+    is 0.8 and a query matches well inside a long file name.
+    """
+    query_trigrams = set(trigram_sequence(query))
+    if not query_trigrams:
+        return 0.0
+    sequence = trigram_sequence(text)
+    best = 0.0
+    for start in range(len(sequence)):
+        if sequence[start] not in query_trigrams:
+            continue
+        extent = set()
+        for trigram in sequence[start:]:
+            extent.add(trigram)
+            common = len(query_trigrams & extent)
+            best = max(best, common / (len(query_trigrams) + len(extent) - common))
+    return best
+
+
+def match_tier(query: str, name: str) -> int:
+    """3 for an exact match, 2 for a prefix, 1 for a substring, 0 otherwise."""
+    if name == query:
+        return 3
+    if name.startswith(query):
+        return 2
+    if query in name:
+        return 1
+    return 0
+
+
+class TrigramNameIndex:
+    """In-memory trigram index over the file names, for databases without pg_trgm.
+
+    The index is loaded on first use with ``loader`` and rebuilt when it is
+    invalidated or older than ``ttl`` seconds. Searches return the same
+    ranking as the SQL version: match tier plus word similarity.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._names: dict[int, str] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self) -> None:
+        """Forces a rebuild on the next search."""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self, loader: Callable[[], Iterable[tuple[int, str]]]) -> None:
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            names, postings = {}, {}
+            for file_id, file_name in loader():
+                name = (file_name or "").lower()
+                names[file_id] = name
+                for trigram in set(trigram_sequence(name)):
+                    postings.setdefault(trigram, set()).add(file_id)
+            self._names, self._postings = names, postings
+            self._loaded_at = time.monotonic()
+
+    def _candidates(self, query: str, mode: str) -> Iterable[int]:
+        if mode == "fuzzy":
+            # Comparten al menos un trigrama con la búsqueda
+            ids = set()
+            for trigram in set(trigram_sequence(query)):
+                ids |= self._postings.get(trigram, set())
+            return ids | set(self._candidates(query, "contains"))
+
+        # Trigramas interiores de cada palabra: todo nombre que contenga la
+        # búsqueda los tiene
+        inner = {
+            word[i:i + 3]
+            for word in _WORD_RE.findall(query)
+            for i in range(len(word) - 2)
+        }
+        if not inner:
+            return self._names.keys()
+        postings = sorted((self._postings.get(trigram, set()) for trigram in inner), key=len)
+        return set.intersection(*postings)
+
+    def search(
+        self,
+        query: str,
+        mode: str,
+        loader: Callable[[], Iterable[tuple[int, str]]],
+        similarity_threshold: float,
+    ) -> list[tuple[float, int]]:
+        """Ranks the files whose name matches ``query``.
+
+        Args:
+            query (str): Lowercase search string
+            mode (str): "prefix", "contains" or "fuzzy"
+            loader (Callable): Returns every ``(file_id, file_name)``, used to (re)build the index
+            similarity_threshold (float): Minimum word similarity of a fuzzy match
+
+        Returns:
+            list[tuple[float, int]]: ``(score, file_id)`` pairs, best first
+        """
+        self._ensure_loaded(loader)
+        names = self._names
+        results = []
+        for file_id in self._candidates(query, mode):
+            name = names[file_id]
+            tier = match_tier(query, name)
+            if mode == "prefix" and tier < 2 or mode == "contains" and tier < 1:
+                continue
+            similarity = word_similarity(query, name)
+            if mode == "fuzzy" and tier == 0 and similarity < similarity_threshold:
+                continue
+            results.append((tier + similarity, file_id))
+        results.sort(reverse=True)
+        return results
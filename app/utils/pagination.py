@@ -0,0 +1,120 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort_key: str, values: list) -> str:
+    """Encodes the sort values of the last row of a page into an opaque cursor.
+
+    Args:
+        sort_key (str): Name of the sort the cursor belongs to.
+        values (list): Sort column value(s) followed by the tie-breaker id.
+
+    Returns:
+        str: URL-safe cursor string.
+    """
+    payload = {"k": sort_key, "v": [_encode_value(value) for value in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> list:
+    """Decodes a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor (str): The cursor received from the client.
+        sort_key (str): The sort the current request uses.
+
+    Returns:
+        list: The sort values stored in the cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed or belongs to another sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(value) for value in payload["v"]]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if payload.get("k") != sort_key:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    return values
+
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate_keyset(
+    query: Query,
+    sort_column,
+    id_column,
+    descending: bool,
+    limit: int,
+    cursor: Optional[str],
+    sort_key: str,
+) -> tuple[list, Optional[str]]:
+    """Returns one page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    Instead of OFFSET, the page starts right after the row encoded in the
+    cursor (``WHERE (sort, id) > (:last_sort, :last_id)``), so with an index on
+    ``(sort_column, id_column)`` every page costs the same regardless of depth.
+    Sort columns are expected to be NOT NULL.
+
+    Args:
+        query (Query): Base query, already filtered.
+        sort_column: Column to order by.
+        id_column: Unique column used as tie-breaker.
+        descending (bool): Sort direction.
+        limit (int): Maximum number of rows in the page.
+        cursor (Optional[str]): Cursor returned with the previous page, if any.
+        sort_key (str): Name of the sort, stored in the cursor to reject mismatches.
+
+    Returns:
+        tuple[list, Optional[str]]: The rows of the page and the cursor of the
+        next page, or None if this is the last one.
+    """
+    limit = clamp_limit(limit)
+    key = tuple_(sort_column, id_column)
+
+    if cursor:
+        last_sort, last_id = decode_cursor(cursor, sort_key)
+        bound = tuple_(last_sort, last_id)
+        query = query.filter(key < bound if descending else key > bound)
+
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    next_cursor = encode_cursor(
+        sort_key, [getattr(last, sort_column.key), getattr(last, id_column.key)]
+    )
+    return rows, next_cursor
@@ -1,36 +1,164 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
 import bcrypt
+from dotenv import load_dotenv
 
-def hash_password(password: str, cost: int = 12) -> str:
+load_dotenv()
+# Coste de bcrypt; los hashes con otro coste se rehacen en el siguiente login
+bcrypt_cost = int(os.getenv("BCRYPT_COST", 12))
+# Hilos dedicados a bcrypt (libera el GIL) y cuántos hashes pueden esperar turno
+password_hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+password_hash_max_pending = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", password_hash_workers * 8)
+)
+
+# Pool propio: un pico de logins no ocupa los hilos de las rutas síncronas. Se crea
+# al primer uso y de nuevo tras shutdown_hasher (otro arranque del mismo proceso)
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(password_hash_workers + password_hash_max_pending)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=password_hash_workers, thread_name_prefix="password-hash"
+            )
+        return _executor
+
+
+def _submit(func: Callable[..., Any], *args) -> Future:
+    """Queues a bcrypt call in the hashing pool, or fails fast if it is saturated."""
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Too many password operations in progress")
+    try:
+        future = _get_executor().submit(func, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def _hashpw(password: str, cost: int) -> str:
+    salt = bcrypt.gensalt(rounds=cost)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+def hash_password(password: str, cost: int = bcrypt_cost) -> str:
     """Hashes a password using bcrypt with an optional cost factor.
-    
+
+    The hash runs in the dedicated hashing pool; the calling thread waits for it.
+    From async code use ``hash_password_async`` instead.
+
     Args:
         password (str): The password to hash.
-        cost (int, optional): The cost factor for bcrypt. Default is 12.
-        
+        cost (int, optional): The cost factor for bcrypt. Default is BCRYPT_COST (12).
+
     Returns:
         str: The hashed password.
-    
+
     Raises:
         ValueError: If the password is empty.
+        PasswordHasherBusy: If the hashing pool is saturated.
     """
     if not password:
         raise ValueError("Password cannot be empty.")
-    
-    salt = bcrypt.gensalt(rounds=cost)
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed_password.decode("utf-8")
+    return _submit(_hashpw, password, cost).result()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies a plain password against a hashed password.
-    
+
+    The check runs in the dedicated hashing pool; the calling thread waits for it.
+    From async code use ``verify_password_async`` instead.
+
     Args:
         plain_password (str): The plain password to verify.
         hashed_password (str): The hashed password to compare against.
-    
+
     Returns:
         bool: True if the passwords match, False otherwise.
-        
+
     Raises:
-        ValueError: If the plain password or hashed password is empty.
+        PasswordHasherBusy: If the hashing pool is saturated.
     """
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
\ No newline at end of file
+    return _submit(_checkpw, plain_password, hashed_password).result()
+
+
+async def hash_password_async(password: str, cost: int = bcrypt_cost) -> str:
+    """Async version of hash_password; the event loop keeps serving while bcrypt runs.
+
+    Args:
+        password (str): The password to hash.
+        cost (int, optional): The cost factor for bcrypt. Default is BCRYPT_COST (12).
+
+    Returns:
+        str: The hashed password.
+
+    Raises:
+        ValueError: If the password is empty.
+        PasswordHasherBusy: If the hashing pool is saturated.
+    """
+    if not password:
+        raise ValueError("Password cannot be empty.")
+    return await asyncio.wrap_future(_submit(_hashpw, password, cost))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Async version of verify_password; the event loop keeps serving while bcrypt runs.
+
+    Args:
+        plain_password (str): The plain password to verify.
+        hashed_password (str): The hashed password to compare against.
+
+    Returns:
+        bool: True if the passwords match, False otherwise.
+
+    Raises:
+        PasswordHasherBusy: If the hashing pool is saturated.
+    """
+    return await asyncio.wrap_future(_submit(_checkpw, plain_password, hashed_password))
+
+
+def needs_rehash(hashed_password: str, cost: int = bcrypt_cost) -> bool:
+    """Checks whether a stored hash was made with a different cost than the configured one.
+
+    Args:
+        hashed_password (str): A bcrypt hash, e.g. ``$2b$12$...``.
+        cost (int, optional): The expected cost factor. Default is BCRYPT_COST.
+
+    Returns:
+        bool: True if the hash should be recomputed with ``cost``.
+    """
+    try:
+        return int(hashed_password.split("$")[2]) != cost
+    except (IndexError, ValueError):
+        return True
+
+
+def shutdown_hasher() -> None:
+    """Waits for in-flight hashes and releases the pool threads.
+
+    The next hash or check creates a new pool.
+    """
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
@@ -0,0 +1,73 @@
+import os
+import threading
+import boto3
+from typing import Optional
+from dotenv import load_dotenv
+from botocore.client import BaseClient
+from botocore.config import Config
+
+load_dotenv()
+aws_access_key = os.getenv("AWS_ACCESS_KEY_ID")
+aws_secret_key = os.getenv("AWS_SECRET_ACCESS_KEY")
+aws_region = os.getenv("AWS_REGION")
+
+_s3_client: Optional[BaseClient] = None
+_s3_client_lock = threading.Lock()
+
+
+def build_s3_config() -> Config:
+    """Builds the botocore config shared by every S3 request of the process.
+
+    Returns:
+        Config: Connection pool, keep-alive, timeout and retry settings read
+        from the environment.
+    """
+    return Config(
+        max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", 50)),
+        tcp_keepalive=os.getenv("S3_TCP_KEEPALIVE", "true").lower() == "true",
+        connect_timeout=float(os.getenv("S3_CONNECT_TIMEOUT", 5)),
+        read_timeout=float(os.getenv("S3_READ_TIMEOUT", 60)),
+        retries={
+            "mode": os.getenv("S3_RETRY_MODE", "standard"),
+            "max_attempts": int(os.getenv("S3_MAX_ATTEMPTS", 3)),
+        },
+    )
+
+
+def init_s3_client() -> BaseClient:
+    """Creates the process-wide S3 client. Called once at app startup.
+
+    boto3 clients are thread-safe, so a single instance (and its connection
+    pool) is shared by every request instead of paying credential resolution
+    and a new TLS handshake each time.
+
+    Returns:
+        BaseClient: The shared S3 client.
+    """
+    global _s3_client
+
+    with _s3_client_lock:
+        if _s3_client is None:
+            session = boto3.session.Session(
+                aws_access_key_id=aws_access_key,
+                aws_secret_access_key=aws_secret_key,
+                region_name=aws_region,
+            )
+            _s3_client = session.client("s3", config=build_s3_config())
+        return _s3_client
+
+
+def close_s3_client() -> None:
+    """Closes the pooled connections of the shared S3 client, if any."""
+    global _s3_client
+
+    with _s3_client_lock:
+        if _s3_client is not None:
+            _s3_client.close()
+            _s3_client = None
+
+
+# Dependencia
+def get_s3_client() -> BaseClient:
+    """Returns the shared S3 client, creating it if the app did not at startup."""
+    return _s3_client if _s3_client is not None else init_s3_client()
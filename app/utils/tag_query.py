@@ -0,0 +1,151 @@
+import re
+from typing import NamedTuple, Union
+
+# Límites de una expresión de búsqueda por etiquetas
+MAX_TAG_QUERY_LENGTH = 1000
+MAX_TAG_QUERY_TERMS = 32
+
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"((?:[^"\\]|\\.)*)"|([^\s()"]+))')
+_KEYWORDS = {"AND", "OR", "NOT"}
+_EXPECTED = {"TAG": "a tag", ")": "')'"}
+
+
+class TagQuerySyntaxError(ValueError):
+    """Raised when a tag expression cannot be parsed."""
+
+
+class TagTerm(NamedTuple):
+    name: str
+
+
+class TagNot(NamedTuple):
+    operand: "TagNode"
+
+
+class TagAnd(NamedTuple):
+    operands: tuple
+
+
+class TagOr(NamedTuple):
+    operands: tuple
+
+
+TagNode = Union[TagTerm, TagNot, TagAnd, TagOr]
+
+
+def _tokenize(expression: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _TOKEN_RE.match(expression, position)
+        if match is None:
+            raise TagQuerySyntaxError(f"Unexpected character at position {position}")
+        position = match.end()
+        open_paren, close_paren, quoted, word = match.groups()
+        if open_paren:
+            tokens.append(("(", open_paren))
+        elif close_paren:
+            tokens.append((")", close_paren))
+        elif quoted is not None:
+            tokens.append(("TAG", re.sub(r"\\(.)", r"\1", quoted)))
+        elif word.upper() in _KEYWORDS:
+            tokens.append((word.upper(), word))
+        else:
+            tokens.append(("TAG", word))
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser; NOT binds tighter than AND, and AND than OR."""
+
+    def __init__(self, tokens: list[tuple[str, str]]):
+        self.tokens = tokens
+        self.position = 0
+        self.terms = 0
+
+    def peek(self) -> str:
+        return self.tokens[self.position][0] if self.position < len(self.tokens) else "END"
+
+    def take(self, kind: str) -> str:
+        if self.peek() != kind:
+            found = (
+                "end of expression"
+                if self.peek() == "END"
+                else f"'{self.tokens[self.position][1]}'"
+            )
+            raise TagQuerySyntaxError(f"Expected {_EXPECTED.get(kind, kind)}, found {found}")
+        value = self.tokens[self.position][1]
+        self.position += 1
+        return value
+
+    def parse_or(self) -> TagNode:
+        operands = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take("OR")
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else TagOr(tuple(operands))
+
+    def parse_and(self) -> TagNode:
+        operands = [self.parse_not()]
+        # Dos términos seguidos sin operador se combinan con AND
+        while self.peek() in ("AND", "NOT", "TAG", "("):
+            if self.peek() == "AND":
+                self.take("AND")
+            operands.append(self.parse_not())
+        return operands[0] if len(operands) == 1 else TagAnd(tuple(operands))
+
+    def parse_not(self) -> TagNode:
+        if self.peek() == "NOT":
+            self.take("NOT")
+            return TagNot(self.parse_not())
+        if self.peek() == "(":
+            self.take("(")
+            node = self.parse_or()
+            self.take(")")
+            return node
+        name = self.take("TAG").strip()
+        if not name:
+            raise TagQuerySyntaxError("Tag names cannot be empty")
+        self.terms += 1
+        if self.terms > MAX_TAG_QUERY_TERMS:
+            raise TagQuerySyntaxError(f"At most {MAX_TAG_QUERY_TERMS} tags per expression")
+        return TagTerm(name)
+
+
+def parse_tag_query(expression: str) -> TagNode:
+    """Parses a boolean tag expression into a tree of TagTerm/TagNot/TagAnd/TagOr.
+
+    Tags are bare words or double-quoted strings (for names with spaces or
+    parentheses); AND, OR and NOT are case-insensitive and parentheses group.
+    Adjacent terms are joined with AND, so ``invoice 2024 NOT draft`` equals
+    ``invoice AND 2024 AND NOT draft``.
+
+    Args:
+        expression (str): The expression, e.g. ``invoice AND (2024 OR 2025) AND NOT draft``
+
+    Returns:
+        TagNode: The root of the expression tree
+
+    Raises:
+        TagQuerySyntaxError: If the expression is empty, too long or malformed.
+    """
+    if len(expression) > MAX_TAG_QUERY_LENGTH:
+        raise TagQuerySyntaxError(f"Expressions are limited to {MAX_TAG_QUERY_LENGTH} characters")
+    parser = _Parser(_tokenize(expression))
+    if parser.peek() == "END":
+        raise TagQuerySyntaxError("The expression is empty")
+    node = parser.parse_or()
+    if parser.peek() != "END":
+        raise TagQuerySyntaxError(f"Unexpected '{parser.tokens[parser.position][1]}'")
+    return node
+
+
+def format_tag_query(node: TagNode) -> str:
+    """Canonical text of an expression tree, used as cache key."""
+    if isinstance(node, TagTerm):
+        return '"' + node.name.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    if isinstance(node, TagNot):
+        return f"NOT {format_tag_query(node.operand)}"
+    joiner = " AND " if isinstance(node, TagAnd) else " OR "
+    return "(" + joiner.join(format_tag_query(operand) for operand in node.operands) + ")"
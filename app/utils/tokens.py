@@ -0,0 +1,97 @@
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import logging
+import secrets
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Clave HMAC para firmar los tokens; debe ser la misma en todos los workers
+auth_secret_key = os.getenv("AUTH_SECRET_KEY")
+if not auth_secret_key:
+    auth_secret_key = secrets.token_urlsafe(32)
+    logger.warning(
+        "AUTH_SECRET_KEY is not set; using a random key, tokens will not be valid "
+        "across workers or restarts"
+    )
+access_token_ttl = int(os.getenv("ACCESS_TOKEN_TTL", 3600))
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+class TokenError(Exception):
+    """Raised when an access token is malformed, forged or expired."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(signing_input: str) -> str:
+    digest = hmac.new(
+        auth_secret_key.encode("utf-8"), signing_input.encode("ascii"), hashlib.sha256
+    ).digest()
+    return _b64encode(digest)
+
+
+def create_access_token(claims: dict, ttl: int = access_token_ttl) -> str:
+    """Issues a signed access token (a compact HS256 JWT).
+
+    Args:
+        claims (dict): Claims to embed, e.g. ``{"sub": "1", "username": ..., "role_id": ...}``.
+        ttl (int): Validity in seconds.
+
+    Returns:
+        str: The token.
+    """
+    now = int(time.time())
+    payload = {**claims, "iat": now, "exp": now + ttl}
+    signing_input = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode("utf-8"))
+        for part in (_HEADER, payload)
+    )
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+def decode_access_token(token: str) -> dict:
+    """Verifies a token issued by ``create_access_token`` and returns its claims.
+
+    Only the HMAC signature and the expiry are checked, so no database access
+    is needed.
+
+    Args:
+        token (str): The token.
+
+    Returns:
+        dict: The claims.
+
+    Raises:
+        TokenError: If the token is malformed, its signature is wrong or it expired.
+    """
+    try:
+        header_b64, payload_b64, signature = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+    except Exception:
+        raise TokenError("Malformed token")
+
+    if header.get("alg") != _HEADER["alg"]:
+        raise TokenError("Unsupported token algorithm")
+    if not hmac.compare_digest(signature, _sign(f"{header_b64}.{payload_b64}")):
+        raise TokenError("Invalid token signature")
+
+    try:
+        claims = json.loads(_b64decode(payload_b64))
+    except Exception:
+        raise TokenError("Malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise TokenError("Token expired")
+    return claims
@@ -0,0 +1,65 @@
+import hashlib
+from typing import AsyncIterator
+
+
+class UploadDigest:
+    """Computes size, SHA-256 and the S3 ETag of a file while it streams through.
+
+    S3 reports the plain MD5 of the object as ETag for single ``put_object``
+    uploads, and ``md5(md5(part_1) + ... + md5(part_n))-n`` for multipart
+    uploads. ``part_size`` must be the same one used to split the upload so
+    both values line up.
+    """
+
+    def __init__(self, part_size: int):
+        self.part_size = part_size
+        self.size_bytes = 0
+        self._sha256 = hashlib.sha256()
+        self._part_md5 = hashlib.md5()
+        self._part_len = 0
+        self._part_digests: list[bytes] = []
+
+    def update(self, chunk: bytes) -> None:
+        """Feeds the next chunk of the file."""
+        self.size_bytes += len(chunk)
+        self._sha256.update(chunk)
+
+        view = memoryview(chunk)
+        while view:
+            take = min(len(view), self.part_size - self._part_len)
+            self._part_md5.update(view[:take])
+            self._part_len += take
+            view = view[take:]
+            if self._part_len == self.part_size:
+                self._part_digests.append(self._part_md5.digest())
+                self._part_md5 = hashlib.md5()
+                self._part_len = 0
+
+    async def wrap(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Yields ``chunks`` unchanged, feeding each one to the digest."""
+        async for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+    @property
+    def etag(self) -> str:
+        if not self._part_digests:
+            return self._part_md5.hexdigest()
+
+        digests = list(self._part_digests)
+        if self._part_len:
+            digests.append(self._part_md5.digest())
+        return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+    def as_metadata(self) -> dict:
+        """Returns the values in the shape stored in ``File.file_metadata``."""
+        return {
+            "size": f"{self.size_bytes / 1024:.2f}kb",
+            "size_bytes": self.size_bytes,
+            "sha256": self.sha256,
+            "etag": self.etag,
+        }
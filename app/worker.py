@@ -0,0 +1,288 @@
+"""Runs the background jobs queued in the ``jobs`` table (metadata extraction and
+promotion of presigned uploads to their blobs).
+
+The API starts a worker inside each process unless ``JOBS_IN_PROCESS`` is
+false; this script runs one as a separate process instead, so that the
+extraction does not compete with the requests for CPU. Any number of
+workers, in-process or not, can share the queue.
+
+Usage:
+    docker compose exec app python worker.py
+    docker compose exec app python worker.py --backfill   # queue files without metadata first
+"""
+
+import os
+import socket
+import asyncio
+import argparse
+import logging
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session, sessionmaker
+
+from database import SessionLocal
+from services import jobs_services
+from services.jobs_services import PermanentJobError
+from services.files_services import UPLOAD_JOB_HANDLERS
+from services.metadata_services import METADATA_JOB_HANDLERS, enqueue_missing_metadata_jobs
+from storage import init_storage
+
+load_dotenv()
+
+# Trabajos simultáneos por worker (cada uno ocupa un hilo propio) y segundos entre
+# consultas a la cola cuando no hay avisos de trabajos nuevos
+job_concurrency = int(os.getenv("JOB_CONCURRENCY", 2))
+job_poll_interval = float(os.getenv("JOB_POLL_INTERVAL", 5))
+# Segundos entre limpiezas de trabajos terminados y liberaciones de trabajos abandonados
+job_maintenance_interval = float(os.getenv("JOB_MAINTENANCE_INTERVAL", 60))
+
+logger = logging.getLogger("jobs")
+
+JobHandler = Callable[[Session, dict], None]
+
+
+class JobWorker:
+    """Claims jobs from the queue and runs their handlers, at most ``concurrency`` at once.
+
+    Handlers run in a thread pool of their own, so a backlog of jobs never
+    takes the threads that serve requests (``run_blocking``). The worker
+    polls the queue every ``poll_interval`` seconds and is woken earlier by
+    ``notify`` when this process enqueues jobs. Failed jobs are retried with
+    backoff by the queue (see ``jobs_services.fail_job``).
+    """
+
+    def __init__(
+        self,
+        handlers: dict[str, JobHandler],
+        concurrency: int = job_concurrency,
+        poll_interval: float = job_poll_interval,
+        session_factory: sessionmaker = SessionLocal,
+    ):
+        self.handlers = handlers
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: set[asyncio.Task] = set()
+        self._stopping = False
+        self._last_maintenance = 0.0
+
+        self._stats_lock = threading.Lock()
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self._total_duration = 0.0
+        self._finished = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        """Starts the worker in the running event loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        # Un hilo más para reclamar trabajos mientras se ejecutan otros
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency + 1, thread_name_prefix="jobs"
+        )
+        jobs_services.add_enqueue_listener(self.notify)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops claiming jobs and waits for the running ones to finish."""
+        if self._task is None:
+            return
+        jobs_services.remove_enqueue_listener(self.notify)
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        self._executor.shutdown(wait=True)
+        self._task = None
+
+    def notify(self, job_type: Optional[str] = None) -> None:
+        """Wakes the worker to claim new jobs; safe to call from any thread."""
+        if self._loop is None or (job_type is not None and job_type not in self.handlers):
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # El bucle ya se cerró
+            pass
+
+    def stats(self) -> dict:
+        """Counters of this worker since it started."""
+        with self._stats_lock:
+            return {
+                "worker_id": self.worker_id,
+                "running": self._task is not None and not self._stopping,
+                "job_types": sorted(self.handlers),
+                "concurrency": self.concurrency,
+                "in_flight": len(self._running),
+                "claimed": self.claimed,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+                "avg_duration_ms": (
+                    round(self._total_duration / self._finished * 1000, 2)
+                    if self._finished else None
+                ),
+                "last_error": self.last_error,
+            }
+
+    async def _call(self, func: Callable, *args):
+        return await self._loop.run_in_executor(self._executor, func, *args)
+
+    def _with_session(self, func: Callable, *args):
+        db = self.session_factory()
+        try:
+            return func(db, *args)
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                await self._maintenance()
+                free = self.concurrency - len(self._running)
+                if free > 0:
+                    jobs = await self._call(
+                        self._with_session, jobs_services.claim_jobs,
+                        self.worker_id, list(self.handlers), free,
+                    )
+                    for job in jobs:
+                        task = asyncio.create_task(self._execute(*job))
+                        self._running.add(task)
+                        task.add_done_callback(self._running.discard)
+                    with self._stats_lock:
+                        self.claimed += len(jobs)
+            except Exception as e:
+                logger.exception("Error claiming jobs")
+                self.last_error = f"Error claiming jobs. {str(e)}"
+            # Despierta al recibir un aviso, al terminar un trabajo o tras poll_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _maintenance(self) -> None:
+        now = time.monotonic()
+        if now - self._last_maintenance < job_maintenance_interval:
+            return
+        self._last_maintenance = now
+        await self._call(self._with_session, jobs_services.release_stale_jobs)
+        await self._call(self._with_session, jobs_services.delete_finished_jobs)
+
+    async def _execute(self, job_id: int, job_type: str, payload: dict, attempts: int) -> None:
+        started = time.monotonic()
+        try:
+            await self._call(self._with_session, self.handlers[job_type], payload)
+            await self._call(self._with_session, jobs_services.complete_job, job_id)
+            outcome = "succeeded"
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            logger.warning("Job %s (%s) attempt %s failed: %s", job_id, job_type, attempts, error)
+            try:
+                retried = await self._call(
+                    self._with_session, jobs_services.fail_job,
+                    job_id, error, isinstance(e, PermanentJobError),
+                )
+            except Exception:
+                # El bloqueo caduca y release_stale_jobs lo devuelve a la cola
+                logger.exception("Error recording the failure of job %s", job_id)
+                retried = True
+            outcome = "retried" if retried else "failed"
+            self.last_error = error
+        with self._stats_lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            self._total_duration += time.monotonic() - started
+            self._finished += 1
+        if not self._stopping:
+            self._wakeup.set()
+
+
+# Worker de este proceso (API), si JOBS_IN_PROCESS está activo
+_worker: Optional[JobWorker] = None
+
+
+def build_worker() -> JobWorker:
+    """Creates a worker with the handlers of every job type of the app."""
+    return JobWorker({**METADATA_JOB_HANDLERS, **UPLOAD_JOB_HANDLERS})
+
+
+async def start_in_process_worker() -> Optional[JobWorker]:
+    """Starts the worker of the API process (lifespan), unless JOBS_IN_PROCESS is false."""
+    global _worker
+    if os.getenv("JOBS_IN_PROCESS", "true").lower() != "true":
+        return None
+    if _worker is None:
+        _worker = build_worker()
+        _worker.start()
+    return _worker
+
+
+async def stop_in_process_worker() -> None:
+    """Stops the worker of the API process, waiting for its running jobs."""
+    global _worker
+    if _worker is not None:
+        await _worker.stop()
+        _worker = None
+
+
+def get_in_process_worker() -> Optional[JobWorker]:
+    """Returns the worker of this process, or None if it does not run one."""
+    return _worker
+
+
+async def run_worker() -> None:
+    """Runs a worker until SIGINT or SIGTERM."""
+    init_storage()
+    worker = build_worker()
+    worker.start()
+    logger.info("Worker %s running %s", worker.worker_id, ", ".join(sorted(worker.handlers)))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("Stopping, waiting for %s running job(s)", worker.stats()["in_flight"])
+    await worker.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the background jobs queue.")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="queue the metadata extraction of every file that never had it",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.backfill:
+        db = SessionLocal()
+        try:
+            logger.info("Queued %s metadata job(s)", enqueue_missing_metadata_jobs(db))
+        finally:
+            db.close()
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()
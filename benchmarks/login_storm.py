@@ -0,0 +1,110 @@
+"""Login throughput and latency of unrelated endpoints during a login storm.
+
+Runs against a live API (``docker compose up``) and needs only the standard
+library. It first measures ``GET /`` and ``GET /users/get-user-id/<id>`` alone,
+then again while ``--logins`` clients call ``POST /users/login`` back to back,
+and prints p50/p95/p99/max for every phase plus the login rate and how many
+logins were rejected with 503. With bcrypt running in the request threads the
+probes queue behind the hashes; with the bounded hashing pool they stay close
+to the baseline and the excess logins fail fast instead.
+
+Usage:
+    python benchmarks/login_storm.py --base-url http://localhost:8000 \\
+        --username admin --password admin --logins 64 --duration 20
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from collections import Counter
+from upload_concurrency import connect, summarize
+
+
+def probe_latency(base_url: str, path: str, stop: threading.Event, samples: list[float]) -> None:
+    """Issues back-to-back ``GET path`` on a keep-alive connection until stopped."""
+    conn = connect(base_url)
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.request("GET", path)
+        conn.getresponse().read()
+        samples.append(time.perf_counter() - started)
+    conn.close()
+
+
+def login_loop(
+    base_url: str,
+    body: bytes,
+    stop: threading.Event,
+    durations: list[float],
+    statuses: Counter,
+) -> None:
+    """Logs in over and over on a keep-alive connection until stopped."""
+    conn = connect(base_url)
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.request("POST", "/users/login", body=body, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        statuses[response.status] += 1
+        if response.status == 200:
+            durations.append(time.perf_counter() - started)
+        elif response.status == 503:
+            # Rechazo rápido: esperar lo que indica Retry-After antes de reintentar
+            stop.wait(float(response.getheader("Retry-After", "1")))
+    conn.close()
+
+
+def run_phase(args: argparse.Namespace, logins: int) -> dict:
+    stop = threading.Event()
+    probes = {"/": [], f"/users/get-user-id/{args.user_id}": []}
+    login_times: list[float] = []
+    statuses: Counter = Counter()
+    body = json.dumps({"username": args.username, "password": args.password}).encode()
+
+    threads = [
+        threading.Thread(target=probe_latency, args=(args.base_url, path, stop, samples))
+        for path, samples in probes.items()
+    ]
+    threads += [
+        threading.Thread(target=login_loop, args=(args.base_url, body, stop, login_times, statuses))
+        for _ in range(logins)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {"probes": probes, "login_times": login_times, "statuses": statuses}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--user-id", type=int, default=1, help="user fetched by the probe")
+    parser.add_argument("--logins", type=int, default=64, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = parser.parse_args()
+
+    idle = run_phase(args, 0)
+    storm = run_phase(args, args.logins)
+
+    for path, samples in idle["probes"].items():
+        summarize(f"GET {path} idle", samples)
+    for path, samples in storm["probes"].items():
+        summarize(f"GET {path} storm", samples)
+    summarize("login (200)", storm["login_times"])
+
+    statuses = storm["statuses"]
+    print(
+        f"logins/s={statuses[200] / args.duration:.1f} "
+        f"rejected(503)={statuses[503]} other={sum(statuses.values()) - statuses[200] - statuses[503]}"
+    )
+
+
+if __name__ == "__main__":
+    main()
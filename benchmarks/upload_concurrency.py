@@ -0,0 +1,150 @@
+"""Latency of small GETs while large uploads are in flight.
+
+Runs against a live API (``docker compose up``) and needs only the standard
+library. It first measures ``GET /`` alone, then again while ``--uploads``
+clients stream ``--size-mb`` files to ``/files/upload-register-file-stream``,
+and prints p50/p95/p99/max for both phases. With blocking S3 calls on the event
+loop the second phase degrades to the duration of an upload part; with the
+offloaded storage layer it stays close to the baseline.
+
+Uploads need an access token from ``POST /users/login`` (``--token`` or the
+``API_TOKEN`` environment variable).
+
+Usage:
+    python benchmarks/upload_concurrency.py --base-url http://localhost:8000 \\
+        --token <access_token> --uploads 4 --size-mb 64 --duration 20
+"""
+
+import os
+import time
+import uuid
+import argparse
+import threading
+import statistics
+import http.client
+import urllib.parse
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label: str, samples: list[float]) -> None:
+    if not samples:
+        print(f"{label:<22} no samples")
+        return
+    ms = [s * 1000 for s in samples]
+    print(
+        f"{label:<22} n={len(ms):<6} p50={statistics.median(ms):7.1f}ms "
+        f"p95={percentile(ms, 95):7.1f}ms p99={percentile(ms, 99):7.1f}ms "
+        f"max={max(ms):7.1f}ms"
+    )
+
+
+def connect(base_url: str) -> http.client.HTTPConnection:
+    url = urllib.parse.urlsplit(base_url)
+    cls = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+    return cls(url.hostname, url.port, timeout=300)
+
+
+def probe_latency(base_url: str, stop: threading.Event, samples: list[float]) -> None:
+    """Issues back-to-back ``GET /`` on a keep-alive connection until stopped."""
+    conn = connect(base_url)
+    while not stop.is_set():
+        started = time.perf_counter()
+        conn.request("GET", "/")
+        conn.getresponse().read()
+        samples.append(time.perf_counter() - started)
+    conn.close()
+
+
+def multipart_body(boundary: str, filename: str, size: int, chunk: int = 1024 * 1024):
+    """Yields a multipart/form-data body without materialising the file."""
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="folder_id"\r\n\r\n1\r\n'
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="uploaded_file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    block = os.urandom(chunk)
+    sent = 0
+    while sent < size:
+        piece = block[: min(chunk, size - sent)]
+        sent += len(piece)
+        yield piece
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def upload_loop(
+    base_url: str, token: str, size: int, stop: threading.Event, durations: list[float]
+) -> None:
+    """Uploads large files one after another until stopped."""
+    while not stop.is_set():
+        boundary = uuid.uuid4().hex
+        conn = connect(base_url)
+        started = time.perf_counter()
+        conn.request(
+            "POST",
+            "/files/upload-register-file-stream",
+            body=multipart_body(boundary, f"bench-{boundary}.bin", size),
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Authorization": f"Bearer {token}",
+            },
+            encode_chunked=True,
+        )
+        response = conn.getresponse()
+        response.read()
+        conn.close()
+        if response.status >= 400:
+            print(f"upload failed: HTTP {response.status}")
+            return
+        durations.append(time.perf_counter() - started)
+
+
+def run_phase(
+    base_url: str, token: str, duration: float, uploads: int, size: int
+) -> tuple[list, list]:
+    stop = threading.Event()
+    latencies: list[float] = []
+    upload_times: list[float] = []
+    threads = [threading.Thread(target=probe_latency, args=(base_url, stop, latencies))]
+    threads += [
+        threading.Thread(target=upload_loop, args=(base_url, token, size, stop, upload_times))
+        for _ in range(uploads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, upload_times
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=os.getenv("API_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--token", default=os.getenv("API_TOKEN"), help="bearer access token")
+    parser.add_argument("--uploads", type=int, default=4, help="concurrent upload clients")
+    parser.add_argument("--size-mb", type=int, default=64, help="size of each uploaded file")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("an access token is required (--token or API_TOKEN)")
+
+    idle, _ = run_phase(args.base_url, args.token, args.duration, 0, 0)
+    busy, upload_times = run_phase(
+        args.base_url, args.token, args.duration, args.uploads, args.size_mb * 1024 * 1024
+    )
+
+    summarize("GET / idle", idle)
+    summarize(f"GET / + {args.uploads} uploads", busy)
+    summarize("upload duration", upload_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,30 +19,73 @@ CREATE TABLE IF NOT EXISTS users (
 
 CREATE TABLE IF NOT EXISTS tags (
   tag_id SERIAL PRIMARY KEY,
-  tag_name VARCHAR(255),
+  tag_name VARCHAR(255) NOT NULL,
   tag_description TEXT
 );
 
+CREATE UNIQUE INDEX IF NOT EXISTS ux_tags_tag_name ON tags (tag_name);
+
 CREATE TABLE IF NOT EXISTS folders (
   folder_id SERIAL PRIMARY KEY,
-  folder_name VARCHAR(255),
+  folder_name VARCHAR(255) NOT NULL,
   parent_folder_id INT,
+  -- Ids de los ancestros ("/1/5/"); COLLATE "C" para los rangos de prefijo del subárbol
+  path TEXT COLLATE "C" NOT NULL DEFAULT '/',
+  depth INT NOT NULL DEFAULT 0,
+  created_at TIMESTAMP DEFAULT current_timestamp,
+  updated_at TIMESTAMP DEFAULT current_timestamp,
   FOREIGN KEY (parent_folder_id) REFERENCES folders(folder_id)
 );
 
+CREATE INDEX IF NOT EXISTS ix_folders_path ON folders (path);
+CREATE INDEX IF NOT EXISTS ix_folders_parent_folder_id_folder_name ON folders (parent_folder_id, folder_name, folder_id);
+
+-- Contenido deduplicado: una copia en storage (clave blobs/<sha256>) por SHA-256,
+-- con el número de archivos que la usan
+CREATE TABLE IF NOT EXISTS blobs (
+  sha256 VARCHAR(64) PRIMARY KEY,
+  size_bytes BIGINT NOT NULL,
+  ref_count INT NOT NULL DEFAULT 0,
+  created_at TIMESTAMP DEFAULT current_timestamp
+);
+
 CREATE TABLE IF NOT EXISTS files (
   file_id SERIAL PRIMARY KEY,
-  file_name VARCHAR(255),
+  file_name VARCHAR(255) NOT NULL DEFAULT '',
   file_metadata JSONB,
-  file_type VARCHAR(255),
+  size_bytes BIGINT NOT NULL DEFAULT 0,
+  file_type VARCHAR(255) NOT NULL DEFAULT '',
   s3_url VARCHAR(255),
   folder_id INT,
   owner_id INT,
   uploaded_at TIMESTAMP DEFAULT current_timestamp,
+  blob_sha256 VARCHAR(64),
+  staging_key VARCHAR(255),
   FOREIGN KEY (folder_id) REFERENCES folders(folder_id),
-  FOREIGN KEY (owner_id) REFERENCES users(user_id)
+  FOREIGN KEY (owner_id) REFERENCES users(user_id),
+  FOREIGN KEY (blob_sha256) REFERENCES blobs(sha256)
 );
 
+-- Índices para la paginación por cursor (sort, file_id); los compuestos que
+-- empiezan por owner_id y file_name cubren también esas búsquedas
+CREATE INDEX IF NOT EXISTS ix_files_uploaded_at_file_id ON files (uploaded_at, file_id);
+CREATE INDEX IF NOT EXISTS ix_files_file_name_file_id ON files (file_name, file_id);
+CREATE INDEX IF NOT EXISTS ix_files_file_type_file_id ON files (file_type, file_id);
+CREATE INDEX IF NOT EXISTS ix_files_size_bytes_file_id ON files (size_bytes, file_id);
+CREATE INDEX IF NOT EXISTS ix_files_owner_id_uploaded_at_file_id ON files (owner_id, uploaded_at, file_id);
+CREATE INDEX IF NOT EXISTS ix_files_folder_id ON files (folder_id);
+-- Para la FK al borrar un blob
+CREATE INDEX IF NOT EXISTS ix_files_blob_sha256 ON files (blob_sha256) WHERE blob_sha256 IS NOT NULL;
+
+-- Búsqueda por nombre: trigramas para "contiene" y coincidencias aproximadas,
+-- text_pattern_ops para los prefijos (LIKE 'abc%')
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX IF NOT EXISTS ix_files_file_name_trgm ON files USING gin (lower(file_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_files_file_name_lower_pattern ON files (lower(file_name) text_pattern_ops);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_users_username ON users (username);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_roles_role_name ON roles (role_name);
+
 CREATE TABLE IF NOT EXISTS file_tag (
   file_id INT,
   tag_id INT,
@@ -77,6 +120,33 @@ CREATE TABLE IF NOT EXISTS file_role (
   FOREIGN KEY (role_id) REFERENCES roles(role_id)
 );
 
+-- Índices invertidos etiqueta -> archivos / carpetas (búsqueda por etiquetas)
+CREATE INDEX IF NOT EXISTS ix_file_tag_tag_id_file_id ON file_tag (tag_id, file_id);
+CREATE INDEX IF NOT EXISTS ix_folder_tag_tag_id_folder_id ON folder_tag (tag_id, folder_id);
+
+-- Reglas de un rol (resolución de permisos)
+CREATE INDEX IF NOT EXISTS ix_folder_role_role_id ON folder_role (role_id);
+CREATE INDEX IF NOT EXISTS ix_file_role_role_id ON file_role (role_id);
+
+-- Trabajos en segundo plano (extracción de metadatos tras la subida)
+CREATE TABLE IF NOT EXISTS jobs (
+  job_id SERIAL PRIMARY KEY,
+  job_type VARCHAR(255) NOT NULL,
+  payload JSONB NOT NULL DEFAULT '{}',
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  max_attempts INT NOT NULL DEFAULT 5,
+  run_after TIMESTAMP NOT NULL,
+  locked_by VARCHAR(255),
+  locked_at TIMESTAMP,
+  last_error TEXT,
+  created_at TIMESTAMP NOT NULL,
+  finished_at TIMESTAMP
+);
+
+-- Cola: siguientes trabajos listos para ejecutar
+CREATE INDEX IF NOT EXISTS ix_jobs_status_run_after ON jobs (status, run_after, job_id);
+
 -- Inserción de data básica
 INSERT INTO roles (role_name, role_description, can_create_files, can_create_folders)
 VALUES
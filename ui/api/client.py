@@ -0,0 +1,79 @@
+import os
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Timeouts (segundos) y reintentos de las llamadas a la API
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 3))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 15))
+API_UPLOAD_TIMEOUT = float(os.getenv("API_UPLOAD_TIMEOUT", 600))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", 3))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 20))
+
+# TTL de la caché de lecturas entre reruns de Streamlit
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", 30))
+
+
+def build_session() -> requests.Session:
+    """ This function builds the HTTP session shared by every API call.
+    Connections are kept alive and pooled, and idempotent requests are
+    retried with backoff on connection errors and 502/503/504 responses.
+    """
+    retry = Retry(
+        total=API_MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Una sola sesión por proceso: Streamlit reimporta los scripts de las vistas,
+# pero los módulos importados (y su pool de conexiones) se mantienen
+session = build_session()
+
+
+def auth_headers(kwargs: dict) -> dict:
+    """ Adds the access token of the logged-in user, if any, to the request headers.
+    The session is shared by every user of the process, so the token goes
+    per request and never on the session itself.
+    """
+    token = st.session_state.get("access_token")
+    if token:
+        kwargs["headers"] = {"Authorization": f"Bearer {token}", **kwargs.get("headers", {})}
+    return kwargs
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    return session.get(url, **auth_headers(kwargs))
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    return session.post(url, **auth_headers(kwargs))
+
+
+def upload(url: str, **kwargs) -> requests.Response:
+    """ POST with the longer read timeout used for file uploads. """
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_UPLOAD_TIMEOUT))
+    return session.post(url, **auth_headers(kwargs))
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    """ PUT with the upload timeout, used for presigned uploads straight to S3. """
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_UPLOAD_TIMEOUT))
+    return session.put(url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("timeout", (API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    return session.delete(url, **auth_headers(kwargs))
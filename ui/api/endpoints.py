@@ -3,9 +3,12 @@ import os
 BASE_URL = os.getenv("API_BASE_URL")
 
 USER_ENDPOINTS = {
+    "login": f"{BASE_URL}/users/login",
     "get_users": f"{BASE_URL}/users/get-users",
     "get_user_by_id": lambda user_id: f"{BASE_URL}/users/get-user-id/{user_id}",
     "get_user_by_username": lambda username: f"{BASE_URL}/users/get-user-username/{username}",
+    "get_users_by_ids": f"{BASE_URL}/users/get-users-by-ids",
+    "get_users_by_usernames": f"{BASE_URL}/users/get-users-by-usernames",
     "get_user_by_password": lambda password: f"{BASE_URL}/users/get-user-password/{password}",
     "get_user_by_password_username": lambda username, password: f"{BASE_URL}/users/get-user-password-username/{username}/{password}",
     "delete_user": lambda user_id: f"{BASE_URL}/users/delete-user/{user_id}",
@@ -15,9 +18,18 @@ USER_ENDPOINTS = {
 
 FILES_ENDPOINTS = {
     "get_files": f"{BASE_URL}/files/get-files",
-    "get_files_by_filter": lambda select_filter, select_order: f"{BASE_URL}/files/get-files-filter/{select_filter}/{select_order}",
+    "get_files_with_owner": f"{BASE_URL}/files/get-files-with-owner/",
+    "get_files_by_filter": lambda select_filter, select_order: f"{BASE_URL}/files/get-files-by-filter/{select_filter}/{select_order}",
     "get_file_by_id": lambda file_id: f"{BASE_URL}/files/get-file-id/{file_id}",
     "get_file_by_name": lambda file_name: f"{BASE_URL}/files/get-file-name/{file_name}",
+    "get_file_content": lambda file_id: f"{BASE_URL}/files/{file_id}/content",
     "get_file_by_user_id": lambda user_id: f"{BASE_URL}/files/get-file-user-id/{user_id}",
     "upload_register_file": f"{BASE_URL}/files/upload-register-file/",
+    "upload_register_file_stream": f"{BASE_URL}/files/upload-register-file-stream",
+    "upload_register_files": f"{BASE_URL}/files/upload-register-files",
+    "presign_upload": f"{BASE_URL}/files/presign-upload",
+    "presign_multipart_upload": f"{BASE_URL}/files/presign-multipart-upload",
+    "complete_multipart_upload": f"{BASE_URL}/files/complete-multipart-upload",
+    "abort_multipart_upload": f"{BASE_URL}/files/abort-multipart-upload",
+    "finalize_upload": f"{BASE_URL}/files/finalize-upload",
 }
@@ -1,6 +1,6 @@
 import streamlit as st
 from tools.session_managment import close_session
-from tools.file_managment import upload_file
+from tools.file_managment import upload_file, upload_files
 from time import sleep
 
 def show_sidebar():
@@ -17,20 +17,29 @@ def show_sidebar():
         if st.session_state.show_upload_modal:
             with st.container():
                 st.markdown("---")
-                uploaded_file = st.file_uploader("Selecciona un archivo")
+                uploaded_files = st.file_uploader("Selecciona archivos", accept_multiple_files=True)
 
                 col1, col2 = st.columns(2)
 
                 with col1:
                     if st.button("✅"):
-                        if uploaded_file:
-                            # Aquí podrías guardar el archivo o hacer otra acción
-                            is_upload = upload_file(uploaded_file, user_id=st.session_state.user_data["user_id"])
+                        if len(uploaded_files) == 1:
+                            is_upload = upload_file(uploaded_files[0])
                             if is_upload == 1:
                                 st.error("Error al subir el archivo.")
                             else:
                                 st.success("Subido")
                                 st.session_state.show_upload_modal = False
+                        elif uploaded_files:
+                            # Varios archivos: una sola petición en lote
+                            failed = upload_files(uploaded_files)
+                            if failed == -1:
+                                st.error("Error al subir los archivos.")
+                            elif failed > 0:
+                                st.warning(f"{failed} de {len(uploaded_files)} archivos no se pudieron subir.")
+                            else:
+                                st.success(f"{len(uploaded_files)} archivos subidos")
+                                st.session_state.show_upload_modal = False
                         else:
                             st.warning("Primero selecciona un archivo.")
 
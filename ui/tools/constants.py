@@ -1,2 +1,10 @@
 DEFAULT_ROLE = 2
-ADMIN_ROLE = 1
\ No newline at end of file
+ADMIN_ROLE = 1
+
+# Criterios del selector de la UI -> columna de ordenamiento de la API
+FILTER_SORT_KEYS = {
+    "Nombre": "file_name",
+    "Fecha": "uploaded_at",
+    "Tipo": "file_type",
+    "Tamaño": "size_bytes",
+}
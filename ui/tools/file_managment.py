@@ -1,57 +1,246 @@
-
 from api.endpoints import FILES_ENDPOINTS, USER_ENDPOINTS
+from api import client
+from tools.constants import FILTER_SORT_KEYS
+import hashlib
+import tempfile
 import requests
+import streamlit as st
 
-def get_all_files():
-    """ This function retrieves all files from the API.
-    It sends a GET request to the API endpoint and returns the response.
+PAGE_SIZE = 50
+# A partir de este tamaño la subida directa a S3 se hace por partes
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+# Tamaño de los trozos al calcular el hash y al descargar
+CHUNK_SIZE = 1024 * 1024
+
+
+# Las lecturas se cachean entre reruns (clave = argumentos); los errores se
+# lanzan dentro de la función cacheada para no guardarlos en la caché.
+# El listado depende de los permisos de quien lo pide: el token forma parte de la clave
+@st.cache_data(ttl=client.API_CACHE_TTL, show_spinner=False)
+def _fetch_files_page(cursor, sort_by, order, token):
+    response = client.get(
+        FILES_ENDPOINTS["get_files_with_owner"],
+        params={"limit": PAGE_SIZE, "cursor": cursor, "sort_by": sort_by, "order": order},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=client.API_CACHE_TTL, show_spinner=False)
+def _fetch_user_by_id(user_id):
+    response = client.get(USER_ENDPOINTS["get_user_by_id"](user_id))
+    response.raise_for_status()
+    return response.json()
+
+
+@st.cache_data(ttl=client.API_CACHE_TTL, show_spinner=False)
+def _fetch_users_by_ids(user_ids):
+    response = client.post(USER_ENDPOINTS["get_users_by_ids"], json={"user_ids": list(user_ids)})
+    response.raise_for_status()
+    return {int(user_id): user for user_id, user in response.json()["users"].items()}
+
+
+def clear_files_cache():
+    """ This function drops the cached file listings, e.g. after an upload. """
+    _fetch_files_page.clear()
+
+
+def get_all_files(cursor=None):
+    """ This function retrieves one page of files from the API.
+    It sends a GET request to the API endpoint and returns the page
+    ({"items": [...], "next_cursor": ...}). Each file already includes
+    its owner's username and full name and its folder name.
     """
     try:
-        response = requests.get(FILES_ENDPOINTS["get_files"])
-        response.raise_for_status()
-        return response.json()
+        return _fetch_files_page(cursor, "uploaded_at", "desc", st.session_state.get("access_token"))
     except requests.exceptions.RequestException as e:
         print(f"Error fetching files: {e}")
         return None
-    
+
 def get_user_by_id(user_id):
     """ This function retrieves a user by their ID from the API.
     It sends a GET request to the API endpoint and returns the response.
     """
     try:
-        response = requests.get(USER_ENDPOINTS["get_user_by_id"](user_id))
-        response.raise_for_status()
-        return response.json()
+        return _fetch_user_by_id(user_id)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching user by ID: {e}")
         return None
-    
-def get_files_by_filter(filter, order):
-    """ This function retrieves files by filter and order from the API.
-    It sends a GET request to the API endpoint and returns the response.
+
+def get_users_by_ids(user_ids):
+    """ This function retrieves many users by their IDs with a single request.
+    It returns a dict {user_id: user}, empty if the request fails.
     """
     try:
-        response = requests.get(FILES_ENDPOINTS["get_files_by_filter"], params={"select_filter": filter, "select_order": order})
-        response.raise_for_status()
-        return response.json()
+        return _fetch_users_by_ids(tuple(sorted(set(user_ids))))
+    except requests.exceptions.RequestException as e:
+        print(f"Error fetching users by ID: {e}")
+        return {}
+
+def get_files_by_filter(filter, order, cursor=None):
+    """ This function retrieves one page of files by filter and order from the API.
+    It sends a GET request to the API endpoint and returns the page
+    ({"items": [...], "next_cursor": ...}), with the owner data of each file.
+    """
+    if filter not in FILTER_SORT_KEYS:
+        return None
+    try:
+        return _fetch_files_page(
+            cursor,
+            FILTER_SORT_KEYS[filter],
+            "asc" if order == "Ascendente" else "desc",
+            st.session_state.get("access_token"),
+        )
+    except requests.exceptions.RequestException as e:
+        return None
+
+def download_file(file_id):
+    """ This function downloads the content of a file from the API into a
+    temporary file, one chunk at a time, so it is never held whole in memory.
+    Returns the open file (deleted when closed, the caller closes it), or
+    None if the download fails.
+    """
+    content = tempfile.TemporaryFile()
+    try:
+        with client.get(FILES_ENDPOINTS["get_file_content"](file_id), stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                content.write(chunk)
+        content.seek(0)
+        return content
     except requests.exceptions.RequestException as e:
+        content.close()
+        print(f"Error downloading file: {e}")
         return None
-    
-def upload_file(file, user_id):
+
+
+def _sha256(file):
+    """ SHA-256 of an uploaded file, read in chunks instead of copied whole. """
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _put_object(file, file_name, sha256):
+    """ Uploads the file straight to S3 with one presigned PUT, unless its
+    content is already stored. Returns the token to finalize the upload.
+    """
+    response = client.post(
+        FILES_ENDPOINTS["presign_upload"],
+        json={"file_name": file_name, "size_bytes": file.size, "sha256": sha256},
+    )
+    response.raise_for_status()
+    upload = response.json()
+    if not upload["content_stored"]:
+        file.seek(0)
+        client.put(upload["url"], data=file).raise_for_status()
+    return upload["upload_token"]
+
+
+def _put_object_multipart(file, file_name, sha256):
+    """ Uploads the file straight to S3 in parts, with one presigned URL per part,
+    unless its content is already stored. Returns the token to finalize the upload.
+    """
+    response = client.post(
+        FILES_ENDPOINTS["presign_multipart_upload"],
+        json={"file_name": file_name, "size_bytes": file.size, "sha256": sha256},
+    )
+    response.raise_for_status()
+    upload = response.json()
+    if upload["content_stored"]:
+        return upload["upload_token"]
+
+    try:
+        parts = []
+        for part in upload["parts"]:
+            file.seek((part["part_number"] - 1) * upload["part_size"])
+            response = client.put(part["url"], data=file.read(upload["part_size"]))
+            response.raise_for_status()
+            parts.append({"part_number": part["part_number"], "etag": response.headers["ETag"]})
+
+        client.post(
+            FILES_ENDPOINTS["complete_multipart_upload"],
+            json={
+                "key": upload["key"],
+                "upload_id": upload["upload_id"],
+                "upload_token": upload["upload_token"],
+                "parts": parts,
+            },
+        ).raise_for_status()
+    except requests.exceptions.RequestException:
+        client.post(
+            FILES_ENDPOINTS["abort_multipart_upload"],
+            json={
+                "key": upload["key"],
+                "upload_id": upload["upload_id"],
+                "upload_token": upload["upload_token"],
+            },
+        )
+        raise
+    return upload["upload_token"]
+
+
+def upload_file(file):
     """
     This function uploads a file to the API.
-    It sends a POST request to the API endpoint with the file data and metadata.
+    The bytes go straight to S3 through presigned URLs and the API only
+    registers the file afterwards (a content already stored, identified by
+    its SHA-256, is not uploaded again); if the storage backend does not support
+    direct uploads (501), the file is streamed through the API instead.
     """
+    folder_id = 3
+    sha256 = _sha256(file)
     try:
-        files = {
-            'uploaded_file': file
-        }
-        data = {
-            'folder_id': 3,
-            'owner_id': user_id
-        }
-        response = requests.post(FILES_ENDPOINTS["upload_register_file"], files=files, data=data)
+        try:
+            if file.size > MULTIPART_THRESHOLD:
+                upload_token = _put_object_multipart(file, file.name, sha256)
+            else:
+                upload_token = _put_object(file, file.name, sha256)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 501:
+                raise
+            file.seek(0)
+            response = client.upload(
+                FILES_ENDPOINTS["upload_register_file_stream"],
+                files={'uploaded_file': file},
+                data={'folder_id': folder_id, 'sha256': sha256},
+            )
+            response.raise_for_status()
+            clear_files_cache()
+            return 0
+
+        response = client.post(
+            FILES_ENDPOINTS["finalize_upload"],
+            json={
+                "upload_token": upload_token,
+                "folder_id": folder_id,
+                "sha256": sha256,
+            },
+        )
         response.raise_for_status()
+        clear_files_cache()
         return 0
     except requests.exceptions.RequestException as e:
-        return 1
\ No newline at end of file
+        return 1
+
+def upload_files(files):
+    """
+    This function uploads several files to the API in a single request.
+    The API uploads them to S3 in parallel and registers them in one
+    transaction. Returns the number of files that failed (-1 if the
+    request itself failed).
+    """
+    try:
+        response = client.upload(
+            FILES_ENDPOINTS["upload_register_files"],
+            files=[('uploaded_files', (file.name, file)) for file in files],
+            data={'folder_id': 3},
+        )
+        response.raise_for_status()
+        clear_files_cache()
+        return response.json()["failed"]
+    except requests.exceptions.RequestException as e:
+        return -1
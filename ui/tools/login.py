@@ -1,9 +1,13 @@
 from api.endpoints import USER_ENDPOINTS
 from tools.constants import DEFAULT_ROLE
-import requests
+from api import client
+import streamlit as st
 
 def verify_user(username: str, password: str):
-    """Verify if the user exists in the database and if the password is correct.
+    """Verify the credentials against the API and keep the access token it issues.
+
+    The password travels once, in the body of POST /users/login; later calls
+    authenticate with the token stored in the session.
 
     Args:
         username (str): The username of the user.
@@ -15,18 +19,17 @@ def verify_user(username: str, password: str):
              -1 if an error occurs.
     """
     try:
-        response_user_password = requests.get(
-            USER_ENDPOINTS["get_user_by_password_username"](username, password)
+        response_login = client.post(
+            USER_ENDPOINTS["login"], json={"username": username, "password": password}
         )
 
-        if not response_user_password:
+        if response_login.status_code == 401:
             return 0
+        if response_login.status_code != 200:
+            return -1
 
-        response_user_password_json = response_user_password.json()
-        if response_user_password_json["username"] == username:
-            return 1
-
-        return 0
+        st.session_state.access_token = response_login.json()["access_token"]
+        return 1
     except Exception as e:
         return -1
 
@@ -53,7 +56,7 @@ def create_user(full_name: str, username: str, password: str):
     }
 
     try:
-        response_create_user = requests.post(
+        response_create_user = client.post(
             USER_ENDPOINTS["create_user"], json=new_user_dict
         )
 
@@ -80,7 +83,7 @@ def get_user_to_add_session(username: str) -> dict | None:
         Exception: If an error occurs during the request.
     """
     try:
-        response = requests.get(USER_ENDPOINTS["get_user_by_username"](username))
+        response = client.get(USER_ENDPOINTS["get_user_by_username"](username))
 
         if response.status_code != 200:
             return None
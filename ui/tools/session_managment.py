@@ -8,6 +8,7 @@ def init_session():
     if "authenticated_user" not in st.session_state:
         st.session_state.authenticated_user = False
         st.session_state.user_data = {}
+        st.session_state.access_token = None
 
 
 def add_user_to_session(user_data: dict):
@@ -33,6 +34,7 @@ def close_session():
     """
     st.session_state.authenticated_user = False
     st.session_state.user_data = {}
+    st.session_state.access_token = None
     
 def is_authenticated():
     """ This function checks if the user is authenticated.
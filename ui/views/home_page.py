@@ -1,10 +1,13 @@
 import streamlit as st
 from tools.constants import ADMIN_ROLE
 from time import sleep
-from tools.file_managment import get_all_files, get_user_by_id, get_files_by_filter
+from tools.file_managment import get_all_files, get_files_by_filter, download_file
 
-if "files" not in st.session_state:
-    st.session_state.files = None
+if "files_filter" not in st.session_state:
+    st.session_state.files_filter = None
+if "files_cursors" not in st.session_state:
+    # Pila de cursores: el último es el de la página actual
+    st.session_state.files_cursors = []
 
 def home_page():
     
@@ -40,7 +43,8 @@ def home_page():
             if select_filter == "---" or select_order == "---":
                 st.warning("Por favor, selecciona un filtro y un orden válidos.")
             else:
-                st.session_state.files = get_files_by_filter(select_filter, select_order)
+                st.session_state.files_filter = (select_filter, select_order)
+                st.session_state.files_cursors = []
                 st.success(f"Aplicando filtro: {select_filter} y orden: {select_order}")
                 sleep(2)
                 st.rerun()
@@ -49,12 +53,15 @@ def home_page():
 
     with st.container():
         
-        files = []
-        
-        if st.session_state.files is None:
-            files = get_all_files()
+        cursor = st.session_state.files_cursors[-1] if st.session_state.files_cursors else None
+
+        if st.session_state.files_filter is None:
+            page = get_all_files(cursor)
         else:
-            files = st.session_state.files
+            page = get_files_by_filter(*st.session_state.files_filter, cursor=cursor)
+
+        files = page["items"] if page else []
+        next_cursor = page.get("next_cursor") if page else None
 
         if files:
             for file in files:
@@ -63,6 +70,7 @@ def home_page():
 
                     with col1:
                         st.markdown(f"**📁 Tipo:** {(file.get('file_type', 'N/A')).replace('.', '')}")
+                        st.markdown(f"**📂 Carpeta:** {file.get('folder_name') or 'N/A'}")
                         uploaded_at = file.get("uploaded_at")
                         if uploaded_at:
                            st.markdown(f"**🗓️ Fecha:** {uploaded_at.split('T')[0]} | {uploaded_at.split('T')[1].split('.')[0]}")
@@ -70,14 +78,7 @@ def home_page():
                             st.markdown("**🗓️ Fecha:** N/A")
                         
                     with col2:
-                        user_info = (
-                            get_user_by_id(file.get("owner_id"))
-                            if file.get("owner_id")
-                            else None
-                        )
-                        username = (
-                            user_info.get("username") if user_info else "No disponible"
-                        )
+                        username = file.get("owner_username") or "No disponible"
                         st.markdown(f"**👤 Usuario:** {username}")
                         st.markdown(
                             f"**📏 Tamaño:** {file.get('file_metadata', {}).get('size', 'N/A')}"
@@ -85,9 +86,20 @@ def home_page():
 
                     col1, col2 = st.columns([2, 2])
                     with col1:
-                        st.button(
+                        if st.button(
                             "⬇️ Descargar", key=file["file_id"], help="Descargar archivo"
-                        )
+                        ):
+                            content = download_file(file["file_id"])
+                            if content is None:
+                                st.error("Error al descargar el archivo.")
+                            else:
+                                with content:
+                                    st.download_button(
+                                        "💾 Guardar",
+                                        data=content,
+                                        file_name=f"{file['file_name']}{file['file_type']}",
+                                        key=f"save_{file['file_id']}",
+                                    )
                     with col2:
                         if st.session_state.user_data["role"] == ADMIN_ROLE or file["owner_id"] == st.session_state.user_data["user_id"]:
                             st.button(
@@ -96,4 +108,14 @@ def home_page():
                                 help="Eliminar archivo",
                             )
 
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.session_state.files_cursors and st.button("⬅️ Anterior", use_container_width=True):
+                st.session_state.files_cursors.pop()
+                st.rerun()
+        with col2:
+            if next_cursor and st.button("Siguiente ➡️", use_container_width=True):
+                st.session_state.files_cursors.append(next_cursor)
+                st.rerun()
+
     st.markdown("---")